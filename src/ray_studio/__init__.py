@@ -0,0 +1,15 @@
+def __getattr__(name):
+    # Imported on first use so `import ray_studio.cli` stays light
+    if name == "Studio":
+        from .studio import Studio
+        return Studio
+    if name == "__version__":
+        # The installed distribution's version; part of every batch job key
+        from importlib.metadata import PackageNotFoundError, version
+        try:
+            return version("ray-studio")
+        except PackageNotFoundError:
+            return "unknown"
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+__all__ = ["Studio", "__version__"]
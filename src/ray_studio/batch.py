@@ -0,0 +1,382 @@
+import asyncio
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import yaml
+from PIL import Image
+from pydantic import BaseModel, Field
+
+from . import __version__
+from .compositor import Compositor, LayerRenderer
+from .compositor.images import decode_image
+from .export import DRAFT_SCALE, PRESETS
+from .generators import GeneratorBase
+from .generators.base import write_atomic
+from .pipeline import Pipeline, Stage
+from .studio import Studio
+from .templates.registry import TEMPLATE_DIR
+
+# Default journal file name inside the output directory
+JOURNAL_NAME = ".ray-studio-journal.db"
+DEFAULT_PRESETS = ["instagram_post", "facebook_post", "gmn_post"]
+
+class Job(BaseModel):
+    """One asset: a template rendered with DNA and inputs, exported to each preset."""
+    id: Optional[str] = None
+    template: str
+    dna: str
+    inputs: Dict[str, Any] = Field(default_factory=dict)
+    presets: List[str] = Field(default_factory=lambda: list(DEFAULT_PRESETS))
+    seed: Optional[int] = None
+    draft: bool = False
+
+def load_jobs(path: str) -> List[Job]:
+    """
+    Read jobs from a JSONL file, one object per line (blank and # lines
+    skipped). Jobs without an `id` are named after their line number, so
+    give ids if lines will be inserted or reordered between runs.
+    """
+    jobs = []
+    ids = set()
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                job = Job(**json.loads(line))
+            except ValueError as e:
+                raise ValueError(f"{path}:{number}: {e}") from e
+            job.id = job.id or f"job-{number:05d}"
+            if job.id in ids:
+                raise ValueError(f"{path}:{number}: duplicate job id {job.id!r}")
+            ids.add(job.id)
+            jobs.append(job)
+    return jobs
+
+def job_assets(studio: Studio, job: Job) -> List[str]:
+    """Local files the job's logo and image layers read, after resolving DNA and input references."""
+    renderer = LayerRenderer(studio.dna(job.dna), studio.compositor.fetcher, job.seed)
+    return renderer.local_sources(studio.template(job.template).layers, job.inputs)
+
+def output_path(output_dir: str, job: Job, preset: str) -> str:
+    return os.path.join(output_dir, job.id, f"{preset}.{PRESETS[preset].format.value}")
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def job_keys(job: Job, hashes: Dict[str, str], generator: str = "", assets: Sequence[str] = ()) -> Dict[str, str]:
+    """
+    Key per preset: a hash of the template and DNA file contents, the
+    local `assets` the render reads (logos, images), inputs, seed, draft
+    flag, the `generator` spec, the preset's export settings and the
+    installed version. `hashes` memoises file hashes across jobs.
+    """
+    def hashed(path: str) -> str:
+        if path not in hashes:
+            hashes[path] = file_sha256(path)
+        return hashes[path]
+
+    base = {
+        "version": __version__,
+        "template": hashed(str(TEMPLATE_DIR / f"{job.template}.yaml")),
+        "dna": hashed(job.dna),
+        # A missing asset renders as a placeholder; adding the file later changes the key
+        "assets": {path: hashed(path) if os.path.isfile(path) else None for path in assets},
+        "inputs": job.inputs,
+        "seed": job.seed,
+        "draft": job.draft,
+        "generator": generator,
+    }
+    keys = {}
+    for preset in job.presets:
+        if preset not in PRESETS:
+            raise ValueError(f"Unknown preset: {preset}")
+        payload = {**base, "preset": preset, "export": asdict(PRESETS[preset])}
+        keys[preset] = hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    return keys
+
+class Journal:
+    """
+    SQLite record of exported outputs by job key. An output counts as done
+    while its file still exists with the recorded size and mtime; failed
+    outputs are kept with their error and retried on the next run. Each
+    finished job is committed at once, so a crash loses at most the jobs
+    in flight.
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            """CREATE TABLE IF NOT EXISTS outputs (
+                key TEXT PRIMARY KEY,
+                job TEXT NOT NULL,
+                preset TEXT NOT NULL,
+                path TEXT,
+                sha256 TEXT,
+                size INTEGER,
+                mtime_ns INTEGER,
+                status TEXT NOT NULL,
+                error TEXT,
+                updated REAL NOT NULL
+            )"""
+        )
+        self.db.commit()
+
+    def __enter__(self) -> "Journal":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.db.close()
+
+    def is_done(self, key: str, path: str) -> bool:
+        row = self.db.execute("SELECT path, size, mtime_ns FROM outputs WHERE key = ? AND status = 'done'", (key,)).fetchone()
+        if row is None or row[0] != path:
+            return False
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        return st.st_size == row[1] and st.st_mtime_ns == row[2]
+
+    def record_done(self, job: str, outputs: Sequence[Tuple[str, str, str, str]]):
+        """Record (key, preset, path, sha256) outputs of `job` as done."""
+        now = time.time()
+        rows = []
+        for key, preset, path, digest in outputs:
+            st = os.stat(path)
+            rows.append((key, job, preset, path, digest, st.st_size, st.st_mtime_ns, "done", None, now))
+        with self.db:
+            self.db.executemany("INSERT OR REPLACE INTO outputs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def record_failed(self, job: str, outputs: Sequence[Tuple[str, str, str]], error: str):
+        now = time.time()
+        rows = [(key, job, preset, path, None, None, None, "failed", error, now) for key, preset, path in outputs]
+        with self.db:
+            self.db.executemany("INSERT OR REPLACE INTO outputs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def counts(self) -> Dict[str, int]:
+        return dict(self.db.execute("SELECT status, COUNT(*) FROM outputs GROUP BY status").fetchall())
+
+@dataclass
+class BatchSummary:
+    """Jobs per outcome (a job is skipped only if every preset was up to date) and per-stage stats."""
+    rendered: int = 0
+    skipped: int = 0
+    failed: int = 0
+    errors: Dict[str, str] = field(default_factory=dict)
+    stages: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+class _Work:
+    """A job moving through the pipeline and the outputs it still owes."""
+
+    def __init__(self, job: Job, stale: List[Tuple[str, str, str]]):
+        self.job = job
+        self.stale = stale
+        self.written: List[Tuple[str, str, str, str]] = []
+        self.encoded = 0
+        self.failed = False
+
+class _Prefetched(GeneratorBase):
+    """Answers the requests fetched ahead of a render from their files, and the rest from `generator`."""
+
+    def __init__(self, generator: GeneratorBase, files: Dict[Tuple, str]):
+        self.generator = generator
+        self.files = files
+
+    async def generate(self, prompt, size=(1024, 1024), model="flux/schnell", seed=None) -> bytes:
+        return await self.generator.generate(prompt, size=size, model=model, seed=seed)
+
+    async def generate_image(self, prompt, size=(1024, 1024), model="flux/schnell", seed=None, box=None, resample=Image.Resampling.LANCZOS) -> Image.Image:
+        path = self.files.get((prompt, tuple(size), model, seed))
+        if path is None:
+            return await self.generator.generate_image(prompt, size, model, seed, box, resample)
+        return decode_image(path, box or size, "stretch", resample)
+
+    async def generate_with_style(self, prompt, style, dna, size) -> bytes:
+        return await self.generator.generate_with_style(prompt, style, dna, size)
+
+    def spec(self) -> str:
+        return self.generator.spec()
+
+def run_batch(
+    jobs: Sequence[Job],
+    output_dir: str,
+    studio: Studio,
+    journal: Journal,
+    workers: Optional[int] = None,
+    force: bool = False,
+    progress: Optional[Callable[[Job, str], None]] = None,
+    fetch_workers: int = 8,
+    encode_workers: Optional[int] = None,
+    write_workers: int = 2,
+    queue_size: int = 8
+) -> BatchSummary:
+    """
+    Render `jobs` into `output_dir/<job id>/<preset>.<ext>`, skipping
+    presets whose key is already done in `journal` (none with `force`).
+    `progress(job, outcome)` is called as each job finishes.
+
+    Jobs flow through a pipeline of bounded queues: fetch (backgrounds and
+    remote images, async) -> render (`workers` threads) -> encode (one item
+    per preset, `encode_workers` on the studio's export pool) -> write.
+    Runs its own event loop; from async code, await `run_batch_async`.
+    """
+    return asyncio.run(run_batch_async(
+        jobs, output_dir, studio, journal, workers, force, progress,
+        fetch_workers, encode_workers, write_workers, queue_size
+    ))
+
+async def run_batch_async(
+    jobs: Sequence[Job],
+    output_dir: str,
+    studio: Studio,
+    journal: Journal,
+    workers: Optional[int] = None,
+    force: bool = False,
+    progress: Optional[Callable[[Job, str], None]] = None,
+    fetch_workers: int = 8,
+    encode_workers: Optional[int] = None,
+    write_workers: int = 2,
+    queue_size: int = 8
+) -> BatchSummary:
+    """`run_batch` on the running loop."""
+    summary = BatchSummary()
+    hashes: Dict[str, str] = {}
+    workers = workers or os.cpu_count() or 4
+
+    def finish(job: Job, outcome: str, error: Optional[str] = None):
+        setattr(summary, outcome, getattr(summary, outcome) + 1)
+        if error is not None:
+            summary.errors[job.id] = error
+        if progress:
+            progress(job, outcome)
+
+    def pending():
+        # Generated lazily so journal lookups keep pace with the pipeline
+        for job in jobs:
+            try:
+                keys = job_keys(job, hashes, studio.generator.spec(), job_assets(studio, job))
+            except (OSError, ValueError, yaml.YAMLError) as e:
+                finish(job, "failed", str(e))
+                continue
+            outputs = [(keys[p], p, output_path(output_dir, job, p)) for p in job.presets]
+            stale = [o for o in outputs if force or not journal.is_done(o[0], o[2])]
+            if stale:
+                yield _Work(job, stale)
+            else:
+                finish(job, "skipped")
+
+    def on_error(item: Any, error: Exception):
+        work = item[0] if isinstance(item, tuple) else item
+        if not work.failed:
+            work.failed = True
+            journal.record_failed(work.job.id, work.stale, str(error))
+            finish(work.job, "failed", str(error))
+
+    render_pool = ThreadPoolExecutor(workers, thread_name_prefix="ray-studio-render")
+    write_pool = ThreadPoolExecutor(write_workers, thread_name_prefix="ray-studio-write")
+
+    async def fetch(work: _Work):
+        files = await _prefetch(studio, work.job)
+        return [(work, files)]
+
+    async def render(item):
+        work, files = item
+        if work.failed:
+            return []
+        generator = _Prefetched(studio.background_generator(work.job.draft), files)
+        job = work.job
+        image = await asyncio.get_running_loop().run_in_executor(
+            render_pool,
+            functools.partial(studio.render, job.template, job.dna, job.inputs, seed=job.seed, draft=job.draft, generator=generator)
+        )
+        return [(work, image, output) for output in work.stale]
+
+    async def encode(item):
+        work, image, (key, preset, path) = item
+        options = {"draft": True} if work.job.draft else {}
+        try:
+            if work.failed:
+                return []
+            data, _ = await asyncio.get_running_loop().run_in_executor(
+                studio.executor, functools.partial(studio.encode, image, preset=preset, **options)
+            )
+        finally:
+            # The canvas goes back to the pool once every preset is encoded
+            work.encoded += 1
+            if work.encoded == len(work.stale):
+                studio.release(image)
+        return [(work, (key, preset, path), data)]
+
+    async def write(item):
+        work, (key, preset, path), data = item
+        if work.failed:
+            return []
+        digest = await asyncio.get_running_loop().run_in_executor(write_pool, _write_output, path, data)
+        work.written.append((key, preset, path, digest))
+        if len(work.written) == len(work.stale):
+            journal.record_done(work.job.id, work.written)
+            finish(work.job, "rendered")
+        return []
+
+    pipeline = Pipeline(
+        [
+            Stage("fetch", fetch, fetch_workers),
+            Stage("render", render, workers),
+            Stage("encode", encode, encode_workers or studio.export_workers),
+            Stage("write", write, write_workers),
+        ],
+        queue_size=queue_size,
+        on_error=on_error
+    )
+    try:
+        await pipeline.run(pending())
+    finally:
+        render_pool.shutdown()
+        write_pool.shutdown()
+    summary.stages = pipeline.stats()
+    return summary
+
+async def _prefetch(studio: Studio, job: Job) -> Dict[Tuple, str]:
+    """
+    Generate the job's backgrounds into the cache and download its remote
+    images, ahead of rendering. Failures are left for the render to handle.
+    """
+    scale = DRAFT_SCALE if job.draft else 1.0
+    renderer = LayerRenderer(studio.dna(job.dna), studio.compositor.fetcher, job.seed, scale)
+    backgrounds, urls = renderer.requests(studio.template(job.template).layers, job.inputs, Compositor.canvas_size(scale))
+
+    generator = studio.background_generator(job.draft)
+    paths = await asyncio.gather(
+        *[generator.ensure(prompt, size, seed=job.seed) for prompt, size in backgrounds],
+        *[renderer.fetch_source(url) for url in urls],
+        return_exceptions=True
+    )
+    files = {}
+    for (prompt, size), path in zip(backgrounds, paths):
+        if isinstance(path, str):
+            files[(prompt, tuple(size), "flux/schnell", job.seed)] = path
+    return files
+
+def _write_output(path: str, data: bytes) -> str:
+    """Write atomically; returns the sha256 for the journal."""
+    write_atomic(path, data)
+    return hashlib.sha256(data).hexdigest()
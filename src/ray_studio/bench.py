@@ -0,0 +1,271 @@
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from PIL import Image, ImageDraw
+
+from .buffers import BUFFER_POOL
+from .compositor import Compositor
+from .compositor.gradients import GRADIENT_CACHE, GradientSpec, render_gradient
+from .compositor.text import TextRenderer
+from .dna.schema import BrandDNA, BrandIdentity, Colors, Fonts, Logo, Audience, ContentStrategy
+from .export import Exporter, PRESETS
+from .generators import ProceduralGenerator
+from .templates import list_templates
+from .tracing import percentile
+
+BATCH_PRESETS = ["instagram_post", "facebook_post", "gmn_post"]
+
+SAMPLE_TEXT = (
+    "Ray Studio turns brand DNA and templates into on-brand marketing assets "
+    "for every platform, from Instagram stories to print flyers."
+)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """High-water resident set size of this process in MB."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes elsewhere
+    if sys.platform == "darwin":
+        rss /= 1024
+    return rss / 1024
+
+
+def default_dna(logo: str = "") -> BrandDNA:
+    """Self-contained DNA so benchmarks do not depend on example files."""
+    return BrandDNA(
+        brand=BrandIdentity(
+            name="Bench Brand",
+            tagline="Fast by default",
+            colors=Colors(
+                primary="#1E40AF",
+                secondary="#60A5FA",
+                accent="#F59E0B",
+                background="#FFFFFF",
+                text="#1F2937"
+            ),
+            fonts=Fonts(heading="Montserrat", body="Inter", accent="Playfair Display"),
+            tone="professional",
+            expression="minimal",
+            logo=Logo(primary=logo)
+        ),
+        audience=Audience(description="", pain_points=[], desires=[]),
+        products=[],
+        content=ContentStrategy(hashtags=[], cta_phrases=[])
+    )
+
+
+def sample_inputs(template, image: Optional[str] = None) -> Dict[str, Any]:
+    """Fill every template input with its example, default or name; `*image*` inputs get `image`."""
+    inputs = {}
+    for name, definition in template.inputs.items():
+        if image and "image" in name:
+            inputs[name] = image
+        else:
+            inputs[name] = definition.example or definition.default or name
+    return inputs
+
+
+def measure(fn: Callable[[], Any], iterations: int, warmup: int = 1, items: int = 1) -> Dict[str, Any]:
+    """Time `fn` and summarise latency percentiles, throughput and buffer allocations."""
+    for _ in range(warmup):
+        fn()
+
+    before = BUFFER_POOL.stats()
+    images_before = Image.core.get_stats()["new_count"]
+    samples = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    wall = time.perf_counter() - started
+    after = BUFFER_POOL.stats()
+    images_after = Image.core.get_stats()["new_count"]
+
+    return {
+        "iterations": iterations,
+        "p50_ms": percentile(samples, 50),
+        "p95_ms": percentile(samples, 95),
+        "mean_ms": sum(samples) / len(samples),
+        "throughput_per_s": iterations * items / wall if wall else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+        # Every image Pillow created per iteration: decodes, resizes, conversions, scratch buffers
+        "images_per_op": (images_after - images_before) / iterations,
+        # Buffer pool requests it couldn't serve from its free lists (canvases and layer buffers only)
+        "pool_misses_per_op": (after["allocations"] - before["allocations"]) / iterations,
+        "pool_reuses_per_op": (after["reuses"] - before["reuses"]) / iterations,
+    }
+
+
+def _cases(dna: BrandDNA, workdir: str) -> List[Tuple[str, Callable[[], Any]]]:
+    """Build the (name, callable) list of benchmarks."""
+    compositor = Compositor()
+    generator = ProceduralGenerator()
+    exporter = Exporter()
+    templates = list_templates()
+
+    cases = []
+
+    def generate_background():
+        generator.render("Modern abstract background, #1E40AF and #60A5FA color scheme", (1080, 1080), seed=1)
+    cases.append(("generate.procedural", generate_background))
+
+    for kind in ("linear", "radial", "mesh"):
+        spec = GradientSpec(kind=kind, colors=("#1E40AF", "#60A5FA", "#F59E0B"), angle=30)
+
+        def gradient(spec=spec):
+            # Uncached cost; templates normally hit the cache after the first render
+            GRADIENT_CACHE.clear()
+            render_gradient(spec, (1920, 1080))
+        cases.append((f"gradient.{kind}", gradient))
+
+    def text_layout():
+        canvas = Image.new("RGBA", (1080, 1080), (255, 255, 255, 255))
+        TextRenderer.draw_text(
+            ImageDraw.Draw(canvas), SAMPLE_TEXT, (540, 200), "Inter", 36, "#000000",
+            max_width=860, anchor="center"
+        )
+    cases.append(("text.layout", text_layout))
+
+    # A large product photo exercises reduced-size JPEG decoding
+    photo = os.path.join(workdir, "product.jpg")
+    Image.new("RGB", (3000, 2000), (245, 158, 11)).save(photo, quality=85)
+
+    for tmpl in templates:
+        inputs = sample_inputs(tmpl, photo)
+
+        def render(tmpl=tmpl, inputs=inputs):
+            compositor.release(compositor.render(tmpl, dna, inputs, generator=generator, seed=1))
+        cases.append((f"render.{tmpl.name}", render))
+
+    if templates:
+        source = compositor.render(templates[0], dna, sample_inputs(templates[0], photo), generator=generator, seed=1)
+    else:
+        source = Image.new("RGBA", (1080, 1080), (30, 64, 175, 255))
+
+    # The same composition kept in RGBA, to show what planning the canvas mode saves per preset
+    source_rgba = source.convert("RGBA")
+
+    for name, cfg in PRESETS.items():
+        path = os.path.join(workdir, f"{name}.{cfg.format.value}")
+
+        def export(name=name, path=path):
+            exporter.export(source, path, preset=name)
+        cases.append((f"export.{name}", export))
+
+        def export_rgba(name=name, path=path):
+            exporter.export(source_rgba, path, preset=name)
+        cases.append((f"export_rgba.{name}", export_rgba))
+
+    def export_multi():
+        exporter.export_multi(source, workdir, presets=BATCH_PRESETS)
+    cases.append(("export.multi", export_multi))
+
+    if templates:
+        tmpl = templates[0]
+        inputs = sample_inputs(tmpl, photo)
+        batch_dir = os.path.join(workdir, "batch")
+
+        def batch_row():
+            image = compositor.render(tmpl, dna, inputs, generator=generator, seed=1)
+            exporter.export_multi(image, batch_dir, presets=BATCH_PRESETS)
+            compositor.release(image)
+        cases.append(("batch.end_to_end", batch_row))
+
+    return cases
+
+
+def run_benchmarks(
+    iterations: int = 10,
+    only: Sequence[str] = (),
+    dna: Optional[BrandDNA] = None,
+    progress: Optional[Callable[[str], None]] = None
+) -> Dict[str, Any]:
+    """Run the benchmark suite and return a JSON-serialisable result dict."""
+    results: Dict[str, Any] = {}
+
+    with tempfile.TemporaryDirectory(prefix="ray-studio-bench-") as workdir:
+        if dna is None:
+            logo = os.path.join(workdir, "logo.png")
+            Image.new("RGBA", (800, 400), (30, 64, 175, 255)).save(logo)
+            dna = default_dna(logo)
+        for name, fn in _cases(dna, workdir):
+            if only and not any(name.startswith(prefix) for prefix in only):
+                continue
+            if progress:
+                progress(name)
+            results[name] = measure(fn, iterations)
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "iterations": iterations,
+        "peak_rss_mb": peak_rss_mb(),
+        "buffer_pool": BUFFER_POOL.stats(),
+        "benchmarks": results,
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.10) -> List[Dict[str, Any]]:
+    """Return benchmarks whose p50 regressed by more than `threshold` (a fraction)."""
+    regressions = []
+    previous = baseline.get("benchmarks", {})
+    for name, current in results["benchmarks"].items():
+        if name not in previous:
+            continue
+        before = previous[name]["p50_ms"]
+        after = current["p50_ms"]
+        if before > 0 and after > before * (1 + threshold):
+            regressions.append({
+                "name": name,
+                "baseline_ms": before,
+                "current_ms": after,
+                "change": after / before - 1,
+            })
+    return regressions
+
+
+def format_results(results: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> str:
+    """Render results (and the change against a baseline) as a text table."""
+    previous = (baseline or {}).get("benchmarks", {})
+    lines = [f"{'benchmark':<36} {'p50 ms':>9} {'p95 ms':>9} {'ops/s':>9} {'rss MB':>8} {'images':>7} {'pool misses':>11}  {'vs base':>8}"]
+    for name, row in results["benchmarks"].items():
+        change = ""
+        if name in previous and previous[name]["p50_ms"] > 0:
+            change = f"{(row['p50_ms'] / previous[name]['p50_ms'] - 1) * 100:+.1f}%"
+        rss = f"{row['peak_rss_mb']:.0f}" if row["peak_rss_mb"] is not None else "-"
+        # Older saved results predate allocation counts
+        images = f"{row['images_per_op']:.1f}" if "images_per_op" in row else "-"
+        misses = f"{row['pool_misses_per_op']:.1f}" if "pool_misses_per_op" in row else "-"
+        lines.append(
+            f"{name:<36} {row['p50_ms']:>9.2f} {row['p95_ms']:>9.2f} "
+            f"{row['throughput_per_s']:>9.1f} {rss:>8} {images:>7} {misses:>11}  {change:>8}"
+        )
+    pool = results.get("buffer_pool")
+    if pool:
+        lines.append(
+            f"buffer pool: {pool['allocations']} misses, {pool['reuses']} reused, "
+            f"peak {pool['peak_bytes'] / (1024 * 1024):.1f} MB"
+        )
+    return "\n".join(lines)
+
+
+def save_results(results: Dict[str, Any], path: str) -> str:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    return path
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,101 @@
+import threading
+import weakref
+from typing import Any, Dict, List, Tuple, Union
+
+from PIL import Image
+
+from . import tracing
+
+Color = Union[int, float, str, Tuple[int, ...]]
+Key = Tuple[str, Tuple[int, int]]
+
+BYTES_PER_PIXEL = {"1": 1, "L": 1, "P": 1, "LA": 2, "RGB": 3, "RGBA": 4, "CMYK": 4}
+
+def image_nbytes(image: Image.Image) -> int:
+    """Approximate in-memory size of an image's pixel data."""
+    return image.width * image.height * BYTES_PER_PIXEL.get(image.mode, 4)
+
+class BufferPool:
+    """
+    Free lists of scratch images keyed by (mode, size), so canvases and
+    layer buffers that are the same size render after render are recycled
+    instead of reallocated. `acquire` returns an image filled in place with
+    `color`; `release` hands it back once nothing else will read it.
+    Unreleased images are simply garbage-collected. At most `max_bytes` of
+    idle images are kept.
+    """
+
+    def __init__(self, name: str, max_bytes: int = 256 * 1024 * 1024):
+        self.name = name
+        self.max_bytes = max_bytes
+        self._free: Dict[Key, List[Image.Image]] = {}
+        self._idle_bytes = 0
+        # Images handed out and not yet released or collected
+        self._live: Dict[int, weakref.finalize] = {}
+        self._live_bytes = 0
+        # Re-entrant: a collected image may be finalized while the lock is held
+        self._lock = threading.RLock()
+        self.allocations = 0
+        self.reuses = 0
+        self.peak_bytes = 0
+
+    def acquire(self, mode: str, size: Tuple[int, int], color: Color = 0) -> Image.Image:
+        key = (mode, tuple(size))
+        with self._lock:
+            free = self._free.get(key)
+            image = free.pop() if free else None
+            if image is not None:
+                self._idle_bytes -= image_nbytes(image)
+                self.reuses += 1
+            else:
+                self.allocations += 1
+        tracing.count(f"{self.name}.pool_{'reuse' if image is not None else 'alloc'}")
+
+        if image is None:
+            image = Image.new(mode, key[1], color)
+        else:
+            # Fill the recycled buffer in place rather than pasting a new image
+            image.paste(color, (0, 0) + image.size)
+
+        nbytes = image_nbytes(image)
+        with self._lock:
+            self._live[id(image)] = weakref.finalize(image, self._collected, id(image), nbytes)
+            self._live_bytes += nbytes
+            self.peak_bytes = max(self.peak_bytes, self._live_bytes + self._idle_bytes)
+        return image
+
+    def release(self, image: Image.Image):
+        """Return an acquired image; images the pool didn't hand out are ignored."""
+        nbytes = image_nbytes(image)
+        with self._lock:
+            finalizer = self._live.pop(id(image), None)
+            if finalizer is None or not finalizer.detach():
+                return
+            self._live_bytes -= nbytes
+            if self._idle_bytes + nbytes > self.max_bytes:
+                return
+            self._free.setdefault((image.mode, image.size), []).append(image)
+            self._idle_bytes += nbytes
+
+    def _collected(self, image_id: int, nbytes: int):
+        with self._lock:
+            self._live.pop(image_id, None)
+            self._live_bytes -= nbytes
+
+    def clear(self):
+        with self._lock:
+            self._free.clear()
+            self._idle_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "allocations": self.allocations,
+                "reuses": self.reuses,
+                "live": len(self._live),
+                "live_bytes": self._live_bytes,
+                "idle_bytes": self._idle_bytes,
+                "peak_bytes": self.peak_bytes,
+            }
+
+BUFFER_POOL = BufferPool("buffer")
@@ -1,16 +1,69 @@
+import importlib
 import click
-import os
-from .dna import load_dna
-from .templates import get_template, list_templates
-from .generators import get_generator
-from .compositor import Compositor
-from .export import Exporter, PRESETS
-from .figma.cli import figma
-
-@click.group()
-def cli():
+from typing import Dict, Tuple
+from . import tracing
+
+# Heavy dependencies (pydantic, PIL, httpx, websockets, numpy) are imported
+# inside the commands that use them, so `--help`, `presets` and `templates`
+# start fast when the CLI is spawned per job.
+
+class LazyGroup(click.Group):
+    """Group whose `lazy_commands` (name -> ("module:attr", short help)) import on first use."""
+
+    def __init__(self, *args, lazy_commands: Dict[str, Tuple[str, str]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = lazy_commands or {}
+
+    def list_commands(self, ctx):
+        return sorted([*super().list_commands(ctx), *self.lazy_commands])
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name in self.lazy_commands and cmd_name not in self.commands:
+            module, attr = self.lazy_commands[cmd_name][0].split(":")
+            self.add_command(getattr(importlib.import_module(module, __package__), attr), cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+    def format_commands(self, ctx, formatter):
+        # Listing commands uses the stored short help instead of importing them
+        rows = []
+        for name in self.list_commands(ctx):
+            if name in self.commands:
+                if not self.commands[name].hidden:
+                    rows.append((name, self.commands[name].get_short_help_str(formatter.width - 6 - len(name))))
+            else:
+                rows.append((name, self.lazy_commands[name][1]))
+        if rows:
+            with formatter.section("Commands"):
+                formatter.write_dl(rows)
+
+@click.group(cls=LazyGroup, lazy_commands={"figma": (".figma.cli:figma", "Figma Skill Module operations")})
+@click.option("--trace", "trace_path", help="Write a Chrome trace of pipeline stages to this path")
+@click.pass_context
+def cli(ctx, trace_path):
     """Ray Studio - AI Marketing Asset Generator"""
-    pass
+    if trace_path:
+        tracer = tracing.enable()
+
+        def _write_trace():
+            tracing.disable()
+            tracer.write(trace_path)
+            click.echo(tracer.format_summary(), err=True)
+            click.echo(f"✓ Trace: {trace_path}", err=True)
+
+        ctx.call_on_close(_write_trace)
+
+def background_generator(name, seed, draft, no_cache):
+    """
+    Generator for a one-off render. Backgrounds are kept on disk only when a
+    rerun can use them (a seed, or a draft reusing a full render's background);
+    random one-offs would otherwise grow the cache without bound.
+    """
+    from .generators import CachedGenerator, get_generator
+
+    generator = get_generator(name)
+    if no_cache or (seed is None and not draft):
+        return generator
+    return CachedGenerator(generator, reuse_any_size=draft)
 
 @cli.command()
 @click.argument("template")
@@ -24,8 +77,15 @@ def cli():
 @click.option("--cta", help="CTA button text")
 @click.option("--var", multiple=True, help="Additional variables (key=value)")
 @click.option("--seed", type=int, help="Random seed for reproducibility")
-def generate(template, dna, output, preset, format, size, headline, subheadline, cta, var, seed):
+@click.option("--generator", "-g", help="Image generator (fal, procedural, stub), or a comma-separated list to hedge across; defaults to $RAY_STUDIO_GENERATOR or fal")
+@click.option("--draft", is_flag=True, help="Fast quarter-resolution preview reusing cached backgrounds")
+@click.option("--no-cache", is_flag=True, help="Don't read or write the background cache")
+def generate(template, dna, output, preset, format, size, headline, subheadline, cta, var, seed, generator, draft, no_cache):
     """Generate a marketing asset from template"""
+    from .dna import load_dna
+    from .templates import get_template
+    from .compositor import Compositor
+    from .export import DRAFT_SCALE, Exporter
 
     # Load DNA
     brand_dna = load_dna(dna)
@@ -47,21 +107,24 @@ def generate(template, dna, output, preset, format, size, headline, subheadline,
 
     # Generate
     compositor = Compositor()
-    generator = get_generator()  # Uses configured default
+    image_generator = background_generator(generator, seed, draft, no_cache)
 
-    click.echo(f"Generating {template}...")
+    click.echo(f"Generating {template}{' (draft)' if draft else ''}...")
     image = compositor.render(
         template=tmpl,
         dna=brand_dna,
         inputs=inputs,
-        generator=generator,
-        seed=seed
+        generator=image_generator,
+        seed=seed,
+        scale=DRAFT_SCALE if draft else 1.0
     )
 
     # Export
     exporter = Exporter()
 
     export_kwargs = {}
+    if draft:
+        export_kwargs["draft"] = True
     if format:
         export_kwargs["format"] = format
     if size:
@@ -83,36 +146,81 @@ def generate(template, dna, output, preset, format, size, headline, subheadline,
 @click.option("--output-dir", "-o", required=True)
 @click.option("--presets", "-p", multiple=True, default=["instagram_post", "facebook_post", "gmn_post"])
 @click.option("--headline", required=True)
-def batch(template, dna, output_dir, presets, headline):
+@click.option("--seed", type=int, help="Random seed for reproducibility")
+@click.option("--generator", "-g", help="Image generator (fal, procedural, stub), or a comma-separated list to hedge across; defaults to $RAY_STUDIO_GENERATOR or fal")
+@click.option("--draft", is_flag=True, help="Fast quarter-resolution preview reusing cached backgrounds")
+@click.option("--no-cache", is_flag=True, help="Don't read or write the background cache")
+def batch(template, dna, output_dir, presets, headline, seed, generator, draft, no_cache):
     """Generate asset in multiple formats at once"""
+    from .dna import load_dna
+    from .templates import get_template
+    from .compositor import Compositor
+    from .export import DRAFT_SCALE, Exporter
 
     brand_dna = load_dna(dna)
     tmpl = get_template(template)
 
     compositor = Compositor()
-    generator = get_generator()
+    image_generator = background_generator(generator, seed, draft, no_cache)
     exporter = Exporter()
 
-    click.echo(f"Generating {template} for batch export...")
+    click.echo(f"Generating {template} for batch export{' (draft)' if draft else ''}...")
     image = compositor.render(
         template=tmpl,
         dna=brand_dna,
         inputs={"headline": headline},
-        generator=generator
+        generator=image_generator,
+        seed=seed,
+        scale=DRAFT_SCALE if draft else 1.0
     )
 
     paths = exporter.export_multi(
         image=image,
         output_dir=output_dir,
-        presets=list(presets)
+        presets=list(presets),
+        **({"draft": True} if draft else {})
     )
 
     for path in paths:
         click.echo(f"✓ {path}")
 
+@cli.command()
+@click.argument("jobs_file")
+@click.option("--output-dir", "-o", required=True, help="Outputs go to OUTPUT_DIR/<job id>/<preset>.<ext>")
+@click.option("--journal", "journal_path", help="Journal database (default: OUTPUT_DIR/.ray-studio-journal.db)")
+@click.option("--workers", "-w", type=int, help="Render threads (default: CPU count)")
+@click.option("--force", is_flag=True, help="Re-render every job, ignoring the journal")
+@click.option("--generator", "-g", help="Image generator (fal, procedural, stub), or a comma-separated list to hedge across; defaults to $RAY_STUDIO_GENERATOR or fal")
+@click.option("--encode-processes", default=0, help="Encode in this many processes (canvases passed over shared memory)")
+@click.option("--stats", "show_stats", is_flag=True, help="Print per-stage utilisation to size the pipeline")
+def jobs(jobs_file, output_dir, journal_path, workers, force, generator, encode_processes, show_stats):
+    """Render a JSONL file of jobs, resuming and skipping unchanged ones"""
+    import os
+    from .batch import JOURNAL_NAME, Journal, load_jobs, run_batch
+    from .studio import Studio
+
+    job_list = load_jobs(jobs_file)
+    journal_path = journal_path or os.path.join(output_dir, JOURNAL_NAME)
+
+    click.echo(f"Running {len(job_list)} jobs...")
+    with Studio(generator, encode_processes=encode_processes) as studio, Journal(journal_path) as journal:
+        summary = run_batch(job_list, output_dir, studio, journal, workers=workers, force=force)
+    for job_id, error in summary.errors.items():
+        click.echo(f"✗ {job_id}: {error}", err=True)
+
+    if show_stats:
+        click.echo(f"{'stage':<8} {'workers':>7} {'items':>6} {'util':>6} {'starved':>8} {'blocked':>8}")
+        for name, s in summary.stages.items():
+            click.echo(f"{name:<8} {s['workers']:>7} {s['items']:>6} {s['utilisation']:>6.0%} {s['starved_s']:>7.2f}s {s['blocked_s']:>7.2f}s")
+    click.echo(f"✓ {summary.rendered} rendered, {summary.skipped} skipped, {summary.failed} failed")
+    if summary.failed:
+        raise SystemExit(1)
+
 @cli.command()
 def presets():
     """List available export presets"""
+    from .export import PRESETS
+
     click.echo("Available presets:\n")
 
     categories = {
@@ -140,4 +248,60 @@ def templates():
     for tmpl in list_templates():
         click.echo(f"  • {tmpl.name}: {tmpl.description}")
 
-cli.add_command(figma)
+@cli.command()
+@click.option("--host", default="127.0.0.1", help="Interface to listen on")
+@click.option("--port", default=8765, help="Port to listen on")
+@click.option("--workers", "-w", type=int, help="Render worker threads (default: CPU count)")
+@click.option("--queue-size", default=16, help="Requests allowed to wait for a worker before answering 429")
+@click.option("--generator", "-g", help="Image generator (fal, procedural, stub), or a comma-separated list to hedge across; defaults to $RAY_STUDIO_GENERATOR or fal")
+@click.option("--output-root", help="Directory /batch may write under (default: current directory)")
+def serve(host, port, workers, queue_size, generator, output_root):
+    """Serve render/export/batch over HTTP with warm templates and generator"""
+    import asyncio
+    from .generators import get_generator
+    from .server import RenderServer
+
+    server = RenderServer(get_generator(generator), workers=workers, queue_size=queue_size, output_root=output_root)
+    click.echo(f"Serving on http://{host}:{port} ({server.workers} workers, queue {queue_size})")
+    try:
+        asyncio.run(server.serve_forever(host, port))
+    except KeyboardInterrupt:
+        pass
+
+@cli.command()
+@click.option("--iterations", "-n", default=10, help="Timed iterations per benchmark")
+@click.option("--only", multiple=True, help="Run benchmarks whose name starts with this prefix")
+@click.option("--dna", "-d", help="Brand DNA to render with (defaults to a built-in one)")
+@click.option("--save", "save_path", help="Write results JSON (usable as a baseline)")
+@click.option("--baseline", "-b", help="Compare against a saved results JSON")
+@click.option("--threshold", default=0.10, help="Allowed p50 slowdown vs baseline (0.10 = 10%)")
+def bench(iterations, only, dna, save_path, baseline, threshold):
+    """Benchmark the pipeline offline with the procedural generator"""
+    from . import bench as benchmarks
+    from .dna import load_dna
+
+    brand_dna = load_dna(dna) if dna else None
+    results = benchmarks.run_benchmarks(
+        iterations=iterations,
+        only=only,
+        dna=brand_dna,
+        progress=lambda name: click.echo(f"  running {name}...", err=True)
+    )
+
+    previous = benchmarks.load_results(baseline) if baseline else None
+    click.echo(benchmarks.format_results(results, previous))
+
+    if save_path:
+        benchmarks.save_results(results, save_path)
+        click.echo(f"✓ Saved: {save_path}")
+
+    if previous:
+        regressions = benchmarks.compare(results, previous, threshold)
+        for r in regressions:
+            click.echo(f"✗ {r['name']}: {r['baseline_ms']:.2f}ms -> {r['current_ms']:.2f}ms ({r['change'] * 100:+.1f}%)", err=True)
+        if regressions:
+            raise SystemExit(1)
+        click.echo(f"✓ No regressions over {threshold * 100:.0f}%")
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,73 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+from PIL import Image
+from .. import tracing
+from ..buffers import image_nbytes
+
+class ImageCache:
+    """
+    Thread-safe LRU cache of PIL images bounded by total pixel bytes.
+    Cached images are shared between callers and must be treated as read-only;
+    paste or copy them rather than drawing on them.
+    """
+
+    def __init__(self, name: str, max_bytes: int = 128 * 1024 * 1024):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Image.Image]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Image.Image]:
+        with self._lock:
+            image = self._entries.get(key)
+            if image is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        tracing.count(f"{self.name}.cache_{'miss' if image is None else 'hit'}")
+        return image
+
+    def put(self, key: Hashable, image: Image.Image):
+        size = image_nbytes(image)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= image_nbytes(previous)
+            self._entries[key] = image
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= image_nbytes(evicted)
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Image.Image]) -> Image.Image:
+        """Return the cached image for `key`, building and storing it on a miss."""
+        image = self.get(key)
+        if image is None:
+            image = factory()
+            self.put(key, image)
+        return image
+
+    def clear(self):
+        """Drop every entry and reset the hit/miss counters."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -1,8 +1,121 @@
-from PIL import Image, ImageFilter
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Tuple
+from PIL import Image, ImageColor, ImageFilter
+from .cache import ImageCache
+from .gradients import GradientSpec, render_gradient
+from .images import paste_image
+from .. import tracing
+
+Box = Tuple[int, int, int, int]
+
+# Effects that transform the layer's own pixels; their results are cached
+CONTENT_EFFECTS = {"blur", "darken", "overlay", "vignette"}
+
+EFFECT_CACHE = ImageCache("effect", max_bytes=128 * 1024 * 1024)
 
 class EffectRenderer:
-    """Applies effects to images."""
+    """
+    Runs a layer's declarative `effects:` list.
+
+    The layer is rendered onto its own transparent image first. Underlays
+    (`shadow`) are built from the layer's alpha within its bounding box plus
+    the blur reach; content effects (`blur`, `darken`, `overlay`,
+    `vignette`) only touch the layer's bounding box and are cached per
+    (pixel hash, effect params).
+    """
+
+    def __init__(self, cache: ImageCache = EFFECT_CACHE):
+        self.cache = cache
 
     @staticmethod
     def apply_blur(image: Image.Image, radius: int = 2) -> Image.Image:
         return image.filter(ImageFilter.GaussianBlur(radius))
+
+    def composite(self, canvas: Image.Image, layer_image: Image.Image, effects: List[Dict[str, Any]]) -> Optional[Box]:
+        """Apply `effects` to `layer_image` and composite the result onto `canvas`."""
+        bbox = layer_image.getbbox()
+        if bbox is None:
+            return None
+
+        underlays = []
+        content_effects = []
+        for effect in effects:
+            kind = effect.get("type")
+            if kind == "shadow":
+                with tracing.span("effect.shadow"):
+                    underlays.append(self.shadow(layer_image, bbox, effect))
+            elif kind in CONTENT_EFFECTS:
+                content_effects.append(effect)
+            else:
+                raise ValueError(f"Unknown effect: {kind}")
+
+        content = layer_image.crop(bbox)
+        if content_effects:
+            content = self.apply_content(content, content_effects)
+
+        for patch, dest in underlays:
+            paste_image(canvas, patch, dest)
+        paste_image(canvas, content, bbox[:2])
+        return bbox
+
+    def shadow(self, layer_image: Image.Image, bbox: Box, effect: Dict[str, Any]) -> Tuple[Image.Image, Tuple[int, int]]:
+        """Blurred, tinted copy of the layer's alpha, offset from the content."""
+        radius = float(effect.get("radius", 8))
+        dx, dy = effect.get("offset", [0, 4])
+        opacity = float(effect.get("opacity", 0.5))
+        color = ImageColor.getrgb(effect.get("color", "#000000"))[:3]
+
+        # Gaussian blur reaches about three radii past the content
+        pad = int(radius * 3) + 1
+        width, height = layer_image.size
+        region = (max(bbox[0] - pad, 0), max(bbox[1] - pad, 0), min(bbox[2] + pad, width), min(bbox[3] + pad, height))
+
+        alpha = layer_image.getchannel("A").crop(region)
+        if radius > 0:
+            alpha = alpha.filter(ImageFilter.GaussianBlur(radius))
+        if opacity < 1:
+            alpha = alpha.point(lambda v: int(v * opacity))
+
+        patch = Image.new("RGBA", alpha.size, color + (0,))
+        patch.putalpha(alpha)
+        return patch, (region[0] + int(dx), region[1] + int(dy))
+
+    def apply_content(self, content: Image.Image, effects: List[Dict[str, Any]]) -> Image.Image:
+        """Run content effects in order, cached per (source hash, params)."""
+        digest = hashlib.blake2b(content.tobytes(), digest_size=16).hexdigest()
+        key = (digest, content.size, content.mode, json.dumps(effects, sort_keys=True, default=str))
+
+        def run():
+            result = content
+            for effect in effects:
+                with tracing.span(f"effect.{effect['type']}"):
+                    result = getattr(self, f"_{effect['type']}")(result, effect)
+            return result
+
+        return self.cache.get_or_create(key, run)
+
+    def _blur(self, image: Image.Image, effect: Dict[str, Any]) -> Image.Image:
+        return self.apply_blur(image, float(effect.get("radius", 8)))
+
+    def _darken(self, image: Image.Image, effect: Dict[str, Any]) -> Image.Image:
+        factor = 1 - float(effect.get("amount", 0.3))
+        scale = [int(v * factor) for v in range(256)]
+        return image.point(scale * 3 + list(range(256)))
+
+    def _overlay(self, image: Image.Image, effect: Dict[str, Any]) -> Image.Image:
+        color = ImageColor.getrgb(effect.get("color", "#000000"))[:3]
+        opacity = float(effect.get("opacity", 0.3))
+        tinted = Image.blend(image.convert("RGB"), Image.new("RGB", image.size, color), opacity)
+        tinted.putalpha(image.getchannel("A"))
+        return tinted
+
+    def _vignette(self, image: Image.Image, effect: Dict[str, Any]) -> Image.Image:
+        level = int(255 * float(effect.get("strength", 0.5)))
+        # Clear centre, falling off to `strength` at the corners
+        spec = GradientSpec(kind="radial", colors=("#000000", "#000000", f"#{level:02x}{level:02x}{level:02x}"), dither=False)
+        mask = render_gradient(spec, image.size).getchannel("R")
+        color = ImageColor.getrgb(effect.get("color", "#000000"))[:3]
+        shaded = Image.composite(Image.new("RGB", image.size, color), image.convert("RGB"), mask)
+        shaded.putalpha(image.getchannel("A"))
+        return shaded
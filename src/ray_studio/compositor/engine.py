@@ -1,67 +1,87 @@
+import asyncio
 from PIL import Image
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from ..templates.base import Template
 from ..dna.schema import BrandDNA
 from ..generators.base import GeneratorBase
+from ..buffers import BUFFER_POOL
 from .layers import LayerRenderer
+from .fetcher import AssetFetcher
 
 class Compositor:
     """Core image composition engine."""
 
+    def __init__(self, fetcher: Optional[AssetFetcher] = None):
+        # Remote image sources; None uses the process-wide fetcher
+        self.fetcher = fetcher
+
     def render(
         self,
         template: Template,
         dna: BrandDNA,
         inputs: Dict[str, Any],
         generator: Optional[GeneratorBase] = None,
-        seed: Optional[int] = None
+        seed: Optional[int] = None,
+        scale: float = 1.0,
+        mode: Optional[str] = None
     ) -> Image.Image:
-        """Render a template into an image."""
+        """
+        Render a template into an image; `scale` < 1 renders a proportional
+        draft. `mode` forces the canvas mode instead of planning it.
+        """
+        # Click is sync; bridge to the async layer pipeline on this thread's loop
+        try:
+            loop = asyncio.get_event_loop()
+        except RuntimeError:
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+
+        return loop.run_until_complete(self.render_async(template, dna, inputs, generator, seed, scale, mode))
 
-        # Determine canvas size
-        # For now, default to 1080x1080 if not specified
-        width = 1080
-        height = 1080
+    @staticmethod
+    def canvas_size(scale: float = 1.0) -> Tuple[int, int]:
+        """Canvas size at `scale`; for now always square 1080px at full scale."""
+        side = max(1, round(1080 * scale))
+        return side, side
 
-        # Create base canvas
-        canvas = Image.new("RGBA", (width, height), (255, 255, 255, 255))
+    async def render_async(
+        self,
+        template: Template,
+        dna: BrandDNA,
+        inputs: Dict[str, Any],
+        generator: Optional[GeneratorBase] = None,
+        seed: Optional[int] = None,
+        scale: float = 1.0,
+        mode: Optional[str] = None
+    ) -> Image.Image:
+        """
+        Render a template into an image on the running loop, so several
+        renders can be gathered and share generator and fetcher requests.
+        The canvas comes from the buffer pool; `release()` it when done.
+        It is RGB unless the template can leave translucent pixels.
+        """
+        layer_renderer = LayerRenderer(dna, self.fetcher, seed, scale)
 
-        layer_renderer = LayerRenderer(dna)
+        # Create base canvas; opaque compositions skip alpha all the way to the encoder
+        mode = mode or layer_renderer.canvas_mode(template.layers, inputs)
+        canvas = BUFFER_POOL.acquire(mode, self.canvas_size(scale), "#FFFFFF")
 
         # Validate inputs against template
         # (Skipping robust validation for now)
 
         prev_bbox = None
-
-        # In an async context, we would await. But click is sync.
-        # We need to bridge sync/async if generator is async.
-        # For this PoC, I'll assume we are running in a way that allows async or I'll use asyncio.run
-        # But wait, Compositor.render is called from CLI which is sync.
-        # I should probably make render async or handle the loop.
-
-        import asyncio
-
-        async def _render_layers():
-            nonlocal prev_bbox
+        try:
             for layer in template.layers:
                 prev_bbox = await layer_renderer.render_layer(
                     canvas, layer, inputs, generator, prev_bbox
                 )
-
-        # Use existing loop if available, else new one
-        try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-
-        if loop.is_running():
-             # This is tricky if called from sync code that is already in a loop (unlikely for click)
-             # but commonly we use asyncio.run for entry points.
-             # If we are here, we might just be able to create a task? No, return value.
-             # For CLI tool, just run_until_complete is fine.
-             pass
-
-        loop.run_until_complete(_render_layers())
+        except BaseException:
+            BUFFER_POOL.release(canvas)
+            raise
 
         return canvas
+
+    @staticmethod
+    def release(image: Image.Image):
+        """Hand a rendered canvas back for reuse once it has been exported."""
+        BUFFER_POOL.release(image)
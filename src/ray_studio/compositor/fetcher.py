@@ -0,0 +1,191 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+import weakref
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+from .. import tracing
+
+logger = logging.getLogger(__name__)
+
+def default_cache_dir() -> str:
+    return os.getenv("RAY_STUDIO_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "ray-studio")
+
+class _LoopState:
+    """Per-event-loop resources; httpx clients and asyncio primitives can't cross loops."""
+
+    def __init__(self, fetcher: "AssetFetcher"):
+        self.client = httpx.AsyncClient(
+            timeout=fetcher.timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=fetcher.max_connections),
+        )
+        self.hosts: Dict[str, asyncio.Semaphore] = {}
+        self.inflight: Dict[str, asyncio.Task] = {}
+
+class AssetFetcher:
+    """
+    Downloads remote image sources into an on-disk cache.
+
+    All requests share one connection pool, each host gets at most
+    `per_host` concurrent downloads, cached files are revalidated with
+    ETag/Last-Modified according to Cache-Control/Expires, and concurrent
+    fetches of the same URL share a single request.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        per_host: int = 4,
+        max_connections: int = 32,
+        timeout: float = 30.0
+    ):
+        self.cache_dir = os.path.join(cache_dir or default_cache_dir(), "assets")
+        self.per_host = per_host
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._loops: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = weakref.WeakKeyDictionary()
+
+    def _state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        state = self._loops.get(loop)
+        if state is None:
+            state = self._loops[loop] = _LoopState(self)
+        return state
+
+    def cache_path(self, url: str) -> str:
+        """Local file a URL is cached at (extension kept so formats sniff normally)."""
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        ext = os.path.splitext(urlparse(url).path)[1][:8]
+        return os.path.join(self.cache_dir, digest + ext)
+
+    async def fetch(self, url: str) -> str:
+        """Return a local path holding the current content of `url`."""
+        state = self._state()
+        task = state.inflight.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(state, url))
+            state.inflight[url] = task
+            task.add_done_callback(lambda _: state.inflight.pop(url, None))
+        else:
+            tracing.count("fetch.coalesced")
+        # Shield so one cancelled caller doesn't cancel the shared download
+        return await asyncio.shield(task)
+
+    async def _fetch(self, state: _LoopState, url: str) -> str:
+        path = self.cache_path(url)
+        meta = self._read_meta(path)
+        if meta and os.path.exists(path) and time.time() < meta.get("expires", 0):
+            tracing.count("fetch.cache_hit")
+            return path
+
+        headers = {}
+        if meta and os.path.exists(path):
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        host = urlparse(url).netloc
+        semaphore = state.hosts.setdefault(host, asyncio.Semaphore(self.per_host))
+        async with semaphore:
+            with tracing.span("fetch.download", host=host):
+                async with state.client.stream("GET", url, headers=headers) as response:
+                    if response.status_code == 304:
+                        tracing.count("fetch.revalidated")
+                        self._write_meta(path, url, response, previous=meta)
+                        return path
+                    response.raise_for_status()
+                    await self._stream_to(path, response)
+
+        self._write_meta(path, url, response)
+        return path
+
+    async def _stream_to(self, path: str, response: httpx.Response):
+        """Write the body to a temp file and atomically move it into place."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".part")
+        try:
+            size = 0
+            with os.fdopen(fd, "wb") as f:
+                async for chunk in response.aiter_bytes():
+                    f.write(chunk)
+                    size += len(chunk)
+            os.replace(tmp, path)
+            tracing.count("fetch.bytes_downloaded", size)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    @staticmethod
+    def freshness(headers: httpx.Headers, now: float) -> float:
+        """Expiry timestamp from Cache-Control / Expires / Last-Modified headers."""
+        directives: Dict[str, Optional[str]] = {}
+        for part in headers.get("cache-control", "").split(","):
+            name, _, value = part.strip().partition("=")
+            if name:
+                directives[name.lower()] = value.strip('"') or None
+
+        if "no-store" in directives or "no-cache" in directives:
+            return 0
+        if directives.get("max-age"):
+            try:
+                age = float(headers.get("age", 0))
+                return now + float(directives["max-age"]) - age
+            except ValueError:
+                return 0
+        try:
+            if headers.get("expires"):
+                return parsedate_to_datetime(headers["expires"]).timestamp()
+            if headers.get("last-modified"):
+                # Heuristic freshness: 10% of the time since last modification
+                modified = parsedate_to_datetime(headers["last-modified"]).timestamp()
+                return now + max(0.0, now - modified) * 0.1
+        except (TypeError, ValueError):
+            pass
+        return 0
+
+    def _read_meta(self, path: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path + ".json", "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, path: str, url: str, response: httpx.Response, previous: Optional[Dict[str, Any]] = None):
+        meta = dict(previous or {})
+        meta["url"] = url
+        # A 304 may omit validators; keep the ones we already have
+        for key, header in (("etag", "etag"), ("last_modified", "last-modified")):
+            if response.headers.get(header):
+                meta[key] = response.headers[header]
+        meta["expires"] = self.freshness(response.headers, time.time())
+        if "no-store" in response.headers.get("cache-control", ""):
+            meta.pop("etag", None)
+            meta.pop("last_modified", None)
+        with open(path + ".json", "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+    async def aclose(self):
+        """Close the connection pool of the running loop."""
+        state = self._loops.pop(asyncio.get_running_loop(), None)
+        if state:
+            await state.client.aclose()
+
+_default_fetcher: Optional[AssetFetcher] = None
+
+def get_fetcher() -> AssetFetcher:
+    """Process-wide fetcher so every render shares the pool and disk cache."""
+    global _default_fetcher
+    if _default_fetcher is None:
+        _default_fetcher = AssetFetcher()
+    return _default_fetcher
@@ -0,0 +1,118 @@
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Tuple
+
+import numpy as np
+from PIL import Image, ImageChops, ImageColor
+
+from .cache import ImageCache
+
+# Longest side gradient fields are evaluated at before a bilinear upscale.
+# Bilinear interpolation of a linear ramp is exact, so only the curvature of
+# radial falloffs and mesh smoothing is approximated.
+DETAIL = 256
+
+GRADIENT_CACHE = ImageCache("gradient", max_bytes=64 * 1024 * 1024)
+
+@dataclass(frozen=True)
+class GradientSpec:
+    """Hashable description of a gradient fill."""
+
+    kind: str = "linear"  # linear, radial, mesh
+    colors: Tuple[str, ...] = ("#000000", "#FFFFFF")
+    angle: float = 90.0  # linear only; degrees, 0 = left to right, 90 = top to bottom
+    center: Tuple[float, float] = (0.5, 0.5)  # radial only; fractions of width/height
+    radius: float = 1.0  # radial only; fraction of the distance to the farthest corner
+    dither: bool = True  # +/-1 level of grain to hide 8-bit banding
+    noise: int = 0  # extra grain amplitude in 8-bit levels
+
+def render_gradient(spec: GradientSpec, size: Tuple[int, int]) -> Image.Image:
+    """
+    Render `spec` as an RGB image of `size`, cached per (spec, size).
+    The returned image is shared: paste it, don't draw on it.
+    """
+    return GRADIENT_CACHE.get_or_create((spec, size), lambda: _render(spec, size))
+
+def _render(spec: GradientSpec, size: Tuple[int, int]) -> Image.Image:
+    width, height = size
+    scale = min(1.0, DETAIL / max(width, height))
+    fw, fh = max(2, round(width * scale)), max(2, round(height * scale))
+
+    # Pixel-centre coordinates of the reduced field, in full-size pixel units
+    xs = ((np.arange(fw, dtype=np.float32) + 0.5) * (width / fw))[None, :]
+    ys = ((np.arange(fh, dtype=np.float32) + 0.5) * (height / fh))[:, None]
+    colors = np.array([ImageColor.getrgb(c)[:3] for c in spec.colors] or [(0, 0, 0)], dtype=np.float32)
+
+    if spec.kind == "mesh":
+        field = _mesh(colors, xs / width, ys / height)
+    else:
+        if spec.kind == "radial":
+            t = _radial(spec, xs, ys, width, height)
+        elif spec.kind == "linear":
+            t = _linear(spec, xs, ys, width, height)
+        else:
+            raise ValueError(f"Unknown gradient type: {spec.kind}")
+        field = _stops(colors, t)
+
+    img = Image.fromarray(np.clip(field + 0.5, 0, 255).astype(np.uint8), "RGB")
+    if img.size != size:
+        img = img.resize(size, Image.Resampling.BILINEAR)
+
+    amplitude = spec.noise or (1 if spec.dither else 0)
+    if amplitude:
+        img = ImageChops.add(img, _grain(size, amplitude), scale=1.0, offset=-amplitude)
+    return img
+
+def _linear(spec: GradientSpec, xs, ys, width: int, height: int) -> np.ndarray:
+    """Position along the gradient line, 0..1 corner to corner like CSS."""
+    theta = math.radians(spec.angle)
+    cos, sin = math.cos(theta), math.sin(theta)
+    length = abs(width * cos) + abs(height * sin)
+    proj = (xs - width / 2) * cos + (ys - height / 2) * sin
+    return np.clip(proj / length + 0.5, 0, 1)
+
+def _radial(spec: GradientSpec, xs, ys, width: int, height: int) -> np.ndarray:
+    """Distance from the centre, 0..1 at `radius` times the farthest corner."""
+    cx, cy = spec.center[0] * width, spec.center[1] * height
+    farthest = math.hypot(max(cx, width - cx), max(cy, height - cy))
+    radius = max(farthest * spec.radius, 1e-6)
+    return np.clip(np.sqrt((xs - cx) ** 2 + (ys - cy) ** 2) / radius, 0, 1)
+
+def _stops(colors: np.ndarray, t: np.ndarray) -> np.ndarray:
+    """Map positions to colours with evenly spaced stops."""
+    if len(colors) == 1:
+        return np.broadcast_to(colors[0], t.shape + (3,)).astype(np.float32)
+    stops = np.linspace(0, 1, len(colors), dtype=np.float32)
+    return np.stack([np.interp(t, stops, colors[:, c]) for c in range(3)], axis=-1)
+
+def _mesh(colors: np.ndarray, u: np.ndarray, v: np.ndarray) -> np.ndarray:
+    """Smooth bilinear blend of a colour grid laid out row-major over the canvas."""
+    n = len(colors)
+    cols = max(2, math.ceil(math.sqrt(n)))
+    rows = max(2, math.ceil(n / cols))
+    if n == 2:
+        grid = colors[[0, 1, 1, 0]].reshape(2, 2, 3)
+    else:
+        grid = colors[np.arange(rows * cols) % n].reshape(rows, cols, 3)
+
+    def smooth(f):
+        return f * f * (3 - 2 * f)
+
+    gx = u[0] * (cols - 1)
+    ix = np.minimum(gx.astype(np.int64), cols - 2)
+    fx = smooth(gx - ix)[None, :, None]
+    across = grid[:, ix] * (1 - fx) + grid[:, ix + 1] * fx  # (rows, fw, 3)
+
+    gy = v[:, 0] * (rows - 1)
+    iy = np.minimum(gy.astype(np.int64), rows - 2)
+    fy = smooth(gy - iy)[:, None, None]
+    return across[iy] * (1 - fy) + across[iy + 1] * fy
+
+@lru_cache(maxsize=4)
+def _grain(size: Tuple[int, int], amplitude: int) -> Image.Image:
+    """Uniform 0..2*amplitude noise, tiled from a fixed 128px tile."""
+    width, height = size
+    tile = np.random.default_rng(0).integers(0, 2 * amplitude + 1, (128, 128, 3), dtype=np.uint8)
+    reps = (math.ceil(height / 128), math.ceil(width / 128), 1)
+    return Image.fromarray(np.tile(tile, reps)[:height, :width], "RGB")
@@ -0,0 +1,121 @@
+import math
+import os
+from typing import BinaryIO, Optional, Tuple, Union
+from urllib.parse import unquote, urlparse
+from PIL import Image
+from .cache import ImageCache
+from .svg import is_svg, rasterise_svg, read_svg, svg_size
+from .. import tracing
+
+# Box dimensions; None means "auto" (follow the image's aspect ratio)
+BoxSize = Tuple[Optional[int], Optional[int]]
+
+FIT_MODES = ("contain", "cover", "stretch")
+
+IMAGE_CACHE = ImageCache("image", max_bytes=256 * 1024 * 1024)
+
+def local_path(source: str) -> str:
+    """Turn a plain path or file:// URL into an absolute filesystem path."""
+    if source.startswith("file://"):
+        source = unquote(urlparse(source).path)
+    return os.path.abspath(os.path.expanduser(source))
+
+def load_image(source: str, box: BoxSize = (None, None), fit: str = "contain") -> Image.Image:
+    """
+    Decode a local image sized for `box` using `fit`; SVGs are rasterised at that size.
+    Results are cached per (path, mtime, box, fit), so a brand logo is decoded
+    once per process. The returned image is shared: paste it, don't draw on it.
+    """
+    if fit not in FIT_MODES:
+        raise ValueError(f"Unknown fit mode: {fit} (available: {', '.join(FIT_MODES)})")
+    path = local_path(source)
+    key = (path, os.stat(path).st_mtime_ns, box, fit)
+    decode = _decode_svg if is_svg(path) else decode_image
+    return IMAGE_CACHE.get_or_create(key, lambda: decode(path, box, fit))
+
+def fitted_size(image_size: Tuple[int, int], box: BoxSize, fit: str) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+    """
+    Return (scaled, final) sizes: the image scaled as a whole, and the size
+    after cropping (`cover` crops the overflow; other modes don't crop).
+    """
+    iw, ih = image_size
+    bw, bh = box
+    if bw is None and bh is None:
+        return (iw, ih), (iw, ih)
+    if bw is None:
+        bw = max(1, round(iw * bh / ih))
+    elif bh is None:
+        bh = max(1, round(ih * bw / iw))
+    elif fit == "contain":
+        scale = min(bw / iw, bh / ih)
+        size = (max(1, round(iw * scale)), max(1, round(ih * scale)))
+        return size, size
+    elif fit == "cover":
+        scale = max(bw / iw, bh / ih)
+        return (max(1, math.ceil(iw * scale)), max(1, math.ceil(ih * scale))), (bw, bh)
+    return (bw, bh), (bw, bh)
+
+def decode_image(
+    source: Union[str, BinaryIO],
+    box: BoxSize,
+    fit: str = "contain",
+    resample: Image.Resampling = Image.Resampling.LANCZOS
+) -> Image.Image:
+    """
+    Decode a path or file object sized for `box`, never holding a full-size
+    copy when a smaller one will do. The result is RGB, or RGBA if the
+    image has alpha.
+    """
+    with tracing.span("image.decode"), Image.open(source) as img:
+        scaled, final = fitted_size(img.size, box, fit)
+        has_alpha = img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info
+        mode = "RGBA" if has_alpha else "RGB"
+
+        # JPEG: let libjpeg decode at the smallest 1/2, 1/4, 1/8 scale still >= `scaled`
+        img.draft(img.mode, scaled)
+        if img.mode not in ("L", "RGB", "RGBA", "CMYK"):
+            # Palette, bilevel, LA and 16-bit images can't be reduced or resampled as they are
+            img = img.convert(mode)
+        # Other formats (or what draft left over): cheap integer box reduction first
+        factor = min(img.width // scaled[0], img.height // scaled[1])
+        if factor >= 2:
+            img = img.reduce(factor)
+        if img.size != scaled:
+            img = img.resize(scaled, resample)
+        img = _crop_center(img, final)
+
+        if img.mode != mode:
+            return img.convert(mode)
+        # Already the right mode; just make sure pixels are read before the file closes
+        img.load()
+        return img
+
+def _decode_svg(path: str, box: BoxSize, fit: str) -> Image.Image:
+    data = read_svg(path)
+    scaled, final = fitted_size(svg_size(data), box, fit)
+    # Vector source: rasterise straight at the target size instead of resampling
+    return _crop_center(rasterise_svg(data, scaled), final)
+
+def _crop_center(img: Image.Image, size: Tuple[int, int]) -> Image.Image:
+    if img.size == size:
+        return img
+    left, top = (img.width - size[0]) // 2, (img.height - size[1]) // 2
+    return img.crop((left, top, left + size[0], top + size[1]))
+
+def paste_image(canvas: Image.Image, image: Image.Image, dest: Tuple[int, int]):
+    """Composite `image` onto an RGB or RGBA canvas at `dest`, clipping anything off the edge."""
+    x, y = int(dest[0]), int(dest[1])
+    left, top = max(0, -x), max(0, -y)
+    right = min(image.width, canvas.width - x)
+    bottom = min(image.height, canvas.height - y)
+    if right <= left or bottom <= top:
+        return
+    if (left, top, right, bottom) != (0, 0, image.width, image.height):
+        image = image.crop((left, top, right, bottom))
+    if image.mode == "RGBA" and canvas.mode == "RGBA":
+        canvas.alpha_composite(image, (x + left, y + top))
+    elif image.mode == "RGBA":
+        # Opaque canvas: blending by the image's alpha gives the same pixels
+        canvas.paste(image, (x + left, y + top), image)
+    else:
+        canvas.paste(image, (x + left, y + top))
@@ -1,17 +1,42 @@
-from PIL import Image, ImageDraw
-import io
-import httpx
-from typing import Dict, Any, Tuple
+from PIL import Image, ImageColor, ImageDraw
+import logging
+from typing import Dict, Any, List, Optional, Sequence, Tuple
 from ..templates.base import Layer
 from ..dna.schema import BrandDNA
 from .text import TextRenderer
+from .gradients import GradientSpec, render_gradient
+from .effects import EffectRenderer
+from .images import BoxSize, load_image, local_path, paste_image
+from .fetcher import AssetFetcher, get_fetcher
+from ..buffers import BUFFER_POOL
+from .. import tracing
+
+logger = logging.getLogger(__name__)
+
+# Smallest side requested from generators for reduced-scale (draft) renders
+MIN_GENERATOR_SIDE = 256
+
+# Effect parameters measured in pixels
+PIXEL_EFFECT_PARAMS = ("radius", "offset")
 
 class LayerRenderer:
     """Handles rendering of individual layers."""
 
-    def __init__(self, dna: BrandDNA):
+    def __init__(
+        self,
+        dna: BrandDNA,
+        fetcher: Optional[AssetFetcher] = None,
+        seed: Optional[int] = None,
+        scale: float = 1.0
+    ):
         self.dna = dna
+        # Forwarded to the generator so backgrounds are reproducible
+        self.seed = seed
+        # Canvas scale relative to full resolution; template pixel values are multiplied by it
+        self.scale = scale
+        self.fetcher = fetcher or get_fetcher()
         self.text_renderer = TextRenderer()
+        self.effect_renderer = EffectRenderer()
 
     def resolve_value(self, value: Any, inputs: Dict[str, Any]) -> Any:
         """Resolve variables in value string like {input.headline} or {dna.colors.primary}."""
@@ -58,6 +83,138 @@ class LayerRenderer:
                 return None
         return None
 
+    def gradient_spec(self, layer: Layer, inputs: Dict[str, Any]) -> GradientSpec:
+        """Build a gradient spec from layer props, defaulting to the primary/secondary DNA colours."""
+        colors = getattr(layer, "colors", None) or ["dna.brand.colors.primary", "dna.brand.colors.secondary"]
+        center = getattr(layer, "center", None) or (0.5, 0.5)
+
+        def prop(name: str, default: Any) -> Any:
+            # `angle: null` in a template means "use the default", like a missing key
+            value = getattr(layer, name, None)
+            return value if value is not None else default
+
+        return GradientSpec(
+            kind=getattr(layer, "gradient", None) or "linear",
+            colors=tuple(str(self.resolve_value(c, inputs)) for c in colors),
+            angle=float(prop("angle", 90)),
+            center=(float(center[0]), float(center[1])),
+            radius=float(prop("radius", 1.0)),
+            dither=bool(prop("dither", True)),
+            noise=int(prop("noise", 0)),
+        )
+
+    def px(self, value: Any) -> int:
+        """Scale a template pixel value (None counts as 0) to the canvas."""
+        return round((value or 0) * self.scale)
+
+    def generator_size(self, size: Tuple[int, int]) -> Tuple[int, int]:
+        """
+        Size to request backgrounds at: the canvas itself at full scale;
+        for reduced-scale renders, the smallest size providers accept.
+        """
+        if self.scale >= 1:
+            return size
+        return tuple(max(MIN_GENERATOR_SIDE, -(-side // 16) * 16) for side in size)
+
+    @staticmethod
+    def box_size(size: Any, width: int, height: int, scale: float = 1.0) -> BoxSize:
+        """Parse a layer `size` ([w, h] of pixels, "50%" or "auto") against the canvas."""
+        if size is None:
+            return (None, None)
+        if isinstance(size, int):
+            return (round(size * scale), None)
+
+        def parse(value, total):
+            if isinstance(value, int):
+                return round(value * scale)
+            if isinstance(value, str) and value.endswith("%"):
+                return int(total * int(value[:-1]) / 100)
+            return None
+
+        return (parse(size[0], width), parse(size[1], height))
+
+    @staticmethod
+    def anchor(position: Optional[str], x: float, y: float, w: int, h: int) -> Tuple[int, int]:
+        """Top-left corner for a w x h box whose reference point for `position` is (x, y)."""
+        if position == "center":
+            return int(x - w / 2), int(y - h / 2)
+        if position == "bottom-center":
+            return int(x - w / 2), int(y - h)
+        if position == "bottom-right":
+            return int(x - w), int(y - h)
+        return int(x), int(y)
+
+    def requests(
+        self,
+        layers: Sequence[Layer],
+        inputs: Dict[str, Any],
+        canvas_size: Tuple[int, int]
+    ) -> Tuple[List[Tuple[str, Tuple[int, int]]], List[str]]:
+        """
+        Background (prompt, generator size) pairs and remote image URLs that
+        rendering `layers` will request, so they can be fetched ahead of it.
+        """
+        backgrounds, urls = [], []
+        for layer in layers:
+            source = self.resolve_value(layer.source, inputs) if layer.source else None
+            if layer.type == "background" and source == "ai_generate":
+                backgrounds.append((self.resolve_value(layer.prompt_template, inputs), self.generator_size(canvas_size)))
+            elif layer.type in ("logo", "image") and isinstance(source, str) and source.startswith(("http://", "https://")):
+                urls.append(source)
+        return backgrounds, urls
+
+    def local_sources(self, layers: Sequence[Layer], inputs: Dict[str, Any]) -> List[str]:
+        """Absolute paths of the local files that rendering `layers` reads for logo and image layers."""
+        paths = []
+        for layer in layers:
+            source = self.resolve_value(layer.source, inputs) if layer.source else None
+            if layer.type not in ("logo", "image") or not isinstance(source, str):
+                continue
+            if not source or source.startswith(("dna.", "input.", "http://", "https://")) or "{" in source:
+                continue
+            paths.append(local_path(source))
+        return paths
+
+    def canvas_mode(self, layers: Sequence[Layer], inputs: Dict[str, Any]) -> str:
+        """
+        Working mode for a canvas that starts opaque white: RGB unless a
+        layer writes its colour straight onto it with alpha below 255 (a
+        translucent solid fill, text or button colour). Image and effect
+        layers are composited, and gradients are opaque, so they never need it.
+        """
+        for layer in layers:
+            if layer.effects:
+                continue
+            if layer.type == "background" and layer.source == "solid":
+                colors = [layer.color, layer.background]
+            elif layer.type in ("text", "cta_button"):
+                colors = [layer.color, layer.background if layer.type == "cta_button" else None]
+            else:
+                continue
+            for color in colors:
+                if color is not None and not _opaque(self.resolve_value(color, inputs)):
+                    return "RGBA"
+        return "RGB"
+
+    async def fetch_source(self, source: str) -> Optional[str]:
+        """Download an http(s) source into the asset cache; None on failure."""
+        try:
+            return await self.fetcher.fetch(source)
+        except Exception as e:
+            logger.warning(f"Could not fetch image {source}: {e}")
+            return None
+
+    def load_layer_image(self, source: Optional[str], box: BoxSize, fit: str) -> Optional[Image.Image]:
+        """Load a local path or file:// source, or None if unset or unreadable."""
+        # Unresolved references ("dna.brand.logo.icon" with no icon set) mean "no image"
+        if not source or source.startswith(("dna.", "input.")) or "{" in source:
+            return None
+        try:
+            return load_image(source, box, fit)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load image {source}: {e}")
+            return None
+
     async def render_layer(
         self,
         canvas: Image.Image,
@@ -70,6 +227,40 @@ class LayerRenderer:
         Render a layer onto the canvas.
         Returns the bounding box of the rendered content (x1, y1, x2, y2).
         """
+        with tracing.span(f"layer.{layer.type}"):
+            if not layer.effects:
+                return await self._render_layer(canvas, layer, inputs, generator, prev_bbox)
+
+            # Effects need the layer on its own so its alpha and pixels can be processed
+            layer_image = BUFFER_POOL.acquire("RGBA", canvas.size, (0, 0, 0, 0))
+            try:
+                bbox = await self._render_layer(layer_image, layer, inputs, generator, prev_bbox)
+                effects = [self.scale_effect({k: self.resolve_value(v, inputs) for k, v in e.items()}) for e in layer.effects]
+                with tracing.span("layer.effects"):
+                    self.effect_renderer.composite(canvas, layer_image, effects)
+            finally:
+                # Effects keep crops and channels, never the layer buffer itself
+                BUFFER_POOL.release(layer_image)
+            return bbox
+
+    def scale_effect(self, effect: Dict[str, Any]) -> Dict[str, Any]:
+        if self.scale == 1:
+            return effect
+        for key in PIXEL_EFFECT_PARAMS:
+            if isinstance(effect.get(key), (int, float)):
+                effect[key] = effect[key] * self.scale
+            elif isinstance(effect.get(key), list):
+                effect[key] = [v * self.scale for v in effect[key]]
+        return effect
+
+    async def _render_layer(
+        self,
+        canvas: Image.Image,
+        layer: Layer,
+        inputs: Dict[str, Any],
+        generator,
+        prev_bbox: Tuple[int, int, int, int] = None
+    ) -> Tuple[int, int, int, int]:
         draw = ImageDraw.Draw(canvas)
         width, height = canvas.size
 
@@ -86,48 +277,65 @@ class LayerRenderer:
             x = width / 2
             y = height / 2
         elif layer.position == "top-left":
-            x = layer.margin or 0
-            y = layer.margin or 0
+            x = self.px(layer.margin)
+            y = self.px(layer.margin)
         elif layer.position == "bottom-center":
             x = width / 2
-            y = height - (layer.margin_bottom or 0) - (layer.padding[1]*2 if isinstance(layer.padding, list) else 0) # Rough estimate
+            y = height - self.px(layer.margin_bottom) - (self.px(layer.padding[1])*2 if isinstance(layer.padding, list) else 0) # Rough estimate
         elif layer.position == "below_previous" and prev_bbox:
             x = width / 2 # Default to center x for now
-            y = prev_bbox[3] + (layer.margin_top or 0)
+            y = prev_bbox[3] + self.px(layer.margin_top)
         elif layer.position == "bottom-right":
-            x = width - (layer.margin or 0)
-            y = height - (layer.margin or 0)
+            x = width - self.px(layer.margin)
+            y = height - self.px(layer.margin)
         elif layer.position == "left":
             x = 0
             y = 0 # Fills height usually
         elif layer.position == "right-top":
              x = width / 2 # Split layout assumption
-             y = (layer.margin_top or 0)
+             y = self.px(layer.margin_top)
 
         bbox = (int(x), int(y), int(x), int(y))
 
         if layer.type == "background":
             if source == "solid":
-                canvas.paste(Image.new("RGBA", canvas.size, color or background_color), (0, 0))
+                # Filled in place; no full-size fill image
+                canvas.paste(color or background_color, (0, 0) + canvas.size)
+                bbox = (0, 0, width, height)
+            elif source == "gradient":
+                spec = self.gradient_spec(layer, inputs)
+                canvas.paste(render_gradient(spec, canvas.size), (0, 0))
                 bbox = (0, 0, width, height)
             elif source == "ai_generate" and generator:
                 prompt = self.resolve_value(layer.prompt_template, inputs)
                 try:
-                    img_bytes = await generator.generate(prompt, size=canvas.size)
-                    img = Image.open(io.BytesIO(img_bytes)).convert("RGBA")
-                    img = img.resize(canvas.size) # Ensure fit
-                    canvas.paste(img, (0, 0))
+                    # Decoded straight to the canvas size; opaque images stay RGB
+                    img = await generator.generate_image(
+                        prompt,
+                        size=self.generator_size(canvas.size),
+                        seed=self.seed,
+                        box=canvas.size,
+                        # Drafts trade resampling quality for speed
+                        resample=Image.Resampling.BILINEAR if self.scale < 1 else Image.Resampling.BICUBIC
+                    )
+                    if img.mode == "RGBA" and canvas.mode == "RGB":
+                        # Opaque canvas: composite over it as a JPEG export would
+                        canvas.paste(img, (0, 0), img)
+                    else:
+                        canvas.paste(img, (0, 0))
                     bbox = (0, 0, width, height)
                 except Exception as e:
-                    print(f"Failed to generate background: {e}")
+                    logger.warning(f"Failed to generate background: {e}")
                     # Fallback
-                    canvas.paste(Image.new("RGBA", canvas.size, "#CCCCCC"), (0, 0))
+                    canvas.paste("#CCCCCC", (0, 0) + canvas.size)
 
         elif layer.type == "text" and content:
             font_name = self.resolve_value(layer.font, inputs)
             max_w = layer.max_width
             if isinstance(max_w, str) and max_w.endswith("%"):
                 max_w = int(width * int(max_w[:-1]) / 100)
+            elif isinstance(max_w, int):
+                max_w = self.px(max_w)
 
             # Anchor mapping
             anchor = "center" if layer.position == "center" or layer.position == "bottom-center" or layer.position == "below_previous" else None
@@ -139,25 +347,25 @@ class LayerRenderer:
                 content,
                 (x, y),
                 font_name,
-                layer.size,
+                max(1, self.px(layer.size)),
                 color,
                 max_width=max_w,
                 anchor=anchor
             )
             # Rough bbox estimation
-            bbox = (int(x), int(y), int(x) + (max_w or 100), int(end_y))
+            bbox = (int(x), int(y), int(x) + (max_w or self.px(100)), int(end_y))
 
         elif layer.type == "cta_button":
             # Draw rect
             # Determine text size first to size the button
             text = self.resolve_value(layer.text, inputs)
-            font_size = 24 # Default
+            font_size = self.px(24) # Default
             # Calculate button size
-            btn_w, btn_h = 200, 60 # Defaults
+            btn_w, btn_h = self.px(200), self.px(60) # Defaults
 
-            pad_x, pad_y = (20, 10)
+            pad_x, pad_y = self.px(20), self.px(10)
             if isinstance(layer.padding, list):
-                pad_x, pad_y = layer.padding
+                pad_x, pad_y = (self.px(p) for p in layer.padding)
 
             # Draw button rect
             btn_x = x - btn_w / 2
@@ -183,20 +391,27 @@ class LayerRenderer:
             bbox = (int(btn_x), int(btn_y), int(btn_x + btn_w), int(btn_y + btn_h))
 
         elif layer.type == "logo" or layer.type == "image":
-             # In a real app, load image from path or URL
-             # Here we placeholder with a rect
-             w, h = 100, 100
-             if isinstance(layer.size, list):
-                 w_val, h_val = layer.size
-                 w = w_val if isinstance(w_val, int) else 100
-                 h = h_val if isinstance(h_val, int) else 100
-
-                 if isinstance(layer.size[0], str) and layer.size[0].endswith("%"):
-                     w = int(width * int(layer.size[0][:-1]) / 100)
-                 if isinstance(layer.size[1], str) and layer.size[1].endswith("%"):
-                     h = int(height * int(layer.size[1][:-1]) / 100)
-
-             draw.rectangle([x, y, x + w, y + h], fill="#888888", outline="black")
-             bbox = (int(x), int(y), int(x + w), int(y + h))
+             box = self.box_size(layer.size, width, height, self.scale)
+             if source and source.startswith(("http://", "https://")):
+                 source = await self.fetch_source(source)
+             img = self.load_layer_image(source, box, getattr(layer, "fit", None) or "contain")
+
+             if img is None:
+                 # Placeholder so layouts stay reviewable without assets
+                 w, h = box[0] or self.px(100), box[1] or self.px(100)
+                 left, top = self.anchor(layer.position, x, y, w, h)
+                 draw.rectangle([left, top, left + w, top + h], fill="#888888", outline="black")
+             else:
+                 w, h = img.size
+                 left, top = self.anchor(layer.position, x, y, w, h)
+                 paste_image(canvas, img, (left, top))
+             bbox = (left, top, left + w, top + h)
 
         return bbox
+
+def _opaque(color: Any) -> bool:
+    """Whether a resolved colour is fully opaque; unparseable ones count as not."""
+    try:
+        return ImageColor.getcolor(str(color), "RGBA")[3] == 255
+    except ValueError:
+        return False
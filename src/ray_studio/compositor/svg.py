@@ -0,0 +1,505 @@
+import gzip
+import hashlib
+import importlib.util
+import io
+import math
+import os
+import re
+import xml.etree.ElementTree as ET
+from typing import Callable, Dict, List, Optional, Tuple
+
+from PIL import Image, ImageChops, ImageColor, ImageDraw
+
+from .cache import ImageCache
+from .. import tracing
+
+Size = Tuple[int, int]
+Point = Tuple[float, float]
+Matrix = Tuple[float, float, float, float, float, float]  # (a, b, c, d, e, f) as in SVG matrix()
+Subpath = Tuple[List[Point], bool]  # (points, closed)
+
+IDENTITY: Matrix = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+# The builtin rasteriser draws at this multiple of the target size and box-reduces for anti-aliasing
+SUPERSAMPLE = 4
+# Line segments per Bezier curve
+CURVE_SEGMENTS = 16
+
+SVG_CACHE = ImageCache("svg", max_bytes=64 * 1024 * 1024)
+
+def is_svg(path: str) -> bool:
+    """True for .svg/.svgz files, or extensionless files that sniff as SVG (e.g. cached URLs)."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".svg", ".svgz"):
+        return True
+    if ext:
+        return False
+    try:
+        with open(path, "rb") as f:
+            head = f.read(1024)
+    except OSError:
+        return False
+    return head[:2] == b"\x1f\x8b" or b"<svg" in head
+
+def read_svg(path: str) -> bytes:
+    with open(path, "rb") as f:
+        data = f.read()
+    return gzip.decompress(data) if data[:2] == b"\x1f\x8b" else data
+
+def parse_svg(data: bytes) -> ET.Element:
+    """Parse SVG markup; malformed documents raise ValueError like other bad images."""
+    try:
+        return ET.fromstring(data)
+    except ET.ParseError as e:
+        raise ValueError(f"Malformed SVG: {e}") from e
+
+def svg_size(data: bytes) -> Size:
+    """Intrinsic pixel size from width/height, falling back to the viewBox, then 300x150."""
+    root = parse_svg(data)
+    viewbox = _viewbox(root)
+    width, height = _absolute(root.get("width")), _absolute(root.get("height"))
+    if width is None and height is None:
+        if viewbox:
+            width, height = viewbox[2], viewbox[3]
+        else:
+            width, height = 300.0, 150.0
+    elif width is None:
+        width = height * viewbox[2] / viewbox[3] if viewbox else 300.0
+    elif height is None:
+        height = width * viewbox[3] / viewbox[2] if viewbox else 150.0
+    return max(1, round(width)), max(1, round(height))
+
+def rasterise_svg(data: bytes, size: Size, rasteriser: Optional[str] = None) -> Image.Image:
+    """
+    Rasterise SVG `data` at exactly `size` as RGBA, cached per (content hash, width, height).
+    The returned image is shared: paste it, don't draw on it.
+    """
+    name = resolve_rasteriser(rasteriser)
+    digest = hashlib.sha256(data).hexdigest()
+
+    def render():
+        with tracing.span("svg.rasterise", rasteriser=name):
+            return RASTERISERS[name](data, size)
+
+    return SVG_CACHE.get_or_create((digest, size[0], size[1], name), render)
+
+def resolve_rasteriser(name: Optional[str] = None) -> str:
+    """
+    Pick a rasteriser: `name`, else the RAY_STUDIO_SVG_RASTERISER env var,
+    else cairosvg when installed, else the builtin one.
+    """
+    name = (name or os.getenv("RAY_STUDIO_SVG_RASTERISER") or "").lower()
+    if not name:
+        name = "cairosvg" if importlib.util.find_spec("cairosvg") else "builtin"
+    if name not in RASTERISERS:
+        raise ValueError(f"Unknown SVG rasteriser: {name} (available: {', '.join(RASTERISERS)})")
+    return name
+
+def rasterise_cairosvg(data: bytes, size: Size) -> Image.Image:
+    import cairosvg
+
+    png = cairosvg.svg2png(bytestring=data, output_width=size[0], output_height=size[1])
+    return Image.open(io.BytesIO(png)).convert("RGBA")
+
+def rasterise_builtin(data: bytes, size: Size) -> Image.Image:
+    """
+    Pure-Python fallback for simple logos: rect, circle, ellipse, line,
+    polyline, polygon and path inside nested groups, with transforms,
+    solid fills/strokes and opacity. Gradient paints use their first stop;
+    both fill rules are drawn even-odd; text, clipping, masks and `use`
+    are ignored.
+    """
+    root = parse_svg(data)
+    width, height = size
+    canvas = Image.new("RGBA", (width * SUPERSAMPLE, height * SUPERSAMPLE), (0, 0, 0, 0))
+
+    # viewBox -> canvas, preserveAspectRatio="xMidYMid meet"
+    vx, vy, vw, vh = _viewbox(root) or (0.0, 0.0) + tuple(float(v) for v in svg_size(data))
+    scale = min(canvas.width / vw, canvas.height / vh)
+    tx = (canvas.width - vw * scale) / 2 - vx * scale
+    ty = (canvas.height - vh * scale) / 2 - vy * scale
+
+    painter = _Painter(canvas, _paint_servers(root), (vw, vh))
+    painter.draw_children(root, (scale, 0.0, 0.0, scale, tx, ty), dict(_DEFAULT_STYLE))
+    return canvas.reduce(SUPERSAMPLE)
+
+RASTERISERS: Dict[str, Callable[[bytes, Size], Image.Image]] = {
+    "cairosvg": rasterise_cairosvg,
+    "builtin": rasterise_builtin,
+}
+
+# --- builtin rasteriser ---
+
+_DEFAULT_STYLE = {
+    "fill": "black",
+    "stroke": "none",
+    "stroke-width": "1",
+    "fill-opacity": "1",
+    "stroke-opacity": "1",
+    "opacity": "1",
+}
+_INHERITED = ("fill", "stroke", "stroke-width", "fill-opacity", "stroke-opacity")
+_CONTAINERS = {"svg", "g", "a"}
+_SHAPES = {"rect", "circle", "ellipse", "line", "polyline", "polygon", "path"}
+
+_NUMBER = r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?"
+_PATH_TOKEN = re.compile(rf"[MmZzLlHhVvCcSsQqTtAa]|{_NUMBER}")
+_TRANSFORM = re.compile(r"(matrix|translate|scale|rotate|skewX|skewY)\s*\(([^)]*)\)")
+
+def _tag(element: ET.Element) -> str:
+    return element.tag.rsplit("}", 1)[-1]
+
+def _numbers(value: str) -> List[float]:
+    return [float(v) for v in re.findall(_NUMBER, value or "")]
+
+def _absolute(value: Optional[str]) -> Optional[float]:
+    """Unitless or px length; None for missing, relative or unsupported units."""
+    match = re.fullmatch(rf"\s*({_NUMBER})\s*(px)?\s*", value or "")
+    return float(match.group(1)) if match else None
+
+def _viewbox(root: ET.Element) -> Optional[Tuple[float, float, float, float]]:
+    values = _numbers(root.get("viewBox", ""))
+    if len(values) == 4 and values[2] > 0 and values[3] > 0:
+        return tuple(values)
+    return None
+
+def _paint_servers(root: ET.Element) -> Dict[str, str]:
+    """Map gradient ids to their first stop colour."""
+    servers = {}
+    for element in root.iter():
+        if _tag(element) in ("linearGradient", "radialGradient") and element.get("id"):
+            for stop in element:
+                if _tag(stop) == "stop":
+                    color = _style(stop).get("stop-color") or stop.get("stop-color") or "black"
+                    servers[element.get("id")] = color
+                    break
+    return servers
+
+def _style(element: ET.Element) -> Dict[str, str]:
+    """Presentation attributes overridden by the inline `style` declarations."""
+    style = {k: v for k, v in element.attrib.items() if k in _DEFAULT_STYLE or k in ("stop-color", "fill-rule", "display", "visibility")}
+    for declaration in element.get("style", "").split(";"):
+        name, _, value = declaration.partition(":")
+        if value.strip():
+            style[name.strip()] = value.strip()
+    return style
+
+def _multiply(m: Matrix, n: Matrix) -> Matrix:
+    """m after n."""
+    return (
+        m[0] * n[0] + m[2] * n[1],
+        m[1] * n[0] + m[3] * n[1],
+        m[0] * n[2] + m[2] * n[3],
+        m[1] * n[2] + m[3] * n[3],
+        m[0] * n[4] + m[2] * n[5] + m[4],
+        m[1] * n[4] + m[3] * n[5] + m[5],
+    )
+
+def parse_transform(value: Optional[str]) -> Matrix:
+    matrix = IDENTITY
+    for name, args in _TRANSFORM.findall(value or ""):
+        v = _numbers(args)
+        if name == "matrix" and len(v) == 6:
+            t = tuple(v)
+        elif name == "translate" and v:
+            t = (1.0, 0.0, 0.0, 1.0, v[0], v[1] if len(v) > 1 else 0.0)
+        elif name == "scale" and v:
+            t = (v[0], 0.0, 0.0, v[1] if len(v) > 1 else v[0], 0.0, 0.0)
+        elif name == "rotate" and v:
+            a = math.radians(v[0])
+            t = (math.cos(a), math.sin(a), -math.sin(a), math.cos(a), 0.0, 0.0)
+            if len(v) == 3:
+                t = _multiply((1.0, 0.0, 0.0, 1.0, v[1], v[2]), _multiply(t, (1.0, 0.0, 0.0, 1.0, -v[1], -v[2])))
+        elif name == "skewX" and v:
+            t = (1.0, 0.0, math.tan(math.radians(v[0])), 1.0, 0.0, 0.0)
+        elif name == "skewY" and v:
+            t = (1.0, math.tan(math.radians(v[0])), 0.0, 1.0, 0.0, 0.0)
+        else:
+            continue
+        matrix = _multiply(matrix, t)
+    return matrix
+
+def _ellipse(cx: float, cy: float, rx: float, ry: float, start: float = 0.0, sweep: float = 2 * math.pi) -> List[Point]:
+    steps = max(4, math.ceil(abs(sweep) / (math.pi / 32)))
+    return [(cx + rx * math.cos(start + sweep * i / steps), cy + ry * math.sin(start + sweep * i / steps)) for i in range(steps + 1)]
+
+def _rect(x: float, y: float, w: float, h: float, rx: float, ry: float) -> List[Point]:
+    if rx <= 0 and ry <= 0:
+        return [(x, y), (x + w, y), (x + w, y + h), (x, y + h)]
+    rx, ry = min(rx or ry, w / 2), min(ry or rx, h / 2)
+    quarter = math.pi / 2
+    return (
+        _ellipse(x + w - rx, y + ry, rx, ry, -quarter, quarter)
+        + _ellipse(x + w - rx, y + h - ry, rx, ry, 0.0, quarter)
+        + _ellipse(x + rx, y + h - ry, rx, ry, quarter, quarter)
+        + _ellipse(x + rx, y + ry, rx, ry, 2 * quarter, quarter)
+    )
+
+def _arc(x1: float, y1: float, rx: float, ry: float, phi: float, large: bool, sweep: bool, x2: float, y2: float) -> List[Point]:
+    """Endpoint-parameterised elliptical arc as points (SVG spec, appendix B.2.4)."""
+    rx, ry = abs(rx), abs(ry)
+    if rx == 0 or ry == 0 or (x1, y1) == (x2, y2):
+        return [(x2, y2)]
+    c, s = math.cos(math.radians(phi)), math.sin(math.radians(phi))
+    dx, dy = (x1 - x2) / 2, (y1 - y2) / 2
+    x1p, y1p = c * dx + s * dy, -s * dx + c * dy
+    scale = x1p ** 2 / rx ** 2 + y1p ** 2 / ry ** 2
+    if scale > 1:
+        rx, ry = rx * math.sqrt(scale), ry * math.sqrt(scale)
+    num = rx ** 2 * ry ** 2 - rx ** 2 * y1p ** 2 - ry ** 2 * x1p ** 2
+    den = rx ** 2 * y1p ** 2 + ry ** 2 * x1p ** 2
+    coef = math.sqrt(max(0.0, num / den)) if den else 0.0
+    if large == sweep:
+        coef = -coef
+    cxp, cyp = coef * rx * y1p / ry, -coef * ry * x1p / rx
+    cx, cy = c * cxp - s * cyp + (x1 + x2) / 2, s * cxp + c * cyp + (y1 + y2) / 2
+
+    start = math.atan2((y1p - cyp) / ry, (x1p - cxp) / rx)
+    delta = math.atan2((-y1p - cyp) / ry, (-x1p - cxp) / rx) - start
+    if sweep and delta < 0:
+        delta += 2 * math.pi
+    elif not sweep and delta > 0:
+        delta -= 2 * math.pi
+
+    points = []
+    for x, y in _ellipse(0.0, 0.0, rx, ry, start, delta)[1:]:
+        points.append((cx + c * x - s * y, cy + s * x + c * y))
+    return points
+
+def _bezier(p0: Point, *controls: Point) -> List[Point]:
+    """Flatten a quadratic or cubic Bezier from p0 (excluded) to the last control point."""
+    pts = (p0,) + controls
+    out = []
+    for i in range(1, CURVE_SEGMENTS + 1):
+        t = i / CURVE_SEGMENTS
+        level = list(pts)
+        while len(level) > 1:
+            level = [(a[0] + (b[0] - a[0]) * t, a[1] + (b[1] - a[1]) * t) for a, b in zip(level, level[1:])]
+        out.append(level[0])
+    return out
+
+def parse_path(d: str) -> List[Subpath]:
+    """Flatten path data into subpaths of points."""
+    tokens = _PATH_TOKEN.findall(d or "")
+    subpaths: List[Subpath] = []
+    points: Optional[List[Point]] = None
+    x = y = start_x = start_y = 0.0
+    command = None
+    control: Optional[Tuple[float, float, str]] = None  # last control point and curve kind, for S/T reflection
+    i = 0
+
+    def peek() -> str:
+        if i >= len(tokens):
+            raise ValueError(f"Path data ends mid-command: {d[-20:]}")
+        return tokens[i]
+
+    def number() -> float:
+        nonlocal i
+        value = peek()
+        try:
+            number = float(value)
+        except ValueError:
+            raise ValueError(f"Expected a number in path data, got {value!r}") from None
+        i += 1
+        return number
+
+    def flag() -> bool:
+        # Arc flags may be packed against what follows ("a1 1 0 011 1")
+        nonlocal i
+        token = peek()
+        if len(token) > 1:
+            tokens[i] = token[1:]
+        else:
+            i += 1
+        return token[0] == "1"
+
+    while i < len(tokens):
+        if tokens[i].isalpha():
+            command = tokens[i]
+            i += 1
+            if command in "Zz":
+                if points:
+                    subpaths.append((points, True))
+                points = None
+                x, y = start_x, start_y
+                control = None
+                continue
+        elif command is None:
+            raise ValueError(f"Path data must start with a command: {d[:20]}")
+
+        upper = command.upper()
+        ox, oy = (x, y) if command.islower() else (0.0, 0.0)
+        previous_control, control = control, None
+
+        if upper == "M":
+            if points:
+                subpaths.append((points, False))
+            x, y = ox + number(), oy + number()
+            start_x, start_y = x, y
+            points = [(x, y)]
+            # Further coordinate pairs are implicit line-tos
+            command = "l" if command.islower() else "L"
+            continue
+
+        if points is None:
+            points = [(x, y)]
+
+        if upper == "L":
+            x, y = ox + number(), oy + number()
+            points.append((x, y))
+        elif upper == "H":
+            x = ox + number()
+            points.append((x, y))
+        elif upper == "V":
+            y = oy + number()
+            points.append((x, y))
+        elif upper in ("C", "S"):
+            if upper == "C":
+                c1 = (ox + number(), oy + number())
+            else:
+                c1 = (2 * x - previous_control[0], 2 * y - previous_control[1]) if previous_control and previous_control[2] == "C" else (x, y)
+            c2 = (ox + number(), oy + number())
+            end = (ox + number(), oy + number())
+            points.extend(_bezier((x, y), c1, c2, end))
+            control = (c2[0], c2[1], "C")
+            x, y = end
+        elif upper in ("Q", "T"):
+            if upper == "Q":
+                c1 = (ox + number(), oy + number())
+            else:
+                c1 = (2 * x - previous_control[0], 2 * y - previous_control[1]) if previous_control and previous_control[2] == "Q" else (x, y)
+            end = (ox + number(), oy + number())
+            points.extend(_bezier((x, y), c1, end))
+            control = (c1[0], c1[1], "Q")
+            x, y = end
+        elif upper == "A":
+            rx, ry, phi = number(), number(), number()
+            large, sweep = flag(), flag()
+            end = (ox + number(), oy + number())
+            points.extend(_arc(x, y, rx, ry, phi, large, sweep, *end))
+            x, y = end
+
+    if points:
+        subpaths.append((points, False))
+    return subpaths
+
+class _Painter:
+    """Walks the element tree and draws shapes onto the supersampled canvas."""
+
+    def __init__(self, canvas: Image.Image, servers: Dict[str, str], viewport: Tuple[float, float]):
+        self.canvas = canvas
+        self.servers = servers
+        self.viewport = viewport
+
+    def draw_children(self, parent: ET.Element, matrix: Matrix, style: Dict[str, str]):
+        for element in parent:
+            tag = _tag(element)
+            if tag not in _CONTAINERS and tag not in _SHAPES:
+                continue  # defs, gradients, clipPath, text, use, ...
+            own = _style(element)
+            if own.get("display") == "none" or own.get("visibility") == "hidden":
+                continue
+            child = {k: v for k, v in style.items() if k in _INHERITED}
+            child.update(own)
+            child["opacity"] = str(float(style.get("opacity", 1)) * float(own.get("opacity", 1)))
+            child_matrix = _multiply(matrix, parse_transform(element.get("transform")))
+            if tag in _CONTAINERS:
+                self.draw_children(element, child_matrix, child)
+            else:
+                self.draw_shape(element, tag, child_matrix, child)
+
+    def length(self, element: ET.Element, name: str, axis: int = 0) -> float:
+        value = element.get(name, "0").strip()
+        if value.endswith("%"):
+            return float(value[:-1]) / 100 * self.viewport[axis]
+        numbers = _numbers(value)
+        return numbers[0] if numbers else 0.0
+
+    def subpaths(self, element: ET.Element, tag: str) -> List[Subpath]:
+        get = self.length
+        if tag == "path":
+            return parse_path(element.get("d", ""))
+        if tag == "rect":
+            w, h = get(element, "width"), get(element, "height", 1)
+            if w <= 0 or h <= 0:
+                return []
+            return [(_rect(get(element, "x"), get(element, "y", 1), w, h, get(element, "rx"), get(element, "ry", 1)), True)]
+        if tag == "circle":
+            r = get(element, "r")
+            return [(_ellipse(get(element, "cx"), get(element, "cy", 1), r, r), True)] if r > 0 else []
+        if tag == "ellipse":
+            rx, ry = get(element, "rx"), get(element, "ry", 1)
+            return [(_ellipse(get(element, "cx"), get(element, "cy", 1), rx, ry), True)] if rx > 0 and ry > 0 else []
+        if tag == "line":
+            return [([(get(element, "x1"), get(element, "y1", 1)), (get(element, "x2"), get(element, "y2", 1))], False)]
+        values = _numbers(element.get("points", ""))
+        points = list(zip(values[0::2], values[1::2]))
+        return [(points, tag == "polygon")] if points else []
+
+    def paint(self, value: Optional[str]) -> Optional[Tuple[int, int, int]]:
+        value = (value or "none").strip()
+        if value.startswith("url("):
+            ref = re.match(r"url\(\s*#([^)\s]+)\s*\)\s*(.*)", value)
+            if not ref:
+                return None
+            value = self.servers.get(ref.group(1)) or ref.group(2) or "none"
+        if value in ("none", "transparent"):
+            return None
+        if value == "currentColor":
+            return (0, 0, 0)
+        try:
+            return ImageColor.getrgb(value)[:3]
+        except ValueError:
+            return None
+
+    def draw_shape(self, element: ET.Element, tag: str, matrix: Matrix, style: Dict[str, str]):
+        a, b, c, d, e, f = matrix
+        subpaths = [
+            ([(a * x + c * y + e, b * x + d * y + f) for x, y in points], closed)
+            for points, closed in self.subpaths(element, tag)
+        ]
+        if not subpaths:
+            return
+        opacity = float(style.get("opacity", 1))
+
+        fill = self.paint(style.get("fill")) if tag not in ("line", "polyline") else None
+        if fill is not None:
+            self.composite(fill, opacity * float(style.get("fill-opacity", 1)), subpaths, fill=True, width=0)
+
+        stroke = self.paint(style.get("stroke"))
+        width = (_numbers(style.get("stroke-width", "1")) or [1.0])[0] * math.sqrt(abs(a * d - b * c))
+        if stroke is not None and width > 0:
+            self.composite(stroke, opacity * float(style.get("stroke-opacity", 1)), subpaths, fill=False, width=width)
+
+    def composite(self, color: Tuple[int, int, int], alpha: float, subpaths: List[Subpath], fill: bool, width: float):
+        # Only touch the shape's bounding box
+        pad = math.ceil(width / 2) + 1
+        xs = [x for points, _ in subpaths for x, _ in points]
+        ys = [y for points, _ in subpaths for _, y in points]
+        left, top = max(0, math.floor(min(xs)) - pad), max(0, math.floor(min(ys)) - pad)
+        right = min(self.canvas.width, math.ceil(max(xs)) + pad)
+        bottom = min(self.canvas.height, math.ceil(max(ys)) + pad)
+        if right <= left or bottom <= top:
+            return
+
+        size = (right - left, bottom - top)
+        mask = Image.new("L", size, 0)
+        for points, closed in subpaths:
+            shifted = [(x - left, y - top) for x, y in points]
+            if fill:
+                if len(shifted) < 3:
+                    continue
+                layer = Image.new("L", size, 0)
+                ImageDraw.Draw(layer).polygon(shifted, fill=255)
+                # XOR of binary masks: holes cancel out (even-odd)
+                mask = ImageChops.difference(mask, layer)
+            else:
+                if closed:
+                    shifted.append(shifted[0])
+                ImageDraw.Draw(mask).line(shifted, fill=255, width=max(1, round(width)), joint="curve")
+
+        if alpha < 1:
+            mask = mask.point(lambda v: int(v * max(alpha, 0.0)))
+        patch = Image.new("RGBA", size, color + (0,))
+        patch.putalpha(mask)
+        self.canvas.alpha_composite(patch, (left, top))
@@ -1,4 +1,5 @@
 from PIL import Image, ImageDraw, ImageFont
+import functools
 import textwrap
 import os
 
@@ -13,8 +14,9 @@ class TextRenderer:
     }
 
     @staticmethod
+    @functools.lru_cache(maxsize=128)
     def get_font(font_name: str, size: int) -> ImageFont.FreeTypeFont:
-        """Load font."""
+        """Load font (cached, so long-running processes parse each face once)."""
         # Try to load system font or fallback to default
         try:
             # This works on Linux usually
@@ -1,7 +1,9 @@
 import yaml
 from pathlib import Path
 from .schema import BrandDNA
+from .. import tracing
 
+@tracing.traced("dna.load")
 def load_dna(path: str) -> BrandDNA:
     """Load Brand DNA from a YAML file."""
     file_path = Path(path)
@@ -1,5 +1,6 @@
 from .exporter import Exporter
 from .presets import PRESETS
-from .formats import ExportConfig, ImageFormat, ColorSpace
+from .formats import DRAFT_SCALE, ExportConfig, ImageFormat, ColorSpace
+from .shared import ProcessEncoder, SegmentPool, SharedImage
 
-__all__ = ["Exporter", "PRESETS", "ExportConfig", "ImageFormat", "ColorSpace"]
+__all__ = ["Exporter", "PRESETS", "DRAFT_SCALE", "ExportConfig", "ImageFormat", "ColorSpace", "ProcessEncoder", "SegmentPool", "SharedImage"]
@@ -1,8 +1,12 @@
 from PIL import Image
+import io
 import os
-from .formats import ExportConfig, ImageFormat, ColorSpace
+from .formats import DRAFT_SCALE, ExportConfig, ImageFormat, ColorSpace
 from .presets import PRESETS
-from typing import Optional
+from .. import tracing
+from ..buffers import BUFFER_POOL
+from concurrent.futures import Executor
+from typing import BinaryIO, Optional, Tuple
 
 class Exporter:
     """Flexible export with any format/size combination"""
@@ -19,7 +23,39 @@ class Exporter:
         """
         Export image with maximum flexibility.
         """
-        # Build config from preset or defaults
+        cfg = self.resolve_config(config, preset, custom_size, **kwargs)
+
+        # Process image
+        processed = self._process(image, cfg)
+
+        # Ensure directory exists
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+
+        # Save
+        return self._save(processed, output_path, cfg)
+
+    def encode(
+        self,
+        image: Image.Image,
+        config: ExportConfig = None,
+        preset: str = None,
+        custom_size: tuple[int, int] = None,
+        **kwargs
+    ) -> Tuple[bytes, str]:
+        """Export to memory; returns the encoded bytes and the PIL format name."""
+        cfg = self.resolve_config(config, preset, custom_size, **kwargs)
+        buffer = io.BytesIO()
+        fmt = self._encode(self._process(image, cfg), cfg, buffer)
+        return buffer.getvalue(), fmt
+
+    def resolve_config(
+        self,
+        config: ExportConfig = None,
+        preset: str = None,
+        custom_size: tuple[int, int] = None,
+        **kwargs
+    ) -> ExportConfig:
+        """Build the export config from a preset or defaults plus overrides."""
         if config:
             cfg = config
         elif preset:
@@ -49,24 +85,18 @@ class Exporter:
 
         if custom_size:
             cfg.width, cfg.height = custom_size
-
-        # Process image
-        processed = self._process(image, cfg)
-
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
-
-        # Save
-        return self._save(processed, output_path, cfg)
+        return cfg
 
     def export_multi(
         self,
         image: Image.Image,
         output_dir: str,
         presets: list[str],
-        naming: str = "{preset}"
+        naming: str = "{preset}",
+        executor: Optional[Executor] = None,
+        **kwargs
     ) -> list[str]:
-        """Export to multiple formats/sizes at once"""
+        """Export to multiple formats/sizes at once, in parallel when given an `executor`"""
         paths = []
         for preset in presets:
             if preset not in PRESETS:
@@ -77,16 +107,25 @@ class Exporter:
             ext = cfg.format.value
             filename = naming.format(preset=preset) + f".{ext}"
             path = os.path.join(output_dir, filename)
-            paths.append(self.export(image, path, preset=preset))
-        return paths
+            if executor is not None:
+                paths.append(executor.submit(self.export, image, path, preset=preset, **kwargs))
+            else:
+                paths.append(self.export(image, path, preset=preset, **kwargs))
+        return [p.result() for p in paths] if executor is not None else paths
 
+    @tracing.traced("export.process")
     def _process(self, image: Image.Image, config: ExportConfig) -> Image.Image:
-        """Process image (resize, color space)."""
-        img = image.copy()
+        """Process image (resize, color space); `image` itself is never modified, nor copied needlessly."""
+        img = image
 
         # Resize
         target_w, target_h = config.width, config.height
-        if target_w and target_h:
+        if config.draft:
+            # Drafts are already rendered small; box-reduce then bilinear
+            if target_w and target_h:
+                size = (max(1, round(target_w * DRAFT_SCALE)), max(1, round(target_h * DRAFT_SCALE)))
+                img = img.resize(size, Image.Resampling.BILINEAR, reducing_gap=2.0)
+        elif target_w and target_h:
             img = img.resize((target_w, target_h), Image.Resampling.LANCZOS)
         elif config.scale != 1.0:
             w, h = img.size
@@ -102,8 +141,47 @@ class Exporter:
 
         return img
 
+    @tracing.traced("export.save")
     def _save(self, image: Image.Image, path: str, config: ExportConfig) -> str:
-        """Save image to disk."""
+        """Encode straight into `<path>.part` and move it into place, so a failed export leaves no partial file."""
+        part = path + ".part"
+        try:
+            with open(part, "wb") as f:
+                self._encode(image, config, f)
+                written = f.tell()
+        except Exception as e:
+            if os.path.exists(part):
+                os.remove(part)
+            # Fallback if format is not supported by extension
+            image.save(path, **self._save_kwargs(config)[1])
+            tracing.count("export.bytes_written", os.path.getsize(path))
+            return path
+
+        os.replace(part, path)
+        tracing.count("export.bytes_written", written)
+        return path
+
+    def _encode(self, image: Image.Image, config: ExportConfig, out: BinaryIO) -> str:
+        """Encode into the binary file object `out`; returns the PIL format name."""
+        fmt, save_kwargs = self._save_kwargs(config)
+
+        # Handle alpha for JPEG: flatten onto white in a pooled buffer
+        background = None
+        if fmt == "JPEG" and image.mode in ("RGBA", "LA"):
+             background = BUFFER_POOL.acquire("RGB", image.size, (255, 255, 255))
+             background.paste(image, mask=image.getchannel(image.mode[-1]))
+             image = background
+
+        try:
+            with tracing.span("export.encode", format=fmt):
+                image.save(out, format=fmt, **save_kwargs)
+        finally:
+            if background is not None:
+                BUFFER_POOL.release(background)
+        return fmt
+
+    def _save_kwargs(self, config: ExportConfig) -> Tuple[str, dict]:
+        """PIL format name and encoder options for `config`."""
         save_kwargs = {}
 
         # Format mapping
@@ -117,7 +195,16 @@ class Exporter:
 
         fmt = config.format.value.upper() if isinstance(config.format, ImageFormat) else str(config.format).upper()
 
-        if fmt == "JPEG":
+        if config.draft:
+            # Fastest encoder settings; drafts are for looking at, not shipping
+            if fmt == "JPEG":
+                save_kwargs["quality"] = min(config.quality, 75)
+            elif fmt == "PNG":
+                save_kwargs["compress_level"] = 1
+            elif fmt == "WEBP":
+                save_kwargs["quality"] = min(config.quality, 75)
+                save_kwargs["method"] = 0
+        elif fmt == "JPEG":
             fmt = "JPEG"
             save_kwargs["quality"] = config.quality
             save_kwargs["optimize"] = config.optimize
@@ -132,17 +219,4 @@ class Exporter:
             save_kwargs["method"] = 6 # Max compression
         elif fmt == "TIFF":
             fmt = "TIFF"
-
-        # Handle alpha for JPEG
-        if fmt == "JPEG" and image.mode in ("RGBA", "LA"):
-             background = Image.new("RGB", image.size, (255, 255, 255))
-             background.paste(image, mask=image.split()[-1])
-             image = background
-
-        try:
-            image.save(path, format=fmt, **save_kwargs)
-        except Exception as e:
-            # Fallback if format is not supported by extension
-            image.save(path, **save_kwargs)
-
-        return path
+        return fmt, save_kwargs
@@ -2,6 +2,9 @@ from dataclasses import dataclass
 from enum import Enum
 from typing import Optional
 
+# Fraction of full resolution that draft renders and exports use
+DRAFT_SCALE = 0.25
+
 class ImageFormat(Enum):
     PNG = "png"
     JPEG = "jpeg"
@@ -40,5 +43,8 @@ class ExportConfig:
     # For web
     progressive: bool = False  # Progressive JPEG
 
+    # Preview: DRAFT_SCALE of the size, fast resampling and encoder settings
+    draft: bool = False
+
     # Custom metadata
     metadata: Optional[dict] = None
@@ -0,0 +1,176 @@
+import io
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from .formats import ExportConfig
+
+# Modes Image.frombuffer maps without copying; others are unpacked into a private copy
+SHAREABLE_MODES = ("L", "RGBA", "RGBX", "CMYK", "I", "F")
+BYTES_PER_PIXEL = {"L": 1, "RGBA": 4, "RGBX": 4, "CMYK": 4, "I": 4, "F": 4}
+
+# Segments are rounded up to this so similar canvas sizes share them
+SEGMENT_ALIGN = 1024 * 1024
+# Raw bytes written per step when filling a segment
+CHUNK_SIZE = 1024 * 1024
+
+class SharedImage:
+    """
+    Picklable handle to an image held in a shared-memory segment. Pass it to
+    another process and `open()` it there instead of pickling the pixels.
+    """
+
+    def __init__(self, name: str, size: Tuple[int, int], mode: str):
+        self.name = name
+        self.size = size
+        self.mode = mode
+
+    def open(self) -> Tuple[Image.Image, SharedMemory]:
+        """
+        Map the segment and wrap it as a read-only image without copying.
+        Drop the image before closing the returned segment.
+        """
+        shm = SharedMemory(self.name)
+        image = Image.frombuffer(self.mode, self.size, shm.buf, "raw", self.mode, 0, 1)
+        return image, shm
+
+class SegmentPool:
+    """
+    Reusable shared-memory segments owned by the producing process. Canvases
+    are written once with `put()`; `release()` returns the segment once the
+    consumer is done, and `close()` unlinks every segment. At most
+    `max_free_bytes` of idle segments are kept.
+    """
+
+    def __init__(self, max_free_bytes: int = 512 * 1024 * 1024):
+        self.max_free_bytes = max_free_bytes
+        self._free: Dict[int, List[SharedMemory]] = {}
+        self._free_bytes = 0
+        self._leased: Dict[str, SharedMemory] = {}
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, nbytes: int) -> SharedMemory:
+        bucket = -(-max(1, nbytes) // SEGMENT_ALIGN) * SEGMENT_ALIGN
+        with self._lock:
+            free = self._free.get(bucket)
+            if free:
+                shm = free.pop()
+                self._free_bytes -= bucket
+                self.reused += 1
+            else:
+                shm = SharedMemory(create=True, size=bucket)
+                self.created += 1
+            self._leased[shm.name] = shm
+        return shm
+
+    def release(self, name: str):
+        with self._lock:
+            shm = self._leased.pop(name)
+            if self._free_bytes + shm.size <= self.max_free_bytes:
+                self._free.setdefault(shm.size, []).append(shm)
+                self._free_bytes += shm.size
+                return
+        _destroy(shm)
+
+    def put(self, image: Image.Image) -> SharedImage:
+        """Copy `image` into a segment (its only copy) and return a handle to it."""
+        if image.mode == "RGB":
+            # Pillow keeps RGB at 4 bytes/pixel: pack it as RGBX straight into the segment
+            mode = "RGBX"
+        elif image.mode in SHAREABLE_MODES:
+            mode = image.mode
+        else:
+            image = image.convert("L" if image.mode == "1" else "RGBA")
+            mode = image.mode
+        shm = self.acquire(image.width * image.height * BYTES_PER_PIXEL[mode])
+        try:
+            _write_raw(image, shm.buf, mode)
+        except Exception:
+            self.release(shm.name)
+            raise
+        return SharedImage(shm.name, image.size, mode)
+
+    def close(self):
+        with self._lock:
+            segments = [shm for free in self._free.values() for shm in free] + list(self._leased.values())
+            self._free.clear()
+            self._leased.clear()
+            self._free_bytes = 0
+        for shm in segments:
+            _destroy(shm)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"created": self.created, "reused": self.reused, "leased": len(self._leased), "free_bytes": self._free_bytes}
+
+def _write_raw(image: Image.Image, buf: memoryview, rawmode: str):
+    """Stream the pixels packed as `rawmode` into `buf` chunk by chunk, without a full-size temporary."""
+    image.load()
+    encoder = Image._getencoder(image.mode, "raw", rawmode)
+    encoder.setimage(image.im, (0, 0) + image.size)
+    offset = 0
+    while True:
+        _, status, chunk = encoder.encode(CHUNK_SIZE)
+        buf[offset:offset + len(chunk)] = chunk
+        offset += len(chunk)
+        if status:
+            break
+    if status < 0:
+        raise OSError(f"raw encoder error {status}")
+
+def _destroy(shm: SharedMemory):
+    shm.close()
+    try:
+        shm.unlink()
+    except FileNotFoundError:
+        pass
+
+def _encode_shared(handle: SharedImage, config: ExportConfig) -> Tuple[bytes, str]:
+    """Process-pool entry point: export the shared canvas to encoded bytes."""
+    from .exporter import Exporter
+
+    image, shm = handle.open()
+    try:
+        exporter = Exporter()
+        processed = exporter._process(image, config)
+        if processed.mode == "RGBX":
+            # Not every format writes RGBX; drop the pad byte after resizing, when it's cheapest
+            processed = processed.convert("RGB")
+        buffer = io.BytesIO()
+        fmt = exporter._encode(processed, config, buffer)
+        del processed
+        return buffer.getvalue(), fmt
+    finally:
+        # The mapped image must go before the segment can be closed
+        del image
+        shm.close()
+
+class ProcessEncoder:
+    """
+    Resizes and encodes exports in worker processes. Canvases travel through
+    a `SegmentPool` rather than being pickled; only the encoded bytes come
+    back. Safe to call `encode` from several threads at once.
+    """
+
+    def __init__(self, processes: int, pool: Optional[SegmentPool] = None):
+        self.processes = processes
+        self.pool = pool or SegmentPool()
+        # Spawned, not forked: the parent runs threads (session loop, pools)
+        self.executor = ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context("spawn"))
+
+    def encode(self, image: Image.Image, config: ExportConfig) -> Tuple[bytes, str]:
+        handle = self.pool.put(image)
+        try:
+            return self.executor.submit(_encode_shared, handle, config).result()
+        finally:
+            self.pool.release(handle.name)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.pool.close()
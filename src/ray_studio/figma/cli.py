@@ -1,15 +1,17 @@
 import asyncio
 import click
+import csv
 import json
 import logging
+import os
 from functools import wraps
+from typing import Dict
 
-from .client import FigmaClient
+from .client import MAX_IN_FLIGHT, FigmaClient
 from .config import FigmaConfig
+from .daemon import DaemonClient, FigmaDaemon, connect_client, default_socket_path
 from . import commands
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 def async_command(f):
@@ -21,7 +23,8 @@ def async_command(f):
 @click.group()
 def figma():
     """Figma Skill Module operations"""
-    pass
+    # Configured here rather than at import so loading the group has no side effects
+    logging.basicConfig(level=logging.INFO)
 
 @figma.command()
 @click.option("--host", default="172.17.0.1", help="Bridge host IP")
@@ -30,17 +33,18 @@ def figma():
 @async_command
 async def status(host, port, channel):
     """Check bridge connection"""
-    client = FigmaClient(host=host, port=port)
     try:
-        await client.connect(channel)
-        # Just connecting and joining channel is enough to verify bridge is reachable
-        # We could send a ping or get_document_info to be sure
-        click.echo(f"Successfully connected to {host}:{port} on channel {channel}")
+        async with connect_client(host, port, channel) as client:
+            if isinstance(client, DaemonClient):
+                state = await client.ping()
+                click.echo(f"Daemon at {client.socket_path} on channel {channel}: bridge {state['uri']} {'connected' if state['connected'] else 'reconnecting'}")
+            else:
+                # Just connecting and joining channel is enough to verify bridge is reachable
+                # We could send a ping or get_document_info to be sure
+                click.echo(f"Successfully connected to {host}:{port} on channel {channel}")
     except Exception as e:
         click.echo(f"Connection failed: {e}", err=True)
         import sys; sys.exit(1)
-    finally:
-        await client.disconnect()
 
 @figma.command()
 @click.option("--host", default="172.17.0.1", help="Bridge host IP")
@@ -49,16 +53,13 @@ async def status(host, port, channel):
 @async_command
 async def info(host, port, channel):
     """Get document info"""
-    client = FigmaClient(host=host, port=port)
     try:
-        await client.connect(channel)
-        info = await commands.get_document_info(client)
+        async with connect_client(host, port, channel) as client:
+            info = await commands.get_document_info(client)
         click.echo(json.dumps(info, indent=2))
     except Exception as e:
         click.echo(f"Error: {e}", err=True)
         import sys; sys.exit(1)
-    finally:
-        await client.disconnect()
 
 @figma.command(name="scan-text")
 @click.argument("node_id")
@@ -68,16 +69,13 @@ async def info(host, port, channel):
 @async_command
 async def scan_text(node_id, host, port, channel):
     """Scan text nodes under a specific node"""
-    client = FigmaClient(host=host, port=port)
     try:
-        await client.connect(channel)
-        result = await commands.scan_text_nodes(client, node_id)
+        async with connect_client(host, port, channel) as client:
+            result = await commands.scan_text_nodes(client, node_id)
         click.echo(json.dumps(result, indent=2))
     except Exception as e:
         click.echo(f"Error: {e}", err=True)
         import sys; sys.exit(1)
-    finally:
-        await client.disconnect()
 
 @figma.command(name="set-text")
 @click.argument("target")
@@ -89,23 +87,145 @@ async def scan_text(node_id, host, port, channel):
 @async_command
 async def set_text_cmd(target, text, host, port, channel, is_path):
     """Modify text content of a node"""
-    client = FigmaClient(host=host, port=port)
     config = FigmaConfig()
 
     try:
-        await client.connect(channel)
+        async with connect_client(host, port, channel) as client:
+            if is_path:
+                result = await commands.set_text_by_path(client, config, target, text)
+            else:
+                result = await commands.set_text(client, target, text)
+
+        click.echo(f"Success: {json.dumps(result)}")
+    except Exception as e:
+        click.echo(f"Error: {e}", err=True)
+        import sys; sys.exit(1)
+
+def read_texts(path: str) -> Dict[str, str]:
+    """Read target -> text pairs from a JSON object or a two-column CSV (header optional)."""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".json"):
+            data = json.load(f)
+            if not isinstance(data, dict):
+                raise click.ClickException(f"{path}: expected a JSON object of target -> text")
+            return {str(k): str(v) for k, v in data.items()}
+        rows = [row for row in csv.reader(f) if row]
+    if rows and [c.strip().lower() for c in rows[0][:2]] in (["path", "text"], ["target", "text"], ["node_id", "text"]):
+        rows = rows[1:]
+    for i, row in enumerate(rows, 1):
+        if len(row) != 2:
+            raise click.ClickException(f"{path}: row {i} needs 2 columns (target, text), got {len(row)}")
+    return {target: text for target, text in rows}
+
+@figma.command(name="set-texts")
+@click.argument("texts_file", type=click.Path(exists=True, dir_okay=False))
+@click.option("--host", default="172.17.0.1", help="Bridge host IP")
+@click.option("--port", default=3055, help="Bridge port")
+@click.option("--channel", "-c", required=True, help="Channel ID from Figma plugin")
+@click.option("--is-path", is_flag=True, help="Treat targets as template paths instead of Node IDs")
+@click.option("--max-in-flight", "-j", default=MAX_IN_FLIGHT, help="Commands awaiting a response at once")
+@async_command
+async def set_texts_cmd(texts_file, host, port, channel, is_path, max_in_flight):
+    """Modify many text nodes from a JSON or CSV file of target -> text"""
+    texts = read_texts(texts_file)
+
+    try:
+        async with connect_client(host, port, channel) as client:
+            results = await commands.set_texts(client, texts, FigmaConfig() if is_path else None, max_in_flight)
+    except Exception as e:
+        click.echo(f"Error: {e}", err=True)
+        import sys; sys.exit(1)
 
-        if is_path:
-            result = await commands.set_text_by_path(client, config, target, text)
+    failed = {target: r.error for target, r in results.items() if not r.ok}
+    for target, error in failed.items():
+        click.echo(f"✗ {target}: {error}", err=True)
+    click.echo(f"{len(results) - len(failed)} set, {len(failed)} failed")
+    if failed:
+        import sys; sys.exit(1)
+
+def read_nodes(path: str, output_dir: str, format: str) -> Dict[str, str]:
+    """
+    Read node ID -> output path from a JSON list of IDs or object of ID -> file
+    name, or a CSV of `node_id[,file name]` rows (header optional). Unnamed
+    nodes are written as `<node id>.<format>` with ':' replaced by '-'.
+    """
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".json"):
+            data = json.load(f)
+            if isinstance(data, list):
+                data = {str(node_id): None for node_id in data}
+            elif not isinstance(data, dict):
+                raise click.ClickException(f"{path}: expected a JSON list of node IDs or object of node ID -> file name")
+            rows = [(str(k), v) for k, v in data.items()]
         else:
-            result = await commands.set_text(client, target, text)
+            rows = [(row[0], row[1] if len(row) > 1 and row[1] else None) for row in csv.reader(f) if row]
+            if rows and rows[0][0].strip().lower() in ("node_id", "nodeid", "node"):
+                rows = rows[1:]
+    return {
+        node_id: os.path.join(output_dir, name or f"{node_id.replace(':', '-')}.{format}")
+        for node_id, name in rows
+    }
 
-        click.echo(f"Success: {json.dumps(result)}")
+@figma.command(name="export-many")
+@click.argument("nodes_file", type=click.Path(exists=True, dir_okay=False))
+@click.option("--output-dir", "-o", required=True, help="Directory to write the exports to")
+@click.option("--format", "-f", "format_", default="png", help="Export format passed to the bridge (png, jpg, svg, pdf)")
+@click.option("--host", default="172.17.0.1", help="Bridge host IP")
+@click.option("--port", default=3055, help="Bridge port")
+@click.option("--channel", "-c", required=True, help="Channel ID from Figma plugin")
+@click.option("--max-in-flight", "-j", default=4, help="Exports running at once")
+@click.option("--write-workers", default=4, help="Threads decoding and writing export chunks")
+@async_command
+async def export_many(nodes_file, output_dir, format_, host, port, channel, max_in_flight, write_workers):
+    """Export many nodes to files, streamed to disk in chunks"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    nodes = read_nodes(nodes_file, output_dir, format_)
+    os.makedirs(output_dir, exist_ok=True)
+
+    try:
+        with ThreadPoolExecutor(write_workers, thread_name_prefix="ray-studio-figma-export") as pool:
+            async with connect_client(host, port, channel) as client:
+                results = await commands.export_nodes(client, nodes, format_, max_in_flight, pool)
     except Exception as e:
         click.echo(f"Error: {e}", err=True)
         import sys; sys.exit(1)
-    finally:
+
+    failed = {node_id: r.error for node_id, r in results.items() if not r.ok}
+    for node_id, error in failed.items():
+        click.echo(f"✗ {node_id}: {error}", err=True)
+    click.echo(f"{len(results) - len(failed)} exported, {len(failed)} failed")
+    if failed:
+        import sys; sys.exit(1)
+
+@figma.command()
+@click.option("--host", default="172.17.0.1", help="Bridge host IP")
+@click.option("--port", default=3055, help="Bridge port")
+@click.option("--channel", "-c", required=True, help="Channel ID from Figma plugin")
+@async_command
+async def daemon(host, port, channel):
+    """Keep one bridge connection open for other figma commands to share"""
+    import signal
+
+    client = FigmaClient(host=host, port=port)
+    server = FigmaDaemon(client, default_socket_path(channel))
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    try:
+        await client.connect(channel)
+        await server.start()
+    except Exception as e:
         await client.disconnect()
+        click.echo(f"Error: {e}", err=True)
+        import sys; sys.exit(1)
+    click.echo(f"Figma daemon for channel {channel} listening on {server.socket_path} (Ctrl+C to stop)")
+    try:
+        await stop.wait()
+    finally:
+        await server.close()
 
 @figma.command()
 @click.argument("name", default="My Project")
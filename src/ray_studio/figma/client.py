@@ -2,25 +2,59 @@ import asyncio
 import json
 import logging
 import uuid
-from typing import Dict, Any, Optional
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
 import websockets
 
 logger = logging.getLogger(__name__)
 
+# Commands a batch keeps outstanding at once by default
+MAX_IN_FLIGHT = 16
+
+def _is_open(websocket) -> bool:
+    """Open check for both the legacy (`.open`) and current (`.state`) websockets APIs."""
+    if websocket is None:
+        return False
+    if hasattr(websocket, "open"):
+        return websocket.open
+    return getattr(websocket.state, "name", None) == "OPEN"
+
+@dataclass
+class CommandResult:
+    """Outcome of one command in a batch: its result, or the error it raised."""
+
+    command: str
+    params: Dict[str, Any]
+    result: Any = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+def bridge_uri(host: str, port: int) -> str:
+    return f"ws://{host}:{port}"
+
 class FigmaClient:
     """
     WebSocket client for communicating with the Figma bridge.
     Handles connection, reconnection, and command/response correlation.
     """
     def __init__(self, host: str = "172.17.0.1", port: int = 3055):
-        self.uri = f"ws://{host}:{port}"
+        self.uri = bridge_uri(host, port)
         self.websocket: Optional[websockets.WebSocketClientProtocol] = None
         self.channel: Optional[str] = None
         self.pending_requests: Dict[str, asyncio.Future] = {}
+        # Replies that arrive in several messages (chunked exports), in arrival order
+        self.pending_streams: Dict[str, asyncio.Queue] = {}
         self.listen_task: Optional[asyncio.Task] = None
         self.running = False
 
+    @property
+    def connected(self) -> bool:
+        return self.running and _is_open(self.websocket)
+
     async def connect(self, channel: str):
         """Connect to the bridge and join the specified channel."""
         self.channel = channel
@@ -59,7 +93,7 @@ class FigmaClient:
         while self.running:
             try:
                 # Reconnect if needed
-                if not self.websocket or self.websocket.closed:
+                if not _is_open(self.websocket):
                     try:
                         await self._connect_socket()
                     except Exception as e:
@@ -75,7 +109,9 @@ class FigmaClient:
                         # Or broadcast messages that might look different
                         if data.get("message") and "id" in data["message"]:
                             msg_id = data["message"]["id"]
-                            if msg_id in self.pending_requests:
+                            if msg_id in self.pending_streams:
+                                self.pending_streams[msg_id].put_nowait(data["message"])
+                            elif msg_id in self.pending_requests:
                                 future = self.pending_requests.pop(msg_id)
                                 if not future.done():
                                     future.set_result(data["message"])
@@ -102,26 +138,10 @@ class FigmaClient:
         Returns:
             The 'result' field from the response
         """
-        if not self.running:
-             raise RuntimeError("Client is not running. Call connect() first.")
-
-        # Wait for connection if not connected (up to timeout)
-        start_time = asyncio.get_running_loop().time()
-        while not self.websocket or not self.websocket.open:
-            if asyncio.get_running_loop().time() - start_time > timeout:
-                 raise ConnectionError("Timed out waiting for connection")
-            await asyncio.sleep(0.1)
+        await self._wait_connected(timeout)
 
         request_id = str(uuid.uuid4())
-        payload = {
-            "type": "message",
-            "channel": self.channel,
-            "message": {
-                "command": command,
-                "id": request_id,
-                "params": params
-            }
-        }
+        payload = self._payload(command, request_id, params)
 
         future = asyncio.get_running_loop().create_future()
         self.pending_requests[request_id] = future
@@ -142,3 +162,83 @@ class FigmaClient:
             if request_id in self.pending_requests:
                 del self.pending_requests[request_id]
             raise e
+
+    async def send_streaming(
+        self,
+        command: str,
+        params: Dict[str, Any],
+        on_chunk: Callable[[Dict[str, Any]], Awaitable[None]],
+        timeout: float = 10.0
+    ) -> Any:
+        """
+        Send a command whose reply may come in parts: each message for this
+        request carrying a `chunk` is passed to `on_chunk` in arrival order,
+        and the `result` of the final message is returned. `timeout` applies
+        to the wait for each message, not the whole reply.
+        """
+        await self._wait_connected(timeout)
+
+        request_id = str(uuid.uuid4())
+        queue: asyncio.Queue = asyncio.Queue()
+        self.pending_streams[request_id] = queue
+        try:
+            await self.websocket.send(json.dumps(self._payload(command, request_id, params)))
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    raise TimeoutError(f"Command {command} timed out")
+                if "chunk" in message:
+                    await on_chunk(message["chunk"])
+                    continue
+                if "error" in message:
+                    raise Exception(message["error"])
+                return message.get("result")
+        finally:
+            self.pending_streams.pop(request_id, None)
+
+    def _payload(self, command: str, request_id: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "type": "message",
+            "channel": self.channel,
+            "message": {
+                "command": command,
+                "id": request_id,
+                "params": params
+            }
+        }
+
+    async def send_many(
+        self,
+        commands: List[Tuple[str, Dict[str, Any]]],
+        max_in_flight: int = MAX_IN_FLIGHT,
+        timeout: float = 10.0
+    ) -> List[CommandResult]:
+        """
+        Send (command, params) pairs, keeping up to `max_in_flight` awaiting
+        their responses at once instead of one round trip each. Responses are
+        matched by id, so they may arrive in any order. Returns one
+        `CommandResult` per command, in order; a failure doesn't stop the rest.
+        """
+        await self._wait_connected(timeout)
+        slots = asyncio.Semaphore(max(1, max_in_flight))
+
+        async def run(command: str, params: Dict[str, Any]) -> CommandResult:
+            async with slots:
+                try:
+                    return CommandResult(command, params, result=await self.send_command(command, params, timeout))
+                except Exception as e:
+                    return CommandResult(command, params, error=str(e) or type(e).__name__)
+
+        return list(await asyncio.gather(*[run(command, params) for command, params in commands]))
+
+    async def _wait_connected(self, timeout: float):
+        """Wait (up to `timeout`) for the socket, which may be reconnecting."""
+        if not self.running:
+             raise RuntimeError("Client is not running. Call connect() first.")
+
+        start_time = asyncio.get_running_loop().time()
+        while not _is_open(self.websocket):
+            if asyncio.get_running_loop().time() - start_time > timeout:
+                 raise ConnectionError("Timed out waiting for connection")
+            await asyncio.sleep(0.1)
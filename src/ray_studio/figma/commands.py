@@ -1,12 +1,20 @@
+import asyncio
 import base64
+import hashlib
 import logging
+import os
+from concurrent.futures import Executor, ThreadPoolExecutor
 from typing import Dict, Any, Optional
 
-from .client import FigmaClient
+from .client import MAX_IN_FLIGHT, CommandResult, FigmaClient
 from .config import FigmaConfig
 
 logger = logging.getLogger(__name__)
 
+# Largest decoded export chunk requested from the bridge; its base64 stays well
+# under the websocket client's default 1 MiB frame limit
+EXPORT_CHUNK_SIZE = 512 * 1024
+
 async def get_document_info(client: FigmaClient) -> Dict[str, Any]:
     """Get information about the current Figma document."""
     return await client.send_command("get_document_info", {})
@@ -30,23 +38,158 @@ async def set_text_by_path(client: FigmaClient, config: FigmaConfig, template_pa
     logger.info(f"Resolved {template_path} to node ID {node_id}")
     return await set_text(client, node_id, text)
 
-async def export_node(client: FigmaClient, node_id: str, format: str, output_path: str) -> str:
+async def set_texts(
+    client: FigmaClient,
+    texts: Dict[str, str],
+    config: Optional[FigmaConfig] = None,
+    max_in_flight: int = MAX_IN_FLIGHT
+) -> Dict[str, CommandResult]:
     """
-    Export a node to a file.
-    Assumes the bridge returns a dictionary with 'data' field containing base64 encoded image data.
+    Set many text nodes at once, pipelined over one connection. Keys are node
+    IDs, or template paths when `config` is given; paths that don't resolve
+    fail without being sent. Returns a result per key.
+    """
+    results: Dict[str, CommandResult] = {}
+    targets = []
+    for target, text in texts.items():
+        params = {"nodeId": config.get_node_id(target) if config else target, "text": text}
+        if not params["nodeId"]:
+            results[target] = CommandResult("set_text_content", params, error=f"Could not resolve template path: {target}")
+        else:
+            targets.append((target, params))
+
+    sent = await client.send_many([("set_text_content", params) for _, params in targets], max_in_flight)
+    results.update(zip([target for target, _ in targets], sent))
+    # Report in the caller's order
+    return {target: results[target] for target in texts}
+
+class ChunkWriter:
+    """
+    Decodes base64 export chunks straight into `<path>.part`, hashing as it
+    goes, and moves the file into place only once it checks out, so no
+    more than a chunk of the image is held in memory.
     """
-    result = await client.send_command("export_node", {"nodeId": node_id, "format": format})
 
-    if isinstance(result, dict) and "data" in result:
+    def __init__(self, path: str):
+        self.path = path
+        self.part_path = path + ".part"
+        self.file = open(self.part_path, "wb")
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+        self.chunks = 0
+        # Base64 characters carried over to the next chunk (decoded in groups of 4)
+        self.carry = b""
+
+    def write(self, chunk: Dict[str, Any]):
+        index = chunk.get("index", self.chunks)
+        if index != self.chunks:
+            raise ValueError(f"Export chunk {index} arrived out of order (expected {self.chunks})")
+        self.chunks += 1
+        # Whitespace isn't data: bridges may send line-wrapped base64
+        encoded = self.carry + b"".join(chunk["data"].encode("ascii").split())
+        cut = len(encoded) - len(encoded) % 4
+        self.carry = encoded[cut:]
+        self._write(base64.b64decode(encoded[:cut], validate=True))
+
+    def _write(self, data: bytes):
+        self.file.write(data)
+        self.sha256.update(data)
+        self.size += len(data)
+
+    def finish(self, expected: Optional[Dict[str, Any]] = None) -> str:
+        """Check the totals the bridge reported (any of chunks, size, sha256) and move the file into place."""
+        expected = expected or {}
         try:
-            data = base64.b64decode(result["data"])
-            with open(output_path, "wb") as f:
-                f.write(data)
-            return output_path
-        except Exception as e:
-            logger.error(f"Failed to decode or write export data: {e}")
-            raise e
+            if self.carry:
+                raise ValueError(f"Export ended mid base64 group ({len(self.carry)} stray characters)")
+            for name, actual in (("chunks", self.chunks), ("size", self.size), ("sha256", self.sha256.hexdigest())):
+                if expected.get(name) is not None and expected[name] != actual:
+                    raise ValueError(f"Export {name} mismatch: expected {expected[name]}, got {actual}")
+            self.file.close()
+            os.replace(self.part_path, self.path)
+        except Exception:
+            self.abort()
+            raise
+        return self.path
+
+    def abort(self):
+        self.file.close()
+        if os.path.exists(self.part_path):
+            os.remove(self.part_path)
+
+async def export_node(
+    client: FigmaClient,
+    node_id: str,
+    format: str,
+    output_path: str,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+    executor: Optional[Executor] = None
+) -> str:
+    """
+    Export a node to a file.
+
+    Asks the bridge for chunks of at most `chunk_size` bytes: messages with
+    the request id and `chunk: {index, data}` (base64), then a final
+    `result: {chunks, size, sha256}`. Chunks are decoded straight into the
+    file (on `executor` when given) and checked against the totals.
+    Bridges that ignore `chunkSize` reply with the whole image as `{data}`.
+    """
+    loop = asyncio.get_running_loop()
+    writer = await loop.run_in_executor(executor, ChunkWriter, output_path) if executor else ChunkWriter(output_path)
+
+    async def on_chunk(chunk: Dict[str, Any]):
+        if executor:
+            await loop.run_in_executor(executor, writer.write, chunk)
+        else:
+            writer.write(chunk)
+
+    try:
+        result = await client.send_streaming(
+            "export_node", {"nodeId": node_id, "format": format, "chunkSize": chunk_size}, on_chunk
+        )
+        if writer.chunks == 0 and isinstance(result, dict) and "data" in result:
+            # Bridge without chunking: the whole image in one message, decoded like a chunk
+            await on_chunk({"data": result["data"]})
+            result = {}
+    except Exception as e:
+        writer.abort()
+        logger.error(f"Failed to export {node_id}: {e}")
+        raise
+
+    if writer.chunks:
+        return await loop.run_in_executor(executor, writer.finish, result) if executor else writer.finish(result)
 
     # Fallback if result isn't data (e.g. maybe it's a URL or success message)
+    writer.abort()
     logger.info(f"Export command finished. Result: {result}")
     return str(result)
+
+async def export_nodes(
+    client: FigmaClient,
+    nodes: Dict[str, str],
+    format: str,
+    max_in_flight: int = 4,
+    executor: Optional[Executor] = None
+) -> Dict[str, CommandResult]:
+    """
+    Export each node ID in `nodes` to its output path, at most
+    `max_in_flight` at a time, decoding and writing on `executor`
+    (a private thread pool by default). Returns a result per node.
+    """
+    slots = asyncio.Semaphore(max(1, max_in_flight))
+    pool = executor or ThreadPoolExecutor(max(1, max_in_flight), thread_name_prefix="ray-studio-figma-export")
+
+    async def run(node_id: str, path: str) -> CommandResult:
+        params = {"nodeId": node_id, "format": format}
+        async with slots:
+            try:
+                return CommandResult("export_node", params, result=await export_node(client, node_id, format, path, executor=pool))
+            except Exception as e:
+                return CommandResult("export_node", params, error=str(e) or type(e).__name__)
+
+    try:
+        results = await asyncio.gather(*[run(node_id, path) for node_id, path in nodes.items()])
+    finally:
+        if executor is None:
+            pool.shutdown()
+    return dict(zip(nodes, results))
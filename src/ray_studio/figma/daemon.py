@@ -0,0 +1,258 @@
+import asyncio
+import json
+import logging
+import os
+import re
+import tempfile
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from .client import MAX_IN_FLIGHT, CommandResult, FigmaClient, bridge_uri
+
+logger = logging.getLogger(__name__)
+
+# Longest request or response line (exports come back base64-encoded)
+LINE_LIMIT = 64 * 1024 * 1024
+
+def default_socket_path(channel: str) -> str:
+    """
+    Where the daemon for `channel` listens; $RAY_STUDIO_FIGMA_SOCKET overrides it.
+    Without $XDG_RUNTIME_DIR it goes in a per-user directory under the shared
+    temp dir, which the daemon creates private (0700).
+    """
+    if os.environ.get("RAY_STUDIO_FIGMA_SOCKET"):
+        return os.environ["RAY_STUDIO_FIGMA_SOCKET"]
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or os.path.join(tempfile.gettempdir(), f"ray-studio-{os.getuid()}")
+    return os.path.join(runtime_dir, f"ray-studio-figma-{re.sub(r'[^A-Za-z0-9_.-]', '_', channel)}.sock")
+
+def _private_dir(path: str):
+    """Create `path` for this user only, refusing one another user could write to."""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    st = os.stat(path)
+    if st.st_uid != os.getuid() or st.st_mode & 0o022:
+        raise RuntimeError(f"{path} is writable by other users; refusing to put the daemon socket there")
+
+def _owned(path: str) -> bool:
+    """Whether the socket at `path` belongs to this user (anyone else's could be an impostor)."""
+    try:
+        return os.stat(path).st_uid == os.getuid()
+    except OSError:
+        return False
+
+class FigmaDaemon:
+    """
+    Keeps one `FigmaClient` connected to the bridge (reconnecting as the
+    client does) and serves its commands on a local Unix socket, so each
+    CLI invocation costs one bridge round trip instead of connect + join.
+
+    Protocol: one JSON object per line each way.
+      {"command": str, "params": {}, "timeout": s}   -> {"result": ...} or {"error": str}
+      {"batch": [[command, params], ...], "max_in_flight": n, "timeout": s}
+                                                     -> {"results": [{"result"|"error": ...}, ...]}
+      {"stream": true, "command": str, "params": {}, "timeout": s}
+                                                     -> {"chunk": {...}} lines, then {"result": ...} or {"error": str}
+      {"ping": true}                                 -> {"result": {"channel", "uri", "connected"}}
+    """
+
+    def __init__(self, client: FigmaClient, socket_path: str):
+        self.client = client
+        self.socket_path = socket_path
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        """Listen on the socket; the client must already be connected."""
+        _private_dir(os.path.dirname(os.path.abspath(self.socket_path)))
+        if os.path.exists(self.socket_path):
+            if await _answers(self.socket_path):
+                raise RuntimeError(f"A Figma daemon is already listening on {self.socket_path}")
+            # Left behind by a daemon that didn't shut down cleanly
+            os.unlink(self.socket_path)
+        self.server = await asyncio.start_unix_server(self._handle, self.socket_path, limit=LINE_LIMIT)
+        # Same-user only: anyone who can connect can drive the Figma document
+        os.chmod(self.socket_path, 0o600)
+        logger.info(f"Figma daemon listening on {self.socket_path}")
+
+    async def close(self):
+        """Stop listening, remove the socket and disconnect from the bridge."""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+        await self.client.disconnect()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    response = await self._dispatch(json.loads(line), writer)
+                except Exception as e:
+                    response = {"error": str(e) or type(e).__name__}
+                await _send_line(writer, response)
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError) as e:
+            logger.warning(f"Dropped daemon connection: {e}")
+        finally:
+            writer.close()
+
+    async def _dispatch(self, request: Dict[str, Any], writer: asyncio.StreamWriter) -> Dict[str, Any]:
+        timeout = float(request.get("timeout", 10.0))
+        if request.get("stream"):
+            # Relay each chunk as its own line as soon as it arrives
+            async def on_chunk(chunk: Dict[str, Any]):
+                await _send_line(writer, {"chunk": chunk})
+            return {"result": await self.client.send_streaming(request["command"], request.get("params") or {}, on_chunk, timeout)}
+        if request.get("ping"):
+            return {"result": {"channel": self.client.channel, "uri": self.client.uri, "connected": self.client.connected}}
+        if "batch" in request:
+            results = await self.client.send_many(
+                [(command, params) for command, params in request["batch"]],
+                int(request.get("max_in_flight", MAX_IN_FLIGHT)),
+                timeout
+            )
+            return {"results": [{"result": r.result, "error": r.error} for r in results]}
+        return {"result": await self.client.send_command(request["command"], request.get("params") or {}, timeout)}
+
+class DaemonClient:
+    """
+    Sends commands through a running `figma daemon`. Has the same command
+    API as `FigmaClient`, so `commands` work with either.
+    """
+
+    def __init__(self, socket_path: str):
+        self.socket_path = socket_path
+        self.channel: Optional[str] = None
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        # One request at a time per connection; responses come back in order.
+        # Streams open their own connection instead.
+        self._lock = asyncio.Lock()
+
+    async def connect(self, channel: Optional[str] = None):
+        self.channel = channel
+        self.reader, self.writer = await asyncio.open_unix_connection(self.socket_path, limit=LINE_LIMIT)
+
+    async def disconnect(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except ConnectionError:
+                pass
+            self.writer = None
+
+    async def _call(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        if self.writer is None:
+            raise RuntimeError("Client is not running. Call connect() first.")
+        async with self._lock:
+            await _send_line(self.writer, request)
+            line = await self.reader.readline()
+        if not line:
+            raise ConnectionError("Figma daemon closed the connection")
+        return json.loads(line)
+
+    async def ping(self) -> Dict[str, Any]:
+        return (await self._call({"ping": True}))["result"]
+
+    async def send_command(self, command: str, params: Dict[str, Any], timeout: float = 10.0) -> Any:
+        response = await self._call({"command": command, "params": params, "timeout": timeout})
+        if "error" in response:
+            raise Exception(response["error"])
+        return response.get("result")
+
+    async def send_streaming(
+        self,
+        command: str,
+        params: Dict[str, Any],
+        on_chunk: Callable[[Dict[str, Any]], Awaitable[None]],
+        timeout: float = 10.0
+    ) -> Any:
+        if self.writer is None:
+            raise RuntimeError("Client is not running. Call connect() first.")
+        # A connection of its own, so concurrent streams (export-many -j N) run
+        # side by side instead of queueing behind each other on `_lock`
+        reader, writer = await asyncio.open_unix_connection(self.socket_path, limit=LINE_LIMIT)
+        try:
+            await _send_line(writer, {"stream": True, "command": command, "params": params, "timeout": timeout})
+            while True:
+                line = await reader.readline()
+                if not line:
+                    raise ConnectionError("Figma daemon closed the connection")
+                response = json.loads(line)
+                if "chunk" not in response:
+                    break
+                await on_chunk(response["chunk"])
+        finally:
+            writer.close()
+        if "error" in response:
+            raise Exception(response["error"])
+        return response.get("result")
+
+    async def send_many(
+        self,
+        commands: List[Tuple[str, Dict[str, Any]]],
+        max_in_flight: int = MAX_IN_FLIGHT,
+        timeout: float = 10.0
+    ) -> List[CommandResult]:
+        response = await self._call({"batch": commands, "max_in_flight": max_in_flight, "timeout": timeout})
+        if "error" in response:
+            raise Exception(response["error"])
+        return [
+            CommandResult(command, params, result=item.get("result"), error=item.get("error"))
+            for (command, params), item in zip(commands, response["results"])
+        ]
+
+async def _send_line(writer: asyncio.StreamWriter, message: Dict[str, Any]):
+    writer.write(json.dumps(message).encode("utf-8") + b"\n")
+    await writer.drain()
+
+async def _answers(socket_path: str) -> bool:
+    try:
+        _, writer = await asyncio.open_unix_connection(socket_path)
+    except OSError:
+        return False
+    writer.close()
+    return True
+
+@asynccontextmanager
+async def connect_client(
+    host: str,
+    port: int,
+    channel: str,
+    socket_path: Optional[str] = None
+) -> AsyncIterator[Union[FigmaClient, DaemonClient]]:
+    """
+    Connected client for `channel`: through the daemon when one of ours is
+    listening on `socket_path` (default: the channel's) for the same bridge
+    and channel, otherwise straight to the bridge at `host`:`port`.
+    """
+    path = socket_path or default_socket_path(channel)
+    client: Union[FigmaClient, DaemonClient, None] = None
+    if os.path.exists(path) and not _owned(path):
+        logger.warning(f"Ignoring daemon socket {path}: owned by another user")
+    elif os.path.exists(path):
+        try:
+            client = DaemonClient(path)
+            await client.connect(channel)
+            state = await client.ping()
+        except (OSError, ValueError, KeyError):
+            logger.info(f"Ignoring stale daemon socket {path}")
+            await client.disconnect()
+            client = None
+        else:
+            if (state["uri"], state["channel"]) != (bridge_uri(host, port), channel):
+                logger.info(f"Daemon at {path} serves {state['uri']} channel {state['channel']}; connecting directly")
+                await client.disconnect()
+                client = None
+            else:
+                logger.debug(f"Using Figma daemon at {path}")
+    if client is None:
+        client = FigmaClient(host=host, port=port)
+        await client.connect(channel)
+    try:
+        yield client
+    finally:
+        await client.disconnect()
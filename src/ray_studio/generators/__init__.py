@@ -1,11 +1,39 @@
 import os
+from typing import Optional
 from .base import GeneratorBase
+from .cache import CachedGenerator
 from .fal import FalGenerator
+from .hedged import Backend, HedgedGenerator
+from .procedural import ProceduralGenerator
+from .singleflight import SingleFlightGenerator
+from .stub import StubGenerator
 
-def get_generator() -> GeneratorBase:
-    """Get the configured generator."""
-    # Default to Fal for now
-    api_key = os.getenv("FAL_API_KEY")
-    return FalGenerator(api_key=api_key)
+GENERATORS = {
+    "fal": FalGenerator,
+    "procedural": ProceduralGenerator,
+    "stub": StubGenerator,
+}
 
-__all__ = ["GeneratorBase", "FalGenerator", "get_generator"]
+def get_generator(name: Optional[str] = None) -> GeneratorBase:
+    """
+    Get the configured generator.
+    `name` falls back to the RAY_STUDIO_GENERATOR env var, then to fal.
+    A comma-separated list ("fal,procedural") hedges across the backends
+    in that priority order.
+    """
+    name = (name or os.getenv("RAY_STUDIO_GENERATOR") or "fal").lower()
+    names = [n.strip() for n in name.split(",") if n.strip()]
+    if len(names) > 1:
+        return HedgedGenerator([Backend(n, _create(n), priority) for priority, n in enumerate(names)])
+    return _create(names[0] if names else name)
+
+def _create(name: str) -> GeneratorBase:
+    if name not in GENERATORS:
+        raise ValueError(f"Unknown generator: {name} (available: {', '.join(GENERATORS)})")
+
+    if name == "fal":
+        api_key = os.getenv("FAL_API_KEY")
+        return FalGenerator(api_key=api_key)
+    return GENERATORS[name]()
+
+__all__ = ["GeneratorBase", "Backend", "CachedGenerator", "FalGenerator", "HedgedGenerator", "ProceduralGenerator", "SingleFlightGenerator", "StubGenerator", "GENERATORS", "get_generator"]
@@ -1,5 +1,10 @@
+import asyncio
+import io
+import os
+import tempfile
 from abc import ABC, abstractmethod
-from typing import Optional, Tuple
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
+from PIL import Image
 from ..dna.schema import BrandDNA
 
 class GeneratorBase(ABC):
@@ -16,6 +21,51 @@ class GeneratorBase(ABC):
         """Generate image from prompt."""
         pass
 
+    async def generate_many(
+        self,
+        prompt: str,
+        size: Tuple[int, int] = (1024, 1024),
+        model: str = "flux/schnell",
+        seeds: Optional[Sequence[Optional[int]]] = None,
+        count: Optional[int] = None
+    ) -> List[bytes]:
+        """
+        Generate one image per seed, or `count` unseeded variants.
+        Providers that batch (`num_images`) override this to use one round trip.
+        """
+        seeds = variant_seeds(seeds, count)
+        return list(await asyncio.gather(*[self.generate(prompt, size=size, model=model, seed=s) for s in seeds]))
+
+    async def generate_to_file(
+        self,
+        path: str,
+        prompt: str,
+        size: Tuple[int, int] = (1024, 1024),
+        model: str = "flux/schnell",
+        seed: Optional[int] = None
+    ):
+        """
+        Generate image from prompt into `path` (written atomically).
+        Providers that download override this to stream the body to disk.
+        """
+        data = await self.generate(prompt, size=size, model=model, seed=seed)
+        write_atomic(path, data)
+
+    async def generate_image(
+        self,
+        prompt: str,
+        size: Tuple[int, int] = (1024, 1024),
+        model: str = "flux/schnell",
+        seed: Optional[int] = None,
+        box: Optional[Tuple[int, int]] = None,
+        resample: Image.Resampling = Image.Resampling.LANCZOS
+    ) -> Image.Image:
+        """Generate and decode straight to `box` (default: `size`), in RGB unless the image has alpha."""
+        from ..compositor.images import decode_image
+
+        data = await self.generate(prompt, size=size, model=model, seed=seed)
+        return decode_image(io.BytesIO(data), box or size, "stretch", resample)
+
     @abstractmethod
     async def generate_with_style(
         self,
@@ -26,3 +76,54 @@ class GeneratorBase(ABC):
     ) -> bytes:
         """Generate with brand style applied."""
         pass
+
+    async def aclose(self):
+        """Close connection pools held for the running loop; wrappers close what they wrap."""
+        pass
+
+    def spec(self) -> str:
+        """Which backend(s) produce the images, as named for `get_generator` ("fal", "fal,procedural")."""
+        name = type(self).__name__
+        return name[:-len("Generator")].lower() if name.endswith("Generator") else name
+
+def variant_seeds(seeds: Optional[Sequence[Optional[int]]], count: Optional[int]) -> List[Optional[int]]:
+    """Normalise the `seeds`/`count` arguments of generate_many."""
+    if seeds is not None and count is not None and count != len(seeds):
+        raise ValueError("Pass either seeds or count, not both")
+    if seeds is not None:
+        return list(seeds)
+    if count is None or count < 1:
+        raise ValueError("generate_many needs seeds or a positive count")
+    return [None] * count
+
+def write_atomic(path: str, data: bytes):
+    """Write `data` to a temp file next to `path` and move it into place."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+async def write_stream(path: str, chunks: AsyncIterator[bytes]) -> int:
+    """Like write_atomic for a chunk stream; never holds the whole body. Returns the size."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".part")
+    try:
+        size = 0
+        with os.fdopen(fd, "wb") as f:
+            async for chunk in chunks:
+                f.write(chunk)
+                size += len(chunk)
+        os.replace(tmp, path)
+        return size
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
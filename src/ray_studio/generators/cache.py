@@ -0,0 +1,144 @@
+import glob
+import hashlib
+import os
+import re
+from typing import Optional, Tuple
+from PIL import Image
+from .base import GeneratorBase, write_atomic
+from ..dna.schema import BrandDNA
+from .. import tracing
+
+class CachedGenerator(GeneratorBase):
+    """
+    Keeps generated backgrounds on disk per (backend, prompt, model, seed, size).
+
+    Seeded requests are reproducible, so they are answered from the cache.
+    Unseeded ones are random by intent and only reuse cached images when
+    `reuse_any_size` is set. That flag also lets a request take the same
+    background at any cached size (the layer resizes it to the canvas), which
+    is how draft renders reuse a full render's background.
+    """
+
+    def __init__(self, generator: GeneratorBase, cache_dir: Optional[str] = None, reuse_any_size: bool = False):
+        from ..compositor.fetcher import default_cache_dir
+
+        self.generator = generator
+        self.cache_dir = os.path.join(cache_dir or default_cache_dir(), "backgrounds")
+        self.reuse_any_size = reuse_any_size
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, prompt: str, model: str, seed: Optional[int]) -> str:
+        # The size is left to the file name, so `reuse_any_size` can glob every size of one key
+        key = f"{self.generator.spec()}|{model}|{seed}|{prompt}"
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str, size: Tuple[int, int]) -> str:
+        return os.path.join(self.cache_dir, f"{key}-{size[0]}x{size[1]}.img")
+
+    def find(self, prompt: str, size: Tuple[int, int], model: str = "flux/schnell", seed: Optional[int] = None) -> Optional[str]:
+        """Path of a cached image that may answer the request, or None."""
+        if seed is None and not self.reuse_any_size:
+            return None
+        key = self._key(prompt, model, seed)
+        path = self._path(key, size)
+        if os.path.exists(path):
+            return path
+        if self.reuse_any_size:
+            # Largest cached size first: downscaling keeps drafts sharp
+            others = sorted(glob.glob(os.path.join(self.cache_dir, f"{key}-*.img")), key=_pixels, reverse=True)
+            if others:
+                return others[0]
+        return None
+
+    def lookup(self, prompt: str, size: Tuple[int, int], model: str = "flux/schnell", seed: Optional[int] = None) -> Optional[bytes]:
+        """Cached bytes for the request, or None."""
+        path = self.find(prompt, size, model, seed)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    async def generate(
+        self,
+        prompt: str,
+        size: Tuple[int, int] = (1024, 1024),
+        model: str = "flux/schnell",
+        seed: Optional[int] = None
+    ) -> bytes:
+        """Generate image from prompt, or reuse a cached one."""
+        data = self.lookup(prompt, size, model, seed)
+        if data is not None:
+            self.hits += 1
+            tracing.count("background.cache_hit")
+            return data
+        self.misses += 1
+        tracing.count("background.cache_miss")
+
+        data = await self.generator.generate(prompt, size=size, model=model, seed=seed)
+        try:
+            write_atomic(self._path(self._key(prompt, model, seed), size), data)
+        except OSError:
+            # A read-only or full cache shouldn't fail the render
+            pass
+        return data
+
+    async def generate_image(
+        self,
+        prompt: str,
+        size: Tuple[int, int] = (1024, 1024),
+        model: str = "flux/schnell",
+        seed: Optional[int] = None,
+        box: Optional[Tuple[int, int]] = None,
+        resample: Image.Resampling = Image.Resampling.LANCZOS
+    ) -> Image.Image:
+        """Generate into the cache file (streamed by providers that download) and decode from disk."""
+        from ..compositor.images import decode_image
+
+        try:
+            path = await self.ensure(prompt, size, model, seed)
+        except OSError:
+            return await self.generator.generate_image(prompt, size, model, seed, box, resample)
+        return decode_image(path, box or size, "stretch", resample)
+
+    async def ensure(
+        self,
+        prompt: str,
+        size: Tuple[int, int] = (1024, 1024),
+        model: str = "flux/schnell",
+        seed: Optional[int] = None
+    ) -> str:
+        """Path of a cached image for the request, generating into the cache on a miss."""
+        path = self.find(prompt, size, model, seed)
+        if path is not None:
+            self.hits += 1
+            tracing.count("background.cache_hit")
+            return path
+        self.misses += 1
+        tracing.count("background.cache_miss")
+        path = self._path(self._key(prompt, model, seed), size)
+        await self.generator.generate_to_file(path, prompt, size=size, model=model, seed=seed)
+        return path
+
+    async def generate_with_style(
+        self,
+        prompt: str,
+        style: str,
+        dna: BrandDNA,
+        size: Tuple[int, int]
+    ) -> bytes:
+        """Generate with brand style applied"""
+        return await self.generator.generate_with_style(prompt, style, dna, size)
+
+    async def aclose(self):
+        await self.generator.aclose()
+
+    def spec(self) -> str:
+        return self.generator.spec()
+
+def _pixels(path: str) -> int:
+    match = re.search(r"-(\d+)x(\d+)\.img$", path)
+    return int(match.group(1)) * int(match.group(2)) if match else 0
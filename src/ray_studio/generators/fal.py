@@ -1,21 +1,45 @@
+import asyncio
 import httpx
 import os
-from typing import Tuple, Optional
-from .base import GeneratorBase
+import weakref
+from typing import List, Optional, Sequence, Tuple
+from .base import GeneratorBase, variant_seeds, write_stream
+from .scheduler import RequestScheduler
 from ..dna.schema import BrandDNA
+from .. import tracing
 
 class FalGenerator(GeneratorBase):
     """fal.ai Flux image generation"""
 
     BASE_URL = "https://fal.run/fal-ai"
+    # Most images fal returns for one request
+    MAX_IMAGES = 4
 
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, scheduler: Optional[RequestScheduler] = None):
         self.api_key = api_key or os.getenv("FAL_API_KEY")
         if not self.api_key:
             # We don't raise error here to allow instantiating for testing/mocking,
             # but it will fail on generate if not provided.
             pass
+        # Rate limit, adaptive concurrency and retries for fal.ai calls
+        self.scheduler = scheduler or RequestScheduler()
+        # One connection pool per event loop; httpx clients can't cross loops
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
 
+    def _client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = self._clients[loop] = httpx.AsyncClient(headers={"Authorization": f"Key {self.api_key}"})
+        return client
+
+    async def aclose(self):
+        """Close the connection pool of the running loop."""
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    @tracing.traced("generator.generate")
     async def generate(
         self,
         prompt: str,
@@ -28,27 +52,103 @@ class FalGenerator(GeneratorBase):
         if not self.api_key:
             raise ValueError("FAL_API_KEY is not set")
 
-        async with httpx.AsyncClient(headers={"Authorization": f"Key {self.api_key}"}) as client:
+        images = await self.scheduler.run(lambda: self._request(prompt, size, model, seed, 1))
+        return images[0]
+
+    @tracing.traced("generator.generate")
+    async def generate_to_file(
+        self,
+        path: str,
+        prompt: str,
+        size: Tuple[int, int] = (1024, 1024),
+        model: str = "flux/schnell",
+        seed: Optional[int] = None
+    ):
+        """Generate image from prompt, streaming the download into `path`."""
+        if not self.api_key:
+            raise ValueError("FAL_API_KEY is not set")
+
+        await self.scheduler.run(lambda: self._request(prompt, size, model, seed, 1, dest=path))
+
+    @tracing.traced("generator.generate_many")
+    async def generate_many(
+        self,
+        prompt: str,
+        size: Tuple[int, int] = (1024, 1024),
+        model: str = "flux/schnell",
+        seeds: Optional[Sequence[Optional[int]]] = None,
+        count: Optional[int] = None
+    ) -> List[bytes]:
+        """
+        Generate several variants. Unseeded variants are batched with `num_images`,
+        up to MAX_IMAGES per request; fal derives a batch from a single seed, so
+        each explicit seed gets its own request and matches `generate(seed=...)`.
+        """
+        if not self.api_key:
+            raise ValueError("FAL_API_KEY is not set")
+
+        seeds = variant_seeds(seeds, count)
+        unseeded = [i for i, seed in enumerate(seeds) if seed is None]
+        # (positions in the result, seed) per request
+        requests = [([i], seed) for i, seed in enumerate(seeds) if seed is not None]
+        requests += [(unseeded[i:i + self.MAX_IMAGES], None) for i in range(0, len(unseeded), self.MAX_IMAGES)]
+        batches = await asyncio.gather(*[
+            self.scheduler.run(lambda seed=seed, n=len(positions): self._request(prompt, size, model, seed, n))
+            for positions, seed in requests
+        ])
+        images: List[Optional[bytes]] = [None] * len(seeds)
+        for (positions, _), batch in zip(requests, batches):
+            for position, image in zip(positions, batch):
+                images[position] = image
+        return images
+
+    async def _request(
+        self,
+        prompt: str,
+        size: Tuple[int, int],
+        model: str,
+        seed: Optional[int],
+        num_images: int,
+        dest: Optional[str] = None
+    ) -> List[bytes]:
+        """POST the generation and download the results (or stream the single result to `dest`)."""
+        client = self._client()
+        with tracing.span("generator.post", model=model, num_images=num_images):
             response = await client.post(
                 f"{self.BASE_URL}/{model}",
                 json={
                     "prompt": prompt,
                     "image_size": {"width": size[0], "height": size[1]},
                     "seed": seed,
-                    "num_images": 1
+                    "num_images": num_images
                 },
                 timeout=60.0
             )
 
-            response.raise_for_status()
-            result = response.json()
-            image_url = result["images"][0]["url"]
+        response.raise_for_status()
+        result = response.json()
+        if len(result["images"]) < num_images:
+            raise ValueError(f"fal returned {len(result['images'])} of {num_images} requested images")
+        image_urls = [image["url"] for image in result["images"][:num_images]]
 
-            # Download image
-            img_response = await client.get(image_url, timeout=30.0)
-            img_response.raise_for_status()
+        if dest is not None:
+            with tracing.span("generator.download"):
+                async with client.stream("GET", image_urls[0], timeout=30.0) as img_response:
+                    img_response.raise_for_status()
+                    written = await write_stream(dest, img_response.aiter_bytes())
+            tracing.count("generator.bytes_downloaded", written)
+            return []
+
+        # Download all images concurrently over the same connection pool
+        async def download(url: str) -> bytes:
+            with tracing.span("generator.download"):
+                img_response = await client.get(url, timeout=30.0)
+                img_response.raise_for_status()
+            tracing.count("generator.bytes_downloaded", len(img_response.content))
             return img_response.content
 
+        return list(await asyncio.gather(*[download(url) for url in image_urls]))
+
     async def generate_with_style(
         self,
         prompt: str,
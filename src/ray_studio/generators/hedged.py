@@ -0,0 +1,155 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+from .base import GeneratorBase
+from .scheduler import LatencyWindow
+from ..dna.schema import BrandDNA
+from .. import tracing
+
+class Backend:
+    """A generator with a priority (lower runs first) and its latency history."""
+
+    def __init__(self, name: str, generator: GeneratorBase, priority: int = 0):
+        self.name = name
+        self.generator = generator
+        self.priority = priority
+        self.latency = LatencyWindow()
+        self.wins = 0
+        self.failures = 0
+
+class HedgedGenerator(GeneratorBase):
+    """
+    Races several generator backends in priority order.
+
+    The first backend starts immediately. If it hasn't answered within its
+    own p95 latency (`default_delay` until `min_samples` are recorded), a
+    hedged request goes to the next backend, and so on; the first success
+    wins and the rest are cancelled. An error fails over to the next
+    backend at once. Only the error of the last backend is raised.
+    """
+
+    def __init__(
+        self,
+        backends: List[Backend],
+        hedge_percentile: float = 95.0,
+        default_delay: float = 10.0,
+        min_delay: float = 0.05,
+        min_samples: int = 5
+    ):
+        if not backends:
+            raise ValueError("HedgedGenerator needs at least one backend")
+        self.backends = sorted(backends, key=lambda b: b.priority)
+        self.hedge_percentile = hedge_percentile
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.hedges = 0
+
+    def hedge_delay(self, backend: Backend) -> float:
+        """How long to give `backend` before hedging to the next one."""
+        if len(backend.latency.samples) < self.min_samples:
+            return self.default_delay
+        return max(self.min_delay, backend.latency.percentile(self.hedge_percentile))
+
+    async def generate(
+        self,
+        prompt: str,
+        size: Tuple[int, int] = (1024, 1024),
+        model: str = "flux/schnell",
+        seed: Optional[int] = None
+    ) -> bytes:
+        """Generate image from prompt on whichever backend answers first."""
+        return await self._race(lambda g: g.generate(prompt, size=size, model=model, seed=seed))
+
+    async def generate_many(
+        self,
+        prompt: str,
+        size: Tuple[int, int] = (1024, 1024),
+        model: str = "flux/schnell",
+        seeds: Optional[Sequence[Optional[int]]] = None,
+        count: Optional[int] = None
+    ) -> List[bytes]:
+        """Generate variants as one batch on whichever backend answers first."""
+        return await self._race(lambda g: g.generate_many(prompt, size=size, model=model, seeds=seeds, count=count))
+
+    async def generate_with_style(
+        self,
+        prompt: str,
+        style: str,
+        dna: BrandDNA,
+        size: Tuple[int, int]
+    ) -> bytes:
+        """Generate with brand style applied"""
+        return await self._race(lambda g: g.generate_with_style(prompt, style, dna, size))
+
+    async def aclose(self):
+        await asyncio.gather(*[backend.generator.aclose() for backend in self.backends])
+
+    def spec(self) -> str:
+        return ",".join(backend.generator.spec() for backend in self.backends)
+
+    async def _race(self, call: Callable[[GeneratorBase], Awaitable[Any]]) -> Any:
+        pending: Dict[asyncio.Task, Tuple[Backend, float]] = {}
+        queue = list(self.backends)
+        last_error: Optional[BaseException] = None
+
+        def start_next():
+            backend = queue.pop(0)
+            pending[asyncio.ensure_future(call(backend.generator))] = (backend, time.monotonic())
+
+        start_next()
+        try:
+            while pending:
+                # Hedge deadline of the most recently started request
+                newest, started = list(pending.values())[-1]
+                timeout = max(0.0, started + self.hedge_delay(newest) - time.monotonic()) if queue else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    self.hedges += 1
+                    tracing.count("generator.hedged")
+                    start_next()
+                    continue
+
+                result = None
+                for task in done:
+                    backend, started = pending.pop(task)
+                    error = task.exception()
+                    if error is not None:
+                        backend.failures += 1
+                        last_error = error
+                        tracing.count("generator.failover")
+                    else:
+                        backend.latency.record(time.monotonic() - started)
+                        if result is None:
+                            backend.wins += 1
+                            result = task.result()
+                if result is not None:
+                    return result
+                if queue:
+                    # Fail over now instead of waiting for the hedge deadline
+                    start_next()
+            raise last_error
+        finally:
+            now = time.monotonic()
+            for task, (backend, started) in pending.items():
+                # A cancelled request took at least this long; leaving it out
+                # would bias the backend's percentiles (and its hedge delay) low
+                backend.latency.record(now - started)
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        backends = {}
+        for backend in self.backends:
+            p50, p95 = backend.latency.percentile(50), backend.latency.percentile(95)
+            backends[backend.name] = {
+                "priority": backend.priority,
+                "wins": backend.wins,
+                "failures": backend.failures,
+                "latency_p50_ms": p50 * 1000 if p50 is not None else None,
+                "latency_p95_ms": p95 * 1000 if p95 is not None else None,
+                "hedge_delay_ms": self.hedge_delay(backend) * 1000,
+            }
+        return {"hedges": self.hedges, "backends": backends}
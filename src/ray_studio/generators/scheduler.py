@@ -0,0 +1,241 @@
+import asyncio
+import collections
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+import httpx
+
+from .. import tracing
+
+T = TypeVar("T")
+
+# Transient statuses worth retrying; 429 additionally shrinks the window
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+class LatencyWindow:
+    """Latencies (seconds) of the most recent requests."""
+
+    def __init__(self, size: int = 256):
+        self.samples: Deque[float] = collections.deque(maxlen=size)
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        return tracing.percentile(self.samples, pct) if self.samples else None
+
+class TokenBucket:
+    """
+    Requests per second limit with bursts of up to `burst` requests.
+    Callers reserve a token up front (the balance may go negative) and sleep
+    until it is theirs, so no lock is needed and waiters are served in order.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        """Take a token; return how long to wait before using it."""
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens -= 1
+        return max(0.0, -self.tokens / self.rate)
+
+    async def acquire(self):
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def pause(self, seconds: float):
+        """Hold all new requests back for `seconds` (e.g. a server's Retry-After)."""
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens = min(self.tokens, -seconds * self.rate)
+
+class AdaptiveLimiter:
+    """
+    Concurrency window tuned by AIMD: each success grows the limit by
+    1/limit (about +1 per window of requests), a throttle or a latency
+    above target halves it. At most one decrease per round trip, so a
+    burst of 429s from one window only counts once.
+    """
+
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 32, backoff: float = 0.5):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = collections.deque()
+        self._last_decrease = 0.0
+
+    @property
+    def waiting(self) -> int:
+        return sum(1 for w in self._waiters if not w.done())
+
+    async def acquire(self):
+        if self.active < int(self.limit) and not self.waiting:
+            self.active += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # The slot may have been handed over just before the cancel landed
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        self.active -= 1
+        self._wake()
+
+    def _wake(self):
+        while self._waiters and self.active < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.active += 1
+                waiter.set_result(None)
+
+    def on_success(self):
+        self.limit = min(self.maximum, self.limit + 1 / self.limit)
+        self._wake()
+
+    def on_congestion(self, rtt: float):
+        now = time.monotonic()
+        if now - self._last_decrease < rtt:
+            return
+        self._last_decrease = now
+        self.limit = max(self.minimum, self.limit * self.backoff)
+
+def retry_after(response: Optional[httpx.Response]) -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds or HTTP date)."""
+    value = response.headers.get("retry-after") if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class RequestScheduler:
+    """
+    Runs provider calls under a token-bucket rate limit and an adaptive
+    concurrency window, retrying 429s, transient 5xx and transport errors
+    with exponential backoff and full jitter (never sooner than the
+    server's Retry-After).
+    """
+
+    def __init__(
+        self,
+        rate: float = 5.0,
+        burst: int = 10,
+        concurrency: int = 4,
+        min_concurrency: int = 1,
+        max_concurrency: int = 32,
+        max_retries: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        target_latency: Optional[float] = None
+    ):
+        self.bucket = TokenBucket(rate, burst)
+        self.limiter = AdaptiveLimiter(concurrency, min_concurrency, max_concurrency)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        # Latency above this counts as congestion; None reacts to 429s only
+        self.target_latency = target_latency
+        self.latency = LatencyWindow()
+        self.queued = 0
+        self.counts = {"requests": 0, "retries": 0, "throttled": 0, "failures": 0}
+
+    async def run(self, call: Callable[[], Awaitable[T]]) -> T:
+        """Await `call()` under the limits, retrying transient failures."""
+        self.counts["requests"] += 1
+        attempt = 0
+        while True:
+            self.queued += 1
+            try:
+                with tracing.span("scheduler.wait"):
+                    await self.bucket.acquire()
+                    await self.limiter.acquire()
+            finally:
+                self.queued -= 1
+
+            start = time.monotonic()
+            error = None
+            try:
+                result = await call()
+            except Exception as e:
+                error = e
+            finally:
+                # Free the slot before any backoff sleep
+                self.limiter.release()
+            elapsed = time.monotonic() - start
+
+            if error is not None:
+                delay = self._retry_delay(error, attempt, elapsed)
+                if delay is None:
+                    self.counts["failures"] += 1
+                    raise error
+                attempt += 1
+                self.counts["retries"] += 1
+                tracing.count("scheduler.retries")
+                await asyncio.sleep(delay)
+                continue
+
+            self.latency.record(elapsed)
+            if self.target_latency is not None and elapsed > self.target_latency:
+                self.limiter.on_congestion(elapsed)
+            else:
+                self.limiter.on_success()
+            return result
+
+    def _retry_delay(self, error: Exception, attempt: int, elapsed: float) -> Optional[float]:
+        """Backoff before the next attempt, or None if `error` shouldn't be retried."""
+        response = None
+        if isinstance(error, httpx.HTTPStatusError):
+            response = error.response
+            if response.status_code not in RETRY_STATUSES:
+                return None
+        elif not isinstance(error, httpx.TransportError):
+            return None
+        if attempt >= self.max_retries:
+            return None
+
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        wait = retry_after(response)
+        if response is not None and response.status_code == 429:
+            self.counts["throttled"] += 1
+            tracing.count("scheduler.throttled")
+            self.limiter.on_congestion(elapsed)
+            if wait:
+                self.bucket.pause(min(wait, self.max_delay))
+        if wait is not None:
+            delay = max(delay, min(wait, self.max_delay))
+        return delay
+
+    def stats(self) -> Dict[str, Any]:
+        p50, p95 = self.latency.percentile(50), self.latency.percentile(95)
+        return {
+            **self.counts,
+            "queued": self.queued,
+            "in_flight": self.limiter.active,
+            "concurrency": int(self.limiter.limit),
+            "latency_p50_ms": p50 * 1000 if p50 is not None else None,
+            "latency_p95_ms": p95 * 1000 if p95 is not None else None,
+        }
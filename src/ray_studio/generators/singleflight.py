@@ -0,0 +1,108 @@
+import asyncio
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+from .base import GeneratorBase, variant_seeds
+from ..dna.schema import BrandDNA
+from .. import tracing
+
+class _Flight:
+    """One in-flight generation and the number of callers awaiting it."""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+class SingleFlightGenerator(GeneratorBase):
+    """
+    Wraps a generator so concurrent identical requests share one generation.
+
+    Callers asking for the same (prompt, size, model, seed) while a request
+    is in flight await the same task and get the same bytes, or the same
+    exception. Nothing is cached once the request completes. A caller being
+    cancelled doesn't cancel the shared request unless it was the last one
+    waiting.
+    """
+
+    def __init__(self, generator: GeneratorBase):
+        self.generator = generator
+        # In-flight tasks are bound to their event loop
+        self._loops: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, _Flight]]" = weakref.WeakKeyDictionary()
+
+    async def generate(
+        self,
+        prompt: str,
+        size: Tuple[int, int] = (1024, 1024),
+        model: str = "flux/schnell",
+        seed: Optional[int] = None
+    ) -> bytes:
+        """Generate image from prompt, joining an identical in-flight request if any."""
+        key = ("generate", prompt, tuple(size), model, seed)
+        return await self._share(key, lambda: self.generator.generate(prompt, size=size, model=model, seed=seed))
+
+    async def generate_to_file(
+        self,
+        path: str,
+        prompt: str,
+        size: Tuple[int, int] = (1024, 1024),
+        model: str = "flux/schnell",
+        seed: Optional[int] = None
+    ):
+        """Generate into `path`, joining an identical in-flight download if any."""
+        key = ("file", path, prompt, tuple(size), model, seed)
+        return await self._share(key, lambda: self.generator.generate_to_file(path, prompt, size=size, model=model, seed=seed))
+
+    async def generate_many(
+        self,
+        prompt: str,
+        size: Tuple[int, int] = (1024, 1024),
+        model: str = "flux/schnell",
+        seeds: Optional[Sequence[Optional[int]]] = None,
+        count: Optional[int] = None
+    ) -> List[bytes]:
+        """Generate variants, joining an identical in-flight batch if any."""
+        seeds = variant_seeds(seeds, count)
+        key = ("many", prompt, tuple(size), model, tuple(seeds))
+        return await self._share(key, lambda: self.generator.generate_many(prompt, size=size, model=model, seeds=seeds))
+
+    async def generate_with_style(
+        self,
+        prompt: str,
+        style: str,
+        dna: BrandDNA,
+        size: Tuple[int, int]
+    ) -> bytes:
+        """Generate with brand style applied"""
+        key = ("style", prompt, style, dna.model_dump_json(), tuple(size))
+        return await self._share(key, lambda: self.generator.generate_with_style(prompt, style, dna, size))
+
+    async def aclose(self):
+        await self.generator.aclose()
+
+    def spec(self) -> str:
+        return self.generator.spec()
+
+    def in_flight(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> int:
+        """Number of distinct requests currently running on `loop` (default: this one)."""
+        return len(self._loops.get(loop or asyncio.get_running_loop(), {}))
+
+    async def _share(self, key: Hashable, start: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        flights = self._loops.setdefault(loop, {})
+        flight = flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(start()))
+            flights[key] = flight
+            flight.task.add_done_callback(lambda _: flights.pop(key, None) if flights.get(key) is flight else None)
+        else:
+            tracing.count("generator.coalesced")
+
+        flight.waiters += 1
+        try:
+            # Shield so one cancelled caller doesn't cancel the others' request
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
@@ -0,0 +1,41 @@
+import asyncio
+import hashlib
+import io
+from typing import Tuple, Optional
+from PIL import Image
+from .base import GeneratorBase
+from ..dna.schema import BrandDNA
+
+class StubGenerator(GeneratorBase):
+    """Offline generator returning a deterministic flat image per prompt and seed."""
+
+    def __init__(self, latency: float = 0.0):
+        # Optional simulated round-trip time in seconds
+        self.latency = latency
+
+    async def generate(
+        self,
+        prompt: str,
+        size: Tuple[int, int] = (1024, 1024),
+        model: str = "flux/schnell",
+        seed: Optional[int] = None
+    ) -> bytes:
+        """Generate a solid image whose colour is derived from the prompt hash."""
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        digest = hashlib.sha256(f"{prompt}|{seed}".encode("utf-8")).digest()
+        img = Image.new("RGB", size, tuple(digest[:3]))
+        buffer = io.BytesIO()
+        img.save(buffer, format="PNG", compress_level=1)
+        return buffer.getvalue()
+
+    async def generate_with_style(
+        self,
+        prompt: str,
+        style: str,
+        dna: BrandDNA,
+        size: Tuple[int, int]
+    ) -> bytes:
+        """Generate with brand style applied"""
+        return await self.generate(f"{prompt}, {style}", size)
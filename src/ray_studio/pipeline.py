@@ -0,0 +1,101 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+class Stage:
+    """
+    One pipeline step: `workers` coroutines take items from the inbound
+    queue and pass whatever `fn` returns (zero or more items) downstream.
+    Blocking work should be sent to an executor inside `fn`.
+    """
+
+    def __init__(self, name: str, fn: Callable[[Any], Awaitable[Optional[Iterable[Any]]]], workers: int = 1):
+        self.name = name
+        self.fn = fn
+        self.workers = workers
+        self.items = 0
+        self.failures = 0
+        # Seconds summed over workers: running `fn`, waiting for input, waiting for room downstream
+        self.busy = 0.0
+        self.starved = 0.0
+        self.blocked = 0.0
+
+    def stats(self, elapsed: float) -> Dict[str, Any]:
+        capacity = elapsed * self.workers
+        return {
+            "workers": self.workers,
+            "items": self.items,
+            "failures": self.failures,
+            "busy_s": round(self.busy, 3),
+            "starved_s": round(self.starved, 3),
+            "blocked_s": round(self.blocked, 3),
+            # Near 1: the bottleneck, give it more workers; near 0 and starved: over-provisioned
+            "utilisation": round(self.busy / capacity, 3) if capacity else 0.0,
+        }
+
+class Pipeline:
+    """
+    Stages connected by bounded queues. A full queue holds its producers
+    back, so memory stays constant however many items are fed in and each
+    stage keeps its own resource busy while the others work. An item whose
+    stage raises is passed to `on_error` and dropped.
+    """
+
+    def __init__(
+        self,
+        stages: List[Stage],
+        queue_size: int = 8,
+        on_error: Optional[Callable[[Any, Exception], None]] = None
+    ):
+        self.stages = stages
+        self.queue_size = queue_size
+        self.on_error = on_error
+        self.elapsed = 0.0
+
+    async def run(self, items: Iterable[Any]):
+        queues: List[asyncio.Queue] = [asyncio.Queue(self.queue_size) for _ in self.stages]
+        tasks = []
+        for i, stage in enumerate(self.stages):
+            outbox = queues[i + 1] if i + 1 < len(queues) else None
+            tasks += [asyncio.ensure_future(self._work(stage, queues[i], outbox)) for _ in range(stage.workers)]
+
+        start = time.monotonic()
+        try:
+            for item in items:
+                await queues[0].put(item)
+            # A queue's items are only marked done once their outputs are downstream
+            for queue in queues:
+                await queue.join()
+        finally:
+            self.elapsed = time.monotonic() - start
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _work(self, stage: Stage, inbox: asyncio.Queue, outbox: Optional[asyncio.Queue]):
+        while True:
+            waited = time.monotonic()
+            item = await inbox.get()
+            started = time.monotonic()
+            stage.starved += started - waited
+            try:
+                try:
+                    results = await stage.fn(item)
+                except Exception as e:
+                    stage.failures += 1
+                    if self.on_error:
+                        self.on_error(item, e)
+                    continue
+                finally:
+                    stage.busy += time.monotonic() - started
+                stage.items += 1
+                if outbox is not None:
+                    for result in results or ():
+                        waited = time.monotonic()
+                        await outbox.put(result)
+                        stage.blocked += time.monotonic() - waited
+            finally:
+                inbox.task_done()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {stage.name: stage.stats(self.elapsed) for stage in self.stages}
@@ -0,0 +1,350 @@
+import asyncio
+import http
+import io
+import json
+import logging
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from urllib.parse import parse_qsl, urlsplit
+
+import yaml
+from PIL import Image
+
+from .export import PRESETS, ImageFormat
+from .generators import GeneratorBase
+from .generators.scheduler import LatencyWindow
+from .studio import Studio
+
+logger = logging.getLogger(__name__)
+
+# Largest request body accepted (JSON, or an image to export)
+MAX_BODY = 32 * 1024 * 1024
+# Response bodies are written in slices so the loop keeps serving other connections
+CHUNK_SIZE = 64 * 1024
+
+CONTENT_TYPES = {
+    "PNG": "image/png",
+    "JPEG": "image/jpeg",
+    "WEBP": "image/webp",
+    "AVIF": "image/avif",
+    "TIFF": "image/tiff",
+    "BMP": "image/bmp",
+}
+
+# (status, headers, body)
+Response = Tuple[int, Dict[str, str], bytes]
+
+class HTTPError(Exception):
+    """Error answered with `status` and a JSON {"error": message} body."""
+
+    def __init__(self, status: int, message: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+class RenderServer:
+    """
+    Local HTTP render service over a warm `Studio` session.
+
+    Connections are served on one event loop; compositing and encoding run
+    on a pool of `workers` threads. At most `queue_size` requests wait for a
+    worker, beyond that the server answers 429.
+
+    Endpoints:
+      POST /render  JSON {template, dna, inputs, preset, format, size, seed, draft} -> image bytes
+      POST /batch   JSON as /render plus {output_dir, presets} -> {"paths": [...]}
+      POST /export  image bytes, query ?preset=&format=&size=&draft= -> image bytes
+      GET  /health, GET /metrics -> JSON
+
+    Request parameters are checked up front and answered with 400; any
+    other failure is a server error (500). `/batch` only writes under
+    `output_root` (default: the working directory). DNA paths are read as
+    given: the server trusts its clients, so keep it on a local interface.
+    """
+
+    def __init__(
+        self,
+        generator: Union[str, GeneratorBase, None] = None,
+        workers: Optional[int] = None,
+        queue_size: int = 16,
+        cache_dir: Optional[str] = None,
+        output_root: Optional[str] = None
+    ):
+        self.workers = workers or os.cpu_count() or 4
+        self.queue_size = queue_size
+        self.output_root = os.path.realpath(output_root or os.getcwd())
+        self.studio = Studio(generator, cache_dir=cache_dir, export_workers=self.workers)
+        self.executor = ThreadPoolExecutor(self.workers, thread_name_prefix="ray-studio-render")
+        self.latency = LatencyWindow()
+        self.admitted = 0
+        self.counts = {"requests": 0, "rejected": 0, "errors": 0}
+        self.started = time.monotonic()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.routes = {
+            ("GET", "/health"): self.health,
+            ("GET", "/metrics"): self.metrics,
+            ("POST", "/render"): self.render,
+            ("POST", "/batch"): self.batch,
+            ("POST", "/export"): self.export,
+        }
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765) -> asyncio.AbstractServer:
+        """Start listening on the running loop; the caller owns the returned server."""
+        self.loop = asyncio.get_running_loop()
+        return await asyncio.start_server(self._handle, host, port)
+
+    async def serve_forever(self, host: str = "127.0.0.1", port: int = 8765):
+        server = await self.start(host, port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.close()
+
+    def close(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.studio.close()
+
+    # Endpoints
+
+    async def health(self, query: Dict[str, str], body: bytes) -> Response:
+        saturated = self.admitted >= self.workers + self.queue_size
+        return _json(200, {"status": "saturated" if saturated else "ok", "uptime_s": round(time.monotonic() - self.started, 1)})
+
+    async def metrics(self, query: Dict[str, str], body: bytes) -> Response:
+        p50, p95 = self.latency.percentile(50), self.latency.percentile(95)
+        stats = {
+            **self.counts,
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "busy": min(self.admitted, self.workers),
+            "queued": max(0, self.admitted - self.workers),
+            "latency_p50_ms": p50 * 1000 if p50 is not None else None,
+            "latency_p95_ms": p95 * 1000 if p95 is not None else None,
+            **self.studio.stats(),
+        }
+        return _json(200, stats)
+
+    async def render(self, query: Dict[str, str], body: bytes) -> Response:
+        params = _render_params(_parse_json(body))
+        _preset(params.get("preset"))
+        options = _export_options(params)
+        data, fmt = await self._submit(self._render, params, options)
+        return 200, {"Content-Type": CONTENT_TYPES.get(fmt, "application/octet-stream")}, data
+
+    async def batch(self, query: Dict[str, str], body: bytes) -> Response:
+        params = _render_params(_parse_json(body))
+        output_dir = self._output_dir(params.get("output_dir"))
+        presets = params.get("presets") or ["instagram_post", "facebook_post", "gmn_post"]
+        if not isinstance(presets, list):
+            raise HTTPError(400, "'presets' must be a list")
+        for preset in presets:
+            _preset(preset)
+        options = _export_options(params)
+        paths = await self._submit(self._batch, params, output_dir, presets, options)
+        return _json(200, {"paths": paths})
+
+    async def export(self, query: Dict[str, str], body: bytes) -> Response:
+        if not body:
+            raise HTTPError(400, "empty image body")
+        _preset(query.get("preset"))
+        data, fmt = await self._submit(self._export, body, query.get("preset"), _export_options(query))
+        return 200, {"Content-Type": CONTENT_TYPES.get(fmt, "application/octet-stream")}, data
+
+    def _output_dir(self, output_dir: Any) -> str:
+        """`output_dir` resolved under `output_root`; anything escaping it is rejected."""
+        if not output_dir or not isinstance(output_dir, str):
+            raise HTTPError(400, "missing 'output_dir'")
+        path = os.path.realpath(os.path.join(self.output_root, output_dir))
+        if os.path.commonpath([path, self.output_root]) != self.output_root:
+            raise HTTPError(400, f"'output_dir' must be inside {self.output_root}")
+        return path
+
+    # Worker side
+
+    def _render(self, params: Dict[str, Any], options: Dict[str, Any]) -> Tuple[bytes, str]:
+        image = self._render_image(params)
+        try:
+            return self.studio.encode(image, preset=params.get("preset") or "instagram_post", **options)
+        finally:
+            self.studio.release(image)
+
+    def _batch(self, params: Dict[str, Any], output_dir: str, presets: List[str], options: Dict[str, Any]) -> List[str]:
+        image = self._render_image(params)
+        try:
+            return self.studio.export_multi(image, output_dir, presets, **options)
+        finally:
+            self.studio.release(image)
+
+    def _export(self, body: bytes, preset: Optional[str], options: Dict[str, Any]) -> Tuple[bytes, str]:
+        try:
+            image = Image.open(io.BytesIO(body))
+            image.load()
+        except OSError as e:
+            raise HTTPError(400, f"unreadable image: {e}")
+        return self.studio.encode(image, preset=preset, **options)
+
+    def _render_image(self, params: Dict[str, Any]) -> Image.Image:
+        try:
+            # Parsed (or cached) here so invalid files are the client's error, not the renderer's
+            template = self.studio.template(params["template"])
+            dna = self.studio.dna(params["dna"])
+        except (ValueError, yaml.YAMLError) as e:
+            raise HTTPError(400, f"invalid template or DNA: {e}")
+        return self.studio.render(
+            template,
+            dna,
+            inputs=params.get("inputs"),
+            seed=params.get("seed"),
+            draft=_flag(params.get("draft"))
+        )
+
+    async def _submit(self, fn: Callable[..., Any], *args) -> Any:
+        """Run `fn` on the worker pool, or reject with 429 when every slot and queue place is taken."""
+        if self.admitted >= self.workers + self.queue_size:
+            self.counts["rejected"] += 1
+            raise HTTPError(429, "render queue is full", {"Retry-After": "1"})
+        self.admitted += 1
+        start = time.monotonic()
+        try:
+            result = await self.loop.run_in_executor(self.executor, fn, *args)
+        finally:
+            self.admitted -= 1
+        self.latency.record(time.monotonic() - start)
+        return result
+
+    # HTTP/1.1 plumbing
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                except asyncio.LimitOverrunError:
+                    await _respond(writer, _json(431, {"error": "request head too large"}), keep_alive=False)
+                    return
+
+                request_line, *lines = head.decode("latin-1").rstrip("\r\n").split("\r\n")
+                headers = {}
+                for line in lines:
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    method, target, version = request_line.split(" ")
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    await _respond(writer, _json(400, {"error": "malformed request"}), keep_alive=False)
+                    return
+                if "transfer-encoding" in headers:
+                    await _respond(writer, _json(411, {"error": "send a Content-Length"}), keep_alive=False)
+                    return
+                if length > MAX_BODY:
+                    await _respond(writer, _json(413, {"error": f"body over {MAX_BODY} bytes"}), keep_alive=False)
+                    return
+
+                try:
+                    body = await reader.readexactly(length) if length else b""
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                await _respond(writer, await self._dispatch(method, target, body), keep_alive)
+                if not keep_alive:
+                    return
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method: str, target: str, body: bytes) -> Response:
+        url = urlsplit(target)
+        handler = self.routes.get((method, url.path))
+        if handler is None:
+            known = any(path == url.path for _, path in self.routes)
+            return _json(405 if known else 404, {"error": f"{method} {url.path} not supported"})
+
+        self.counts["requests"] += 1
+        try:
+            return await handler(dict(parse_qsl(url.query)), body)
+        except HTTPError as e:
+            status, headers, payload = _json(e.status, {"error": str(e)})
+            return status, {**headers, **e.headers}, payload
+        except FileNotFoundError as e:
+            return _json(404, {"error": str(e)})
+        except Exception as e:
+            self.counts["errors"] += 1
+            logger.exception("%s %s failed", method, url.path)
+            return _json(500, {"error": str(e)})
+
+async def _respond(writer: asyncio.StreamWriter, response: Response, keep_alive: bool):
+    status, headers, body = response
+    head = [f"HTTP/1.1 {status} {http.HTTPStatus(status).phrase}"]
+    head += [f"{name}: {value}" for name, value in headers.items()]
+    head += [f"Content-Length: {len(body)}", f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+    view = memoryview(body)
+    for offset in range(0, len(body), CHUNK_SIZE):
+        writer.write(view[offset:offset + CHUNK_SIZE])
+        await writer.drain()
+    await writer.drain()
+
+def _json(status: int, payload: Any) -> Response:
+    return status, {"Content-Type": "application/json"}, json.dumps(payload).encode("utf-8")
+
+def _parse_json(body: bytes) -> Dict[str, Any]:
+    try:
+        params = json.loads(body or b"{}")
+    except ValueError as e:
+        raise HTTPError(400, f"invalid JSON: {e}")
+    if not isinstance(params, dict):
+        raise HTTPError(400, "expected a JSON object")
+    return params
+
+def _flag(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.lower() in ("1", "true", "yes", "on")
+    return bool(value)
+
+def _render_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Check the fields /render and /batch share; raises HTTPError(400)."""
+    for field in ("template", "dna"):
+        if not params.get(field) or not isinstance(params[field], str):
+            raise HTTPError(400, f"missing '{field}'")
+    # Template names are joined into a path under the template directory
+    if not re.fullmatch(r"[\w-]+", params["template"]):
+        raise HTTPError(400, f"invalid template name: {params['template']!r}")
+    if params.get("inputs") is not None and not isinstance(params["inputs"], dict):
+        raise HTTPError(400, "'inputs' must be an object")
+    seed = params.get("seed")
+    if seed is not None and (not isinstance(seed, int) or isinstance(seed, bool)):
+        raise HTTPError(400, "'seed' must be an integer")
+    return params
+
+def _preset(name: Optional[str]):
+    if name is not None and name not in PRESETS:
+        raise HTTPError(400, f"unknown preset: {name!r}")
+
+def _export_options(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Exporter overrides from request parameters (format, size as "WxH" or [w, h], draft); raises HTTPError(400)."""
+    options: Dict[str, Any] = {}
+    if params.get("format"):
+        try:
+            options["format"] = ImageFormat(str(params["format"]).lower())
+        except ValueError:
+            raise HTTPError(400, f"unknown format: {params['format']!r}")
+    size = params.get("size")
+    if size:
+        try:
+            w, h = size.split("x") if isinstance(size, str) else size
+            options["custom_size"] = (int(w), int(h))
+        except (TypeError, ValueError):
+            raise HTTPError(400, f"invalid size: {size!r} (expected \"WxH\")")
+        if min(options["custom_size"]) < 1:
+            raise HTTPError(400, f"invalid size: {size!r}")
+    if _flag(params.get("draft")):
+        options["draft"] = True
+    return options
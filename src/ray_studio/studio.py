@@ -0,0 +1,251 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from PIL import Image
+
+from .buffers import BUFFER_POOL
+from .compositor import Compositor
+from .compositor.effects import EFFECT_CACHE
+from .compositor.fetcher import AssetFetcher
+from .compositor.gradients import GRADIENT_CACHE
+from .compositor.images import IMAGE_CACHE
+from .compositor.svg import SVG_CACHE
+from .compositor.text import TextRenderer
+from .dna import BrandDNA, load_dna
+from .export import DRAFT_SCALE, Exporter
+from .export.shared import ProcessEncoder
+from .generators import CachedGenerator, GeneratorBase, SingleFlightGenerator, get_generator
+from .templates import Template, get_template
+from .templates.registry import TEMPLATE_DIR
+
+class Registry:
+    """Parsed brand DNA and templates, reloaded when their file changes."""
+
+    def __init__(self):
+        self._entries: Dict[Tuple[str, str], Tuple[int, Any]] = {}
+        self.hits = {"dna": 0, "template": 0}
+        self.misses = {"dna": 0, "template": 0}
+
+    def dna(self, path: str) -> BrandDNA:
+        return self._get("dna", path, path, load_dna)
+
+    def template(self, name: str) -> Template:
+        return self._get("template", name, str(TEMPLATE_DIR / f"{name}.yaml"), get_template)
+
+    def _get(self, kind: str, key: str, path: str, load: Callable[[str], Any]) -> Any:
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            # Let the loader raise its own not-found error
+            return load(key)
+        entry = self._entries.get((kind, key))
+        if entry is None or entry[0] != mtime:
+            self.misses[kind] += 1
+            entry = self._entries[(kind, key)] = (mtime, load(key))
+        else:
+            self.hits[kind] += 1
+        return entry[1]
+
+    def stats(self, kind: str) -> Dict[str, int]:
+        entries = sum(1 for k, _ in self._entries if k == kind)
+        return {"entries": entries, "hits": self.hits[kind], "misses": self.misses[kind]}
+
+def _on_loop(loop: asyncio.AbstractEventLoop, coro) -> "asyncio.Future":
+    """Run `coro` on `loop` (another thread's) and await it from the current loop."""
+    return asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+class _LoopGenerator(GeneratorBase):
+    """Runs a generator's calls on the session loop, whichever loop awaits them."""
+
+    def __init__(self, generator: GeneratorBase, loop: asyncio.AbstractEventLoop):
+        self.generator = generator
+        self.loop = loop
+
+    async def generate(self, prompt, size=(1024, 1024), model="flux/schnell", seed=None) -> bytes:
+        return await _on_loop(self.loop, self.generator.generate(prompt, size=size, model=model, seed=seed))
+
+    async def generate_many(self, prompt, size=(1024, 1024), model="flux/schnell", seeds=None, count=None) -> List[bytes]:
+        return await _on_loop(self.loop, self.generator.generate_many(prompt, size=size, model=model, seeds=seeds, count=count))
+
+    async def generate_to_file(self, path, prompt, size=(1024, 1024), model="flux/schnell", seed=None):
+        return await _on_loop(self.loop, self.generator.generate_to_file(path, prompt, size=size, model=model, seed=seed))
+
+    async def generate_with_style(self, prompt, style, dna, size) -> bytes:
+        return await _on_loop(self.loop, self.generator.generate_with_style(prompt, style, dna, size))
+
+    def spec(self) -> str:
+        return self.generator.spec()
+
+class _LoopFetcher:
+    """Asset fetcher whose downloads share the session loop's connection pool."""
+
+    def __init__(self, fetcher: AssetFetcher, loop: asyncio.AbstractEventLoop):
+        self.fetcher = fetcher
+        self.loop = loop
+
+    async def fetch(self, url: str) -> str:
+        return await _on_loop(self.loop, self.fetcher.fetch(url))
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.fetcher, name)
+
+class Studio:
+    """
+    Warm rendering session for embedding Ray Studio in a service.
+
+    Keeps parsed DNA and templates (reloaded when their file changes), one
+    generator and one asset connection pool shared by every render, and a
+    thread pool for exports. Generator and download I/O run on the
+    session's own event loop thread, so `render` may be called from many
+    threads and `render_async` from any loop while rate limits and request
+    sharing still span all of them.
+
+    Use as a context manager, or call `close()` when done.
+    """
+
+    def __init__(
+        self,
+        generator: Union[str, GeneratorBase, None] = None,
+        cache_dir: Optional[str] = None,
+        export_workers: Optional[int] = None,
+        encode_processes: int = 0
+    ):
+        if generator is None or isinstance(generator, str):
+            generator = get_generator(generator)
+        self.generator = SingleFlightGenerator(generator)
+        self.cache_dir = cache_dir
+        self.registry = Registry()
+        self.fetcher = AssetFetcher(cache_dir)
+        self.exporter = Exporter()
+        self.export_workers = export_workers or os.cpu_count() or 4
+        self.executor = ThreadPoolExecutor(self.export_workers, thread_name_prefix="ray-studio-export")
+        # Encoding in processes sidesteps the GIL; canvases go over shared memory
+        self.process_encoder = ProcessEncoder(encode_processes) if encode_processes else None
+
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="ray-studio-session", daemon=True)
+        self._thread.start()
+
+        self.compositor = Compositor(_LoopFetcher(self.fetcher, self.loop))
+        generator_proxy = _LoopGenerator(self.generator, self.loop)
+        self.backgrounds = CachedGenerator(generator_proxy, cache_dir)
+        # Drafts take any cached size of the same background
+        self.draft_backgrounds = CachedGenerator(generator_proxy, cache_dir, reuse_any_size=True)
+        self.closed = False
+
+    def __enter__(self) -> "Studio":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Close the connection pools and stop the session thread and export pool."""
+        if self.closed:
+            return
+        self.closed = True
+        self.executor.shutdown(wait=True)
+        if self.process_encoder is not None:
+            self.process_encoder.close()
+        asyncio.run_coroutine_threadsafe(self.fetcher.aclose(), self.loop).result()
+        asyncio.run_coroutine_threadsafe(self.generator.aclose(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+    def dna(self, source: Union[str, BrandDNA]) -> BrandDNA:
+        return source if isinstance(source, BrandDNA) else self.registry.dna(source)
+
+    def template(self, source: Union[str, Template]) -> Template:
+        return source if isinstance(source, Template) else self.registry.template(source)
+
+    def render(
+        self,
+        template: Union[str, Template],
+        dna: Union[str, BrandDNA],
+        inputs: Optional[Dict[str, Any]] = None,
+        seed: Optional[int] = None,
+        draft: bool = False,
+        generator: Optional[GeneratorBase] = None
+    ) -> Image.Image:
+        """
+        Render on the calling thread; templates by name, DNA by path or as
+        loaded objects. `generator` replaces the session's cached one.
+        """
+        return self.compositor.render(**self._render_args(template, dna, inputs, seed, draft, generator))
+
+    async def render_async(
+        self,
+        template: Union[str, Template],
+        dna: Union[str, BrandDNA],
+        inputs: Optional[Dict[str, Any]] = None,
+        seed: Optional[int] = None,
+        draft: bool = False,
+        generator: Optional[GeneratorBase] = None
+    ) -> Image.Image:
+        """Render on the running loop, so several renders can be gathered."""
+        return await self.compositor.render_async(**self._render_args(template, dna, inputs, seed, draft, generator))
+
+    def release(self, image: Image.Image):
+        """Return a rendered canvas to the buffer pool once it has been exported."""
+        self.compositor.release(image)
+
+    def background_generator(self, draft: bool = False) -> CachedGenerator:
+        """The session's disk-cached generator; the draft one reuses any cached size."""
+        return self.draft_backgrounds if draft else self.backgrounds
+
+    def _render_args(self, template, dna, inputs, seed, draft, generator=None) -> Dict[str, Any]:
+        if self.closed:
+            raise RuntimeError("Studio is closed")
+        return {
+            "template": self.template(template),
+            "dna": self.dna(dna),
+            "inputs": inputs or {},
+            "generator": generator or self.background_generator(draft),
+            "seed": seed,
+            "scale": DRAFT_SCALE if draft else 1.0,
+        }
+
+    def export(self, image: Image.Image, output_path: str, preset: Optional[str] = None, **kwargs) -> str:
+        """Export to a file; pass `draft=True` for draft renders."""
+        return self.exporter.export(image, output_path, preset=preset, **kwargs)
+
+    def export_multi(self, image: Image.Image, output_dir: str, presets: List[str], naming: str = "{preset}", **kwargs) -> List[str]:
+        """Export several presets in parallel on the export pool."""
+        return self.exporter.export_multi(image, output_dir, presets, naming, executor=self.executor, **kwargs)
+
+    def encode(self, image: Image.Image, preset: Optional[str] = None, **kwargs) -> Tuple[bytes, str]:
+        """Export to memory; returns the encoded bytes and the PIL format name."""
+        if self.process_encoder is not None:
+            return self.process_encoder.encode(image, self.exporter.resolve_config(preset=preset, **kwargs))
+        return self.exporter.encode(image, preset=preset, **kwargs)
+
+    def in_flight(self) -> int:
+        """Distinct generator requests currently running."""
+        return self.generator.in_flight(self.loop)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counts of the session's and the process-wide caches."""
+        fonts = TextRenderer.get_font.cache_info()
+        stats = {
+            "dna": self.registry.stats("dna"),
+            "templates": self.registry.stats("template"),
+            "fonts": {"entries": fonts.currsize, "hits": fonts.hits, "misses": fonts.misses},
+            "backgrounds": {
+                "hits": self.backgrounds.hits + self.draft_backgrounds.hits,
+                "misses": self.backgrounds.misses + self.draft_backgrounds.misses,
+            },
+            "images": {cache.name: cache.stats() for cache in (IMAGE_CACHE, SVG_CACHE, GRADIENT_CACHE, EFFECT_CACHE)},
+            "buffers": BUFFER_POOL.stats(),
+            "generator_in_flight": self.in_flight(),
+        }
+        # Provider scheduler (fal) or per-backend hedging stats, when there are any
+        inner = self.generator.generator
+        if hasattr(inner, "stats"):
+            stats["generator"] = inner.stats()
+        elif getattr(inner, "scheduler", None) is not None:
+            stats["generator"] = inner.scheduler.stats()
+        return stats
@@ -22,6 +22,7 @@ class Layer(BaseModel):
     background: Optional[str] = None
     max_width: Optional[Union[str, int]] = None
     border_radius: Optional[int] = 0
+    effects: Optional[List[Dict[str, Any]]] = None  # shadow, blur, darken, overlay, vignette
     # Allow extra fields for flexibility
     model_config = ConfigDict(extra="allow")
 
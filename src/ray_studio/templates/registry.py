@@ -3,6 +3,7 @@ import yaml
 from pathlib import Path
 from typing import List
 from .base import Template
+from .. import tracing
 
 TEMPLATE_DIR = Path("templates")
 
@@ -22,6 +23,7 @@ def list_templates() -> List[Template]:
             continue
     return templates
 
+@tracing.traced("template.get")
 def get_template(name: str) -> Template:
     """Get a template by name."""
     file_path = TEMPLATE_DIR / f"{name}.yaml"
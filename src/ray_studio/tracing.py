@@ -0,0 +1,204 @@
+import inspect
+import json
+import os
+import threading
+import time
+from functools import wraps
+from typing import Any, Dict, List, Optional, Sequence
+
+
+class Tracer:
+    """
+    Collects timing spans and counters for a render run.
+    Events are kept in Chrome trace format so they can be opened in
+    chrome://tracing or Perfetto.
+    """
+
+    def __init__(self):
+        self.events: List[Dict[str, Any]] = []
+        self.counters: Dict[str, float] = {}
+        self.pid = os.getpid()
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def _ts(self, t: float) -> float:
+        """Convert a perf_counter timestamp to trace microseconds."""
+        return (t - self._origin) * 1e6
+
+    def add_span(self, name: str, start: float, end: float, args: Optional[Dict[str, Any]] = None):
+        event = {
+            "name": name,
+            "cat": name.split(".", 1)[0],
+            "ph": "X",
+            "ts": self._ts(start),
+            "dur": (end - start) * 1e6,
+            "pid": self.pid,
+            "tid": threading.get_ident(),
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            self.events.append(event)
+
+    def count(self, name: str, value: float = 1):
+        with self._lock:
+            total = self.counters.get(name, 0) + value
+            self.counters[name] = total
+            self.events.append({
+                "name": name,
+                "ph": "C",
+                "ts": self._ts(time.perf_counter()),
+                "pid": self.pid,
+                "args": {"value": total},
+            })
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"traceEvents": list(self.events), "displayTimeUnit": "ms"}
+
+    def write(self, path: str) -> str:
+        """Write the collected events as a Chrome trace JSON file."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f)
+        return path
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Aggregate spans by name, slowest total first."""
+        stats: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            spans = [e for e in self.events if e["ph"] == "X"]
+        for event in spans:
+            dur_ms = event["dur"] / 1000
+            row = stats.setdefault(event["name"], {"name": event["name"], "count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            row["count"] += 1
+            row["total_ms"] += dur_ms
+            row["max_ms"] = max(row["max_ms"], dur_ms)
+        rows = sorted(stats.values(), key=lambda r: r["total_ms"], reverse=True)
+        for row in rows:
+            row["mean_ms"] = row["total_ms"] / row["count"]
+        return rows
+
+    def format_summary(self) -> str:
+        """Render the span summary and counters as a plain-text table."""
+        lines = [f"{'span':<28} {'count':>6} {'total ms':>10} {'mean ms':>10} {'max ms':>10}"]
+        for row in self.summary():
+            lines.append(
+                f"{row['name']:<28} {row['count']:>6} {row['total_ms']:>10.2f} "
+                f"{row['mean_ms']:>10.2f} {row['max_ms']:>10.2f}"
+            )
+        if self.counters:
+            lines.append("")
+            lines.append(f"{'counter':<28} {'value':>6}")
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"{name:<28} {value:>6g}")
+        return "\n".join(lines)
+
+
+class _Span:
+    """Context manager recording one span on a tracer."""
+
+    __slots__ = ("tracer", "name", "args", "start")
+
+    def __init__(self, tracer: Tracer, name: str, args: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer.add_span(self.name, self.start, time.perf_counter(), self.args)
+        return False
+
+
+class _NullSpan:
+    """Shared no-op span used while tracing is disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+_tracer: Optional[Tracer] = None
+
+
+def enable() -> Tracer:
+    """Start collecting spans process-wide and return the active tracer."""
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer()
+    return _tracer
+
+
+def disable() -> Optional[Tracer]:
+    """Stop collecting spans and return the tracer that was active."""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+def get_tracer() -> Optional[Tracer]:
+    return _tracer
+
+
+def span(name: str, **args):
+    """Time a block: `with tracing.span("export.encode", format="JPEG"): ...`"""
+    tracer = _tracer
+    if tracer is None:
+        return _NULL_SPAN
+    return _Span(tracer, name, args)
+
+
+def count(name: str, value: float = 1):
+    """Increment a counter such as `export.bytes_written`."""
+    tracer = _tracer
+    if tracer is not None:
+        tracer.count(name, value)
+
+
+def traced(name: str):
+    """Decorator wrapping a sync or async function in a span."""
+
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                tracer = _tracer
+                if tracer is None:
+                    return await fn(*args, **kwargs)
+                with _Span(tracer, name, {}):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            tracer = _tracer
+            if tracer is None:
+                return fn(*args, **kwargs)
+            with _Span(tracer, name, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    """Linearly interpolated percentile of a non-empty sample list."""
+    ordered = sorted(samples)
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
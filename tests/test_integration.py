@@ -61,6 +61,76 @@ def test_batch_cli():
         assert "instagram_post.jpeg" in result.output
         assert "twitter_post.png" in result.output
 
+def test_generate_draft_cli():
+    import os
+    import tempfile
+    import time
+    from PIL import Image
+
+    runner = CliRunner()
+    with tempfile.TemporaryDirectory() as cache_dir, patch.dict(os.environ, {"RAY_STUDIO_CACHE_DIR": cache_dir}):
+        args = [
+            "generate", "promo",
+            "--dna", "examples/client_dna_example.yaml",
+            "--headline", "Draft Test",
+            "--generator", "procedural",
+            "--seed", "3",
+        ]
+        # Full render first: its background lands in the cache for the draft to reuse
+        result = runner.invoke(cli, args + ["--output", "tests/output/integration_full.jpeg"])
+        assert result.exit_code == 0
+
+        start = time.perf_counter()
+        result = runner.invoke(cli, args + ["--output", "tests/output/integration_draft.jpeg", "--draft"])
+        elapsed = time.perf_counter() - start
+        print(result.output, f"draft: {elapsed * 1000:.0f} ms")
+        assert result.exit_code == 0 and "(draft)" in result.output
+        assert Image.open("tests/output/integration_draft.jpeg").size == (270, 270)
+        assert len(os.listdir(os.path.join(cache_dir, "backgrounds"))) == 1
+
+        # Another backend with the same prompt and seed doesn't get the procedural background
+        stub = [arg if arg != "procedural" else "stub" for arg in args]
+        assert runner.invoke(cli, stub + ["--output", "tests/output/integration_stub.jpeg"]).exit_code == 0
+        assert len(os.listdir(os.path.join(cache_dir, "backgrounds"))) == 2
+
+        # Unseeded one-offs and --no-cache runs leave the cache alone
+        unseeded = [arg for arg in args if arg not in ("--seed", "3")]
+        assert runner.invoke(cli, unseeded + ["--output", "tests/output/integration_unseeded.jpeg"]).exit_code == 0
+        result = runner.invoke(cli, args[:-1] + ["4", "--no-cache", "--output", "tests/output/integration_no_cache.jpeg"])
+        assert result.exit_code == 0
+        assert len(os.listdir(os.path.join(cache_dir, "backgrounds"))) == 2
+
+# Wall time of `python -m ray_studio.cli --help`, interpreter startup included
+# (the import alone was ~500ms when the CLI imported everything eagerly)
+CLI_STARTUP_BUDGET_MS = 300
+HEAVY_MODULES = {"pydantic", "PIL", "httpx", "websockets", "numpy", "yaml"}
+
+def test_cli_startup_budget():
+    import subprocess
+    import sys
+    import time
+
+    command = [sys.executable, "-m", "ray_studio.cli", "--help"]
+    timings = []
+    for _ in range(3):
+        start = time.perf_counter()
+        result = subprocess.run(command, capture_output=True, text=True)
+        timings.append((time.perf_counter() - start) * 1000)
+        assert result.returncode == 0, result.stderr
+        assert "figma" in result.stdout
+    # Best of three: the budget is for the CLI, not a busy machine
+    assert min(timings) < CLI_STARTUP_BUDGET_MS, timings
+
+    # Lines look like "import time: self [us] | cumulative | module"
+    result = subprocess.run([sys.executable, "-X", "importtime", *command[1:]], capture_output=True, text=True)
+    imported = set()
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            imported.add(line.split("|")[2].strip())
+    assert not HEAVY_MODULES & imported, HEAVY_MODULES & imported
+
 if __name__ == "__main__":
     test_generate_cli()
     test_batch_cli()
+    test_generate_draft_cli()
+    test_cli_startup_budget()
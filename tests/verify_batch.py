@@ -0,0 +1,177 @@
+import asyncio
+import json
+import os
+import tempfile
+
+import yaml
+from click.testing import CliRunner
+from PIL import Image
+from ray_studio.batch import Job, Journal, job_assets, job_keys, load_jobs, run_batch, run_batch_async
+from ray_studio.cli import cli
+from ray_studio.pipeline import Pipeline, Stage
+from ray_studio.studio import Studio
+
+DNA = "examples/client_dna_example.yaml"
+
+def write_jobs(path, jobs):
+    with open(path, "w", encoding="utf-8") as f:
+        for job in jobs:
+            f.write(json.dumps(job) + "\n")
+
+def test_resumable_batch():
+    with tempfile.TemporaryDirectory() as workdir, Studio("procedural", cache_dir=workdir) as studio:
+        jobs_file = os.path.join(workdir, "jobs.jsonl")
+        output_dir = os.path.join(workdir, "out")
+        jobs = [
+            {"id": f"a{i}", "template": "promo", "dna": DNA, "inputs": {"headline": f"Sale {i}"}, "seed": i, "presets": ["instagram_post", "gmn_post"]}
+            for i in range(3)
+        ]
+        write_jobs(jobs_file, jobs + [{"id": "bad", "template": "missing", "dna": DNA}])
+
+        def run():
+            with Journal(os.path.join(output_dir, "journal.db")) as journal:
+                return run_batch(load_jobs(jobs_file), output_dir, studio, journal, workers=2)
+
+        summary = run()
+        assert (summary.rendered, summary.skipped, summary.failed) == (3, 0, 1)
+        assert "bad" in summary.errors
+        assert os.path.exists(os.path.join(output_dir, "a0", "instagram_post.jpeg"))
+
+        # Nothing changed: everything done is skipped, the failure is retried
+        summary = run()
+        assert (summary.rendered, summary.skipped, summary.failed) == (0, 3, 1)
+
+        # A changed input and a deleted output re-render only those jobs
+        jobs[1]["inputs"]["headline"] = "Changed"
+        write_jobs(jobs_file, jobs)
+        os.remove(os.path.join(output_dir, "a2", "gmn_post.jpeg"))
+        rendered = []
+        with Journal(os.path.join(output_dir, "journal.db")) as journal:
+            summary = run_batch(load_jobs(jobs_file), output_dir, studio, journal,
+                                progress=lambda job, outcome: outcome == "rendered" and rendered.append(job.id))
+            assert journal.counts()["done"] >= 6
+        assert sorted(rendered) == ["a1", "a2"] and summary.skipped == 1
+        assert summary.stages["render"]["items"] == 2 and summary.stages["write"]["items"] == 3
+
+        # --force ignores the journal
+        with Journal(os.path.join(output_dir, "journal.db")) as journal:
+            assert run_batch(load_jobs(jobs_file), output_dir, studio, journal, force=True).rendered == 3
+
+        # From inside a running loop (a service, a notebook)
+        async def from_service():
+            with Journal(os.path.join(output_dir, "journal.db")) as journal:
+                return await run_batch_async(load_jobs(jobs_file), output_dir, studio, journal, force=True)
+        assert asyncio.run(from_service()).rendered == 3
+    print("Resumable batch test passed!")
+
+def test_job_keys():
+    with tempfile.TemporaryDirectory() as workdir, Studio("procedural", cache_dir=workdir) as studio:
+        logo = os.path.join(workdir, "logo.png")
+        Image.new("RGBA", (40, 20), (255, 0, 0, 255)).save(logo)
+        with open(DNA, encoding="utf-8") as f:
+            dna = yaml.safe_load(f)
+        dna["brand"]["logo"]["primary"] = logo
+        dna_path = os.path.join(workdir, "dna.yaml")
+        with open(dna_path, "w", encoding="utf-8") as f:
+            yaml.safe_dump(dna, f)
+
+        job = Job(id="j", template="promo", dna=dna_path, inputs={"headline": "Keys"}, seed=1, presets=["gmn_post"])
+        # promo's logo layer reads dna.brand.logo.primary
+        assert job_assets(studio, job) == [logo]
+        key = job_keys(job, {}, "procedural", [logo])["gmn_post"]
+        assert job_keys(job, {}, "procedural", [logo])["gmn_post"] == key
+        assert job_keys(job, {}, "fal", [logo])["gmn_post"] != key
+        assert job_keys(job, {}, "procedural,fal", [logo])["gmn_post"] != key
+
+        # Editing the logo invalidates the job's outputs on the next run
+        output_dir = os.path.join(workdir, "out")
+        def run():
+            with Journal(os.path.join(output_dir, "journal.db")) as journal:
+                return run_batch([job], output_dir, studio, journal, workers=1)
+        assert run().rendered == 1 and run().skipped == 1
+        Image.new("RGBA", (40, 20), (0, 0, 255, 255)).save(logo)
+        assert job_keys(job, {}, "procedural", [logo])["gmn_post"] != key
+        assert run().rendered == 1
+    print("Job keys test passed!")
+
+def test_failed_encode_releases_canvas():
+    from unittest.mock import patch
+
+    with tempfile.TemporaryDirectory() as workdir, Studio("procedural", cache_dir=workdir) as studio:
+        job = Job(id="j", template="promo", dna=DNA, inputs={"headline": "Fail"}, seed=1, presets=["instagram_post", "gmn_post"])
+        encode = studio.encode
+
+        def failing(image, preset, **options):
+            if preset == "instagram_post":
+                raise ValueError("encoder failed")
+            return encode(image, preset=preset, **options)
+
+        # One encode at a time: the second preset only sees the job already failed
+        with patch.object(studio, "encode", side_effect=failing), \
+                patch.object(studio, "release", wraps=studio.release) as release, \
+                Journal(os.path.join(workdir, "journal.db")) as journal:
+            summary = run_batch([job], os.path.join(workdir, "out"), studio, journal, encode_workers=1)
+        assert summary.failed == 1
+        assert release.call_count == 1
+    print("Failed encode test passed!")
+
+def test_pipeline_backpressure():
+    import asyncio
+
+    in_flight = 0
+    peak = 0
+    failed = []
+
+    async def produce(i):
+        nonlocal in_flight, peak
+        if i == 3:
+            raise ValueError("boom")
+        in_flight += 1
+        peak = max(peak, in_flight)
+        return [i, i]
+
+    async def slow_sink(i):
+        nonlocal in_flight
+        await asyncio.sleep(0.002)
+        in_flight -= 0.5
+        return []
+
+    pipeline = Pipeline(
+        [Stage("produce", produce, 2), Stage("sink", slow_sink, 1)],
+        queue_size=4,
+        on_error=lambda item, e: failed.append(item)
+    )
+    asyncio.run(pipeline.run(range(50)))
+    stats = pipeline.stats()
+    # Bounded queues keep the producer within a few items of the slow consumer
+    assert peak <= 8, peak
+    assert failed == [3] and stats["produce"]["failures"] == 1
+    assert stats["produce"]["items"] == 49 and stats["sink"]["items"] == 98
+    assert stats["sink"]["utilisation"] > 0.8 and stats["produce"]["blocked_s"] > stats["produce"]["busy_s"]
+    print("Pipeline backpressure test passed!")
+
+def test_jobs_cli():
+    with tempfile.TemporaryDirectory() as workdir:
+        jobs_file = os.path.join(workdir, "jobs.jsonl")
+        output_dir = os.path.join(workdir, "out")
+        write_jobs(jobs_file, [{"template": "promo", "dna": DNA, "inputs": {"headline": "CLI"}, "seed": 1, "presets": ["gmn_post"]}])
+
+        runner = CliRunner()
+        env = {"RAY_STUDIO_CACHE_DIR": workdir}
+        result = runner.invoke(cli, ["jobs", jobs_file, "-o", output_dir, "-g", "procedural", "--stats"], env=env)
+        assert result.exit_code == 0, result.output
+        assert "1 rendered, 0 skipped, 0 failed" in result.output
+        assert all(stage in result.output for stage in ("fetch", "render", "encode", "write"))
+        assert os.path.exists(os.path.join(output_dir, "job-00001", "gmn_post.jpeg"))
+        assert os.path.exists(os.path.join(output_dir, ".ray-studio-journal.db"))
+
+        result = runner.invoke(cli, ["jobs", jobs_file, "-o", output_dir, "-g", "procedural"], env=env)
+        assert "0 rendered, 1 skipped, 0 failed" in result.output
+    print("Jobs CLI test passed!")
+
+if __name__ == "__main__":
+    test_resumable_batch()
+    test_job_keys()
+    test_failed_encode_releases_canvas()
+    test_pipeline_backpressure()
+    test_jobs_cli()
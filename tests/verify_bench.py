@@ -0,0 +1,43 @@
+import asyncio
+from ray_studio import bench
+from ray_studio.generators import StubGenerator
+
+def test_stub_generator():
+    gen = StubGenerator()
+    a = asyncio.run(gen.generate("prompt", size=(64, 64), seed=1))
+    b = asyncio.run(gen.generate("prompt", size=(64, 64), seed=1))
+    c = asyncio.run(gen.generate("prompt", size=(64, 64), seed=2))
+    assert a == b
+    assert a != c
+    print("StubGenerator test passed!")
+
+def test_bench():
+    results = bench.run_benchmarks(iterations=2, only=["text.", "export.instagram_post", "render.promo"])
+    names = set(results["benchmarks"])
+    assert names == {"text.layout", "export.instagram_post", "render.promo"}
+    for row in results["benchmarks"].values():
+        assert row["p50_ms"] <= row["p95_ms"]
+        assert row["throughput_per_s"] > 0
+    # After warm-up every canvas and layer buffer comes from the pool...
+    render = results["benchmarks"]["render.promo"]
+    assert render["pool_misses_per_op"] == 0 and render["pool_reuses_per_op"] > 0
+    # ...but a render still creates images outside it (text, resizes, conversions)
+    assert render["images_per_op"] > 0
+    assert results["buffer_pool"]["peak_bytes"] > 0
+
+    # Opaque renders are RGB, so exporting them skips the RGBA resize and conversion
+    modes = bench.run_benchmarks(iterations=2, only=["export.instagram_post", "export_rgba.instagram_post"])["benchmarks"]
+    assert modes["export.instagram_post"]["images_per_op"] < modes["export_rgba.instagram_post"]["images_per_op"]
+    print(bench.format_results({"benchmarks": modes}))
+
+    # A baseline twice as fast flags every benchmark
+    baseline = {"benchmarks": {k: dict(v, p50_ms=v["p50_ms"] / 2) for k, v in results["benchmarks"].items()}}
+    assert len(bench.compare(results, baseline)) == 3
+    assert bench.compare(results, results) == []
+    print(bench.format_results(results, baseline))
+
+    print("Bench verification passed!")
+
+if __name__ == "__main__":
+    test_stub_generator()
+    test_bench()
@@ -2,11 +2,15 @@ from ray_studio.compositor import Compositor
 from ray_studio.templates.base import Template, Layer, Layout
 from ray_studio.dna import BrandDNA
 from ray_studio.dna.schema import BrandIdentity, Colors, Fonts, Logo, Audience, ContentStrategy
+from ray_studio.compositor.gradients import GradientSpec, render_gradient
+from ray_studio.compositor.effects import EFFECT_CACHE
+from ray_studio.compositor.images import IMAGE_CACHE, decode_image, load_image
+from ray_studio.compositor.svg import SVG_CACHE, parse_path, rasterise_svg
+import os
 from PIL import Image
 
-def test_compositor():
-    # Mock DNA
-    dna = BrandDNA(
+def make_dna():
+    return BrandDNA(
         brand=BrandIdentity(
             name="Test Brand",
             tagline="Test Tagline",
@@ -27,6 +31,10 @@ def test_compositor():
         content=ContentStrategy(hashtags=[], cta_phrases=[])
     )
 
+def test_compositor():
+    # Mock DNA
+    dna = make_dna()
+
     # Mock Template
     template = Template(
         name="test_template",
@@ -56,5 +64,347 @@ def test_compositor():
 
     print("Compositor verification passed!")
 
+def test_gradient_background():
+    template = Template(
+        name="gradient_template",
+        description="test",
+        category="test",
+        layout=Layout(),
+        layers=[
+            Layer(type="background", source="gradient", gradient="linear", angle=0, dither=False,
+                  colors=["dna.brand.colors.primary", "#0000FF"]),
+        ],
+        inputs={}
+    )
+
+    image = Compositor().render(template, make_dna(), {})
+    left = image.getpixel((0, 540))
+    right = image.getpixel((1079, 540))
+    print(f"Gradient left: {left}, right: {right}")
+    assert left[0] > 250 and left[2] < 5
+    assert right[2] > 250 and right[0] < 5
+
+    # Radial: centre takes the first stop
+    spec = GradientSpec(kind="radial", colors=("#FFFFFF", "#000000"), dither=False)
+    radial = render_gradient(spec, (400, 300))
+    assert radial.getpixel((200, 150))[0] > 245
+    assert radial.getpixel((0, 0))[0] < 10
+
+    # Cached per (spec, size)
+    assert render_gradient(spec, (400, 300)) is radial
+    assert render_gradient(GradientSpec(kind="mesh", colors=("#FF0000", "#00FF00", "#0000FF")), (400, 300)).size == (400, 300)
+
+    # Explicit nulls fall back to the defaults
+    from ray_studio.compositor import LayerRenderer
+    nulls = Layer(type="background", source="gradient", angle=None, radius=None, dither=None, noise=None)
+    spec = LayerRenderer(make_dna()).gradient_spec(nulls, {})
+    assert (spec.angle, spec.radius, spec.dither, spec.noise) == (90.0, 1.0, True, 0)
+
+    print("Gradient verification passed!")
+
+def test_effects():
+    template = Template(
+        name="effects_template",
+        description="test",
+        category="test",
+        layout=Layout(),
+        layers=[
+            Layer(type="background", source="solid", color="#FFFFFF",
+                  effects=[{"type": "blur", "radius": 10}, {"type": "darken", "amount": 0.5}]),
+            Layer(type="cta_button", text="Go", background="#FFFFFF", color="#FFFFFF", position="center",
+                  effects=[{"type": "shadow", "offset": [0, 20], "radius": 4, "opacity": 1.0, "color": "dna.brand.colors.accent"}]),
+        ],
+        inputs={}
+    )
+
+    EFFECT_CACHE.clear()
+    compositor = Compositor()
+    image = compositor.render(template, make_dna(), {})
+
+    # Darkened background
+    assert image.getpixel((10, 10))[:3] == (127, 127, 127)
+    # Button is centred at (540, 510); its shadow (accent blue) shows below it
+    below = image.getpixel((540, 560))
+    print(f"Shadow pixel: {below}")
+    assert below[2] > below[0]
+    # Shadow stays within the button box plus its reach
+    assert image.getpixel((540, 700))[:3] == (127, 127, 127)
+
+    # The blurred background is reused on the next render
+    compositor.render(template, make_dna(), {})
+    assert EFFECT_CACHE.stats()["hits"] >= 1
+
+    print("Effects verification passed!")
+
+def test_image_layers():
+    os.makedirs("tests/output", exist_ok=True)
+    photo = os.path.abspath("tests/output/product_4000.jpg")
+    Image.new("RGB", (4000, 3000), (0, 200, 0)).save(photo, quality=80)
+    logo = "tests/output/logo_alpha.png"
+    Image.new("RGBA", (200, 100), (0, 0, 255, 128)).save(logo)
+
+    IMAGE_CACHE.clear()
+    # Decoded near the target size and cached per (path, mtime, box, fit)
+    small = load_image(photo, (400, None))
+    assert small.size == (400, 300) and small.mode == "RGB"
+    assert load_image("file://" + photo, (400, None)) is small
+    assert IMAGE_CACHE.stats()["hits"] == 1
+    assert load_image(photo, (300, 300), fit="cover").size == (300, 300)
+    assert load_image(photo, (300, 300), fit="contain").size == (300, 225)
+
+    # Generator output decodes from a stream straight to the canvas size
+    import io
+    buffer = io.BytesIO()
+    Image.new("RGB", (2048, 2048), (0, 0, 200)).save(buffer, format="JPEG")
+    background = decode_image(io.BytesIO(buffer.getvalue()), (270, 270), "stretch", Image.Resampling.BILINEAR)
+    assert background.size == (270, 270) and background.mode == "RGB"
+
+    template = Template(
+        name="image_template",
+        description="test",
+        category="test",
+        layout=Layout(),
+        layers=[
+            Layer(type="background", source="solid", color="#FFFFFF"),
+            Layer(type="image", source="{input.product_image}", position="left", size=["50%", "100%"], fit="cover"),
+            Layer(type="logo", source="dna.brand.logo.primary", position="bottom-right", size=[100, "auto"], margin=20),
+        ],
+        inputs={}
+    )
+    dna = make_dna()
+    dna.brand.logo.primary = logo
+
+    image = Compositor().render(template, dna, {"product_image": photo})
+    assert image.getpixel((10, 540))[:3] == (0, 200, 0)
+    assert image.getpixel((800, 540))[:3] == (255, 255, 255)
+    # Half-transparent blue logo in the bottom-right corner, over white
+    assert image.mode == "RGB"
+    r, g, b = image.getpixel((1040, 1040))
+    print(f"Logo pixel: {(r, g, b)}")
+    assert b == 255 and 120 < r < 135
+
+    # Same pixels as compositing on an RGBA canvas
+    from PIL import ImageChops
+    rgba = Compositor().render(template, dna, {"product_image": photo}, mode="RGBA")
+    assert ImageChops.difference(rgba.convert("RGB"), image).getbbox() is None
+
+    # Palette PNG logo (transparent index 0) is reduced like any other, not drawn as a placeholder
+    palette = "tests/output/logo_palette.png"
+    indexed = Image.new("P", (800, 400), 1)
+    indexed.putpalette([0, 0, 0, 0, 0, 255])
+    indexed.paste(0, (0, 0, 800, 200))
+    indexed.save(palette, transparency=0)
+    loaded = load_image(palette, (100, None))
+    assert loaded.size == (100, 50) and loaded.mode == "RGBA"
+    assert loaded.getpixel((50, 10))[3] == 0 and loaded.getpixel((50, 40)) == (0, 0, 255, 255)
+    dna.brand.logo.primary = palette
+    image = Compositor().render(template, dna, {"product_image": photo})
+    assert image.getpixel((1000, 1000)) == (255, 255, 255)
+    assert image.getpixel((1000, 1040)) == (0, 0, 255)
+
+    print("Image layer verification passed!")
+
+SVG_LOGO = """<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 100 50">
+  <defs><linearGradient id="g"><stop offset="0" stop-color="#00FF00"/></linearGradient></defs>
+  <rect width="100" height="50" rx="5" fill="#FF0000"/>
+  <circle cx="50" cy="25" r="20" style="fill: #0000FF"/>
+  <g transform="translate(80 5)"><path d="M0 0 h15 v15 h-15 Z M5 5 h5 v5 h-5 Z" fill="url(#g)"/></g>
+  <path d="M2 40 a8 8 0 011 0" stroke="white" fill="none"/>
+</svg>"""
+
+def test_svg_layers():
+    os.makedirs("tests/output", exist_ok=True)
+    logo = "tests/output/logo.svg"
+    with open(logo, "w") as f:
+        f.write(SVG_LOGO)
+
+    IMAGE_CACHE.clear()
+    SVG_CACHE.clear()
+    # Counters restart too, so the counts below don't depend on earlier tests
+    assert SVG_CACHE.stats()["hits"] == SVG_CACHE.stats()["misses"] == 0
+    # Rasterised at exactly the requested size, per (content hash, width, height)
+    img = load_image(logo, (200, None))
+    assert img.size == (200, 100) and img.mode == "RGBA"
+    assert img.getpixel((20, 50))[:3] == (255, 0, 0)
+    assert img.getpixel((100, 50))[:3] == (0, 0, 255)
+    # Gradient fill uses its first stop; the inner square is a hole (even-odd)
+    assert img.getpixel((164, 14))[:3] == (0, 255, 0)
+    assert img.getpixel((175, 25))[:3] == (255, 0, 0)
+    # Rounded corner stays transparent
+    assert img.getpixel((0, 0))[3] == 0
+    assert load_image(logo, (400, 200)).size == (400, 200)
+
+    # Same content at another path reuses the raster
+    copy = "tests/output/logo_copy.svg"
+    with open(copy, "w") as f:
+        f.write(SVG_LOGO)
+    assert load_image(copy, (200, None)).size == (200, 100)
+    assert SVG_CACHE.stats()["misses"] == 2 and SVG_CACHE.stats()["hits"] == 1
+    rasterise_svg(SVG_LOGO.encode(), (200, 100))
+    assert SVG_CACHE.stats()["hits"] == 2
+
+    # Relative commands, implicit line-tos and curves
+    (points, closed), = parse_path("m10 10 20 0 0 20 c0 5 -5 5 -10 5 z")
+    assert closed and points[:3] == [(10, 10), (30, 10), (30, 30)] and points[-1] == (20, 35)
+
+    template = Template(
+        name="svg_template",
+        description="test",
+        category="test",
+        layout=Layout(),
+        layers=[
+            Layer(type="background", source="solid", color="#FFFFFF"),
+            Layer(type="logo", source="dna.brand.logo.primary", position="top-left", size=[300, "auto"], margin=10),
+        ],
+        inputs={}
+    )
+    dna = make_dna()
+    dna.brand.logo.primary = logo
+    image = Compositor().render(template, dna, {})
+    assert image.getpixel((160, 85))[:3] == (0, 0, 255)
+    assert image.getpixel((30, 85))[:3] == (255, 0, 0)
+
+    # Malformed SVGs raise ValueError, so the layer falls back to the placeholder
+    for i, broken in enumerate([SVG_LOGO[:120], SVG_LOGO.replace("M2 40 a8 8 0 011 0", "M 1 1 L 5")]):
+        path = f"tests/output/broken_{i}.svg"
+        with open(path, "w") as f:
+            f.write(broken)
+        try:
+            rasterise_svg(broken.encode(), (100, 50), rasteriser="builtin")
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+        dna.brand.logo.primary = path
+        image = Compositor().render(template, dna, {})
+        assert image.getpixel((160, 60))[:3] == (136, 136, 136)
+
+    print("SVG layer verification passed!")
+
+def test_draft_scale():
+    template = Template(
+        name="draft_template",
+        description="test",
+        category="test",
+        layout=Layout(),
+        layers=[
+            Layer(type="background", source="gradient", gradient="linear"),
+            Layer(type="text", content="{input.headline}", position="center", size=96, color="#FFFFFF", font="Inter", max_width=800),
+            Layer(type="cta_button", text="Buy", position="bottom-center", background="#000000", color="#FFFFFF", margin_bottom=80),
+            Layer(type="image", source="tests/output/logo_alpha.png", position="top-left", size=[200, "auto"], margin=40,
+                  effects=[{"type": "shadow", "radius": 12, "offset": [0, 8]}]),
+        ],
+        inputs={}
+    )
+    compositor = Compositor()
+    full = compositor.render(template, make_dna(), {"headline": "Draft preview"})
+    draft = compositor.render(template, make_dna(), {"headline": "Draft preview"}, scale=0.25)
+    assert draft.size == (270, 270)
+
+    # Same layout in proportion: the downscaled full render matches the draft closely
+    from PIL import ImageChops, ImageStat
+    reference = full.convert("RGB").resize(draft.size, Image.Resampling.BOX)
+    diff = ImageStat.Stat(ImageChops.difference(reference, draft.convert("RGB"))).mean
+    print(f"Draft mean difference: {diff}")
+    assert max(diff) < 8
+    # CTA button (200x60 at 80px from the bottom) lands in the same place
+    assert draft.getpixel((112, 240))[:3] == (0, 0, 0)
+    print("Draft scale verification passed!")
+
+def test_buffer_pool():
+    import gc
+    from ray_studio.buffers import BufferPool
+
+    pool = BufferPool("test")
+    first = pool.acquire("RGBA", (64, 32), (255, 0, 0, 255))
+    first.paste((0, 0, 255, 255), (0, 0, 8, 8))
+    pool.release(first)
+    pool.release(first)  # double release is ignored
+    pool.release(Image.new("RGBA", (64, 32)))  # so are images the pool never handed out
+
+    # The same buffer comes back, refilled in place
+    second = pool.acquire("RGBA", (64, 32), (0, 0, 0, 0))
+    assert second is first
+    assert second.getcolors() == [(64 * 32, (0, 0, 0, 0))]
+    assert pool.stats()["allocations"] == 1 and pool.stats()["reuses"] == 1
+    assert pool.acquire("RGB", (64, 32)) is not second
+
+    # Images dropped without release stop counting as live
+    del first, second
+    gc.collect()
+    stats = pool.stats()
+    assert stats["live"] == 0 and stats["live_bytes"] == 0
+    assert stats["peak_bytes"] == 64 * 32 * 7
+
+    # Renders reuse released canvases and effect layers
+    from ray_studio.buffers import BUFFER_POOL
+    template = Template(
+        name="pooled",
+        description="test",
+        category="test",
+        layout=Layout(),
+        layers=[
+            Layer(type="background", source="solid", color="#00FF00"),
+            Layer(type="cta_button", text="Buy", position="bottom-center", background="#000000", color="#FFFFFF", margin_bottom=80,
+                  effects=[{"type": "shadow", "radius": 4}]),
+        ],
+        inputs={}
+    )
+    compositor = Compositor()
+    compositor.release(compositor.render(template, make_dna(), {}))
+    before = BUFFER_POOL.stats()
+    image = compositor.render(template, make_dna(), {})
+    after = BUFFER_POOL.stats()
+    assert after["allocations"] == before["allocations"] and after["reuses"] == before["reuses"] + 2
+    assert image.getpixel((0, 0)) == (0, 255, 0)
+    compositor.release(image)
+
+    # A failing layer still hands its effect buffer and the canvas back
+    from unittest.mock import patch
+    from ray_studio.compositor.effects import EffectRenderer
+    with patch.object(EffectRenderer, "composite", side_effect=RuntimeError("effect failed")):
+        try:
+            compositor.render(template, make_dna(), {})
+            assert False, "render should fail"
+        except RuntimeError:
+            pass
+    before = BUFFER_POOL.stats()
+    compositor.release(compositor.render(template, make_dna(), {}))
+    after = BUFFER_POOL.stats()
+    assert after["allocations"] == before["allocations"]
+    print("Buffer pool verification passed!")
+
+def test_canvas_mode():
+    from ray_studio.compositor import LayerRenderer
+    from ray_studio.export import Exporter
+
+    renderer = LayerRenderer(make_dna())
+    opaque = [
+        Layer(type="background", source="solid", color="{dna.brand.colors.primary}"),
+        Layer(type="text", content="Hi", color="#FFFFFF"),
+        Layer(type="text", content="Glow", color="#FFFFFF80", effects=[{"type": "shadow"}]),
+    ]
+    assert renderer.canvas_mode(opaque, {}) == "RGB"
+    # Colours written straight onto the canvas with alpha keep it RGBA
+    assert renderer.canvas_mode(opaque + [Layer(type="text", content="Hi", color="{input.ink}")], {"ink": "#00000080"}) == "RGBA"
+    assert renderer.canvas_mode([Layer(type="background", source="solid", color="#FF000000")], {}) == "RGBA"
+    assert renderer.canvas_mode([Layer(type="cta_button", text="Go", background="dna.missing")], {}) == "RGBA"
+
+    # Planned RGB renders export to the same bytes as RGBA ones, without the conversion
+    template = Template(name="modes", description="test", category="test", layout=Layout(), layers=opaque, inputs={})
+    compositor = Compositor()
+    rgb = compositor.render(template, make_dna(), {})
+    rgba = compositor.render(template, make_dna(), {}, mode="RGBA")
+    assert (rgb.mode, rgba.mode) == ("RGB", "RGBA")
+    for preset in ("instagram_post", "web_og_image"):
+        assert Exporter().encode(rgb, preset=preset) == Exporter().encode(rgba, preset=preset)
+    print("Canvas mode verification passed!")
+
 if __name__ == "__main__":
     test_compositor()
+    test_gradient_background()
+    test_effects()
+    test_image_layers()
+    test_svg_layers()
+    test_draft_scale()
+    test_buffer_pool()
+    test_canvas_mode()
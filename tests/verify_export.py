@@ -33,5 +33,60 @@ def test_export():
 
     print("Export verification passed!")
 
+def test_shared_memory_transport():
+    import pickle
+    import time
+    from ray_studio.export import ProcessEncoder, SegmentPool
+
+    pool = SegmentPool()
+    try:
+        canvas = Image.new("RGBA", (2480, 3508), (10, 20, 30, 255))
+        handle = pool.put(canvas)
+        # The handle is all that crosses the process boundary
+        assert len(pickle.dumps(handle)) < 200
+
+        # The consumer view maps the segment: no copy
+        shared, shm = handle.open()
+        assert shared.getpixel((0, 0)) == (10, 20, 30, 255)
+        shm.buf[0] = 99
+        assert shared.getpixel((0, 0)) == (99, 20, 30, 255)
+        del shared
+        shm.close()
+
+        # Released segments are reused for canvases of the same size
+        pool.release(handle.name)
+        again = pool.put(canvas)
+        assert again.name == handle.name and pool.stats()["reused"] == 1
+        pool.release(again.name)
+
+        # RGB canvases are packed as RGBX, which maps without copying
+        rgb = pool.put(Image.new("RGB", (8, 8), (1, 2, 3)))
+        shared, shm = rgb.open()
+        assert shared.mode == "RGBX" and shared.getpixel((7, 7))[:3] == (1, 2, 3)
+        del shared
+        shm.close()
+        pool.release(rgb.name)
+    finally:
+        pool.close()
+    assert pool.stats()["free_bytes"] == 0
+
+    encoder = ProcessEncoder(processes=2)
+    try:
+        exporter = Exporter()
+        rgb_canvas = Image.new("RGB", (1080, 1080), (200, 40, 90))
+        for preset in ("print_a4", "instagram_post", "twitter_post"):
+            config = exporter.resolve_config(preset=preset)
+            start = time.perf_counter()
+            data, fmt = encoder.encode(canvas, config)
+            elapsed = time.perf_counter() - start
+            assert (data, fmt) == exporter.encode(canvas, preset=preset)
+            print(f"  {preset}: {len(data)} bytes in {elapsed * 1000:.0f}ms via shared memory")
+            assert encoder.encode(rgb_canvas, config) == exporter.encode(rgb_canvas, preset=preset)
+        assert encoder.pool.stats()["leased"] == 0
+    finally:
+        encoder.close()
+    print("Shared memory transport test passed!")
+
 if __name__ == "__main__":
     test_export()
+    test_shared_memory_transport()
@@ -0,0 +1,92 @@
+import asyncio
+import io
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from PIL import Image
+from ray_studio.compositor import Compositor
+from ray_studio.compositor.fetcher import AssetFetcher
+from ray_studio.templates.base import Template, Layer, Layout
+from verify_compositor import make_dna
+
+def _png_bytes():
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 48), (255, 0, 0)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+class AssetHandler(BaseHTTPRequestHandler):
+    body = _png_bytes()
+    requests = []
+
+    def do_GET(self):
+        AssetHandler.requests.append((self.path, self.headers.get("If-None-Match")))
+        if self.path == "/slow.png":
+            # Hold the response so concurrent fetches overlap
+            threading.Event().wait(0.2)
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.send_header("Cache-Control", "max-age=0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.send_header("ETag", '"v1"')
+        self.send_header("Cache-Control", "max-age=60" if self.path == "/fresh.png" else "max-age=0")
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *args):
+        pass
+
+async def _run(base_url, cache_dir):
+    fetcher = AssetFetcher(cache_dir=cache_dir, per_host=2)
+
+    # Download, then revalidate with If-None-Match and get a 304
+    path = await fetcher.fetch(f"{base_url}/logo.png")
+    assert Image.open(path).size == (64, 48)
+    again = await fetcher.fetch(f"{base_url}/logo.png")
+    assert again == path
+    assert AssetHandler.requests[-1] == ("/logo.png", '"v1"')
+
+    # Fresh per max-age: no request at all
+    await fetcher.fetch(f"{base_url}/fresh.png")
+    count = len(AssetHandler.requests)
+    await fetcher.fetch(f"{base_url}/fresh.png")
+    assert len(AssetHandler.requests) == count
+
+    # Concurrent fetches of one URL share one request
+    count = len(AssetHandler.requests)
+    paths = await asyncio.gather(*[fetcher.fetch(f"{base_url}/slow.png") for _ in range(10)])
+    assert len(set(paths)) == 1
+    assert len(AssetHandler.requests) == count + 1
+
+    await fetcher.aclose()
+
+def test_fetcher():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), AssetHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            base_url = f"http://127.0.0.1:{server.server_port}"
+            asyncio.run(_run(base_url, cache_dir))
+
+            # Image layers resolve URL sources through the fetcher
+            template = Template(
+                name="remote_image",
+                description="test",
+                category="test",
+                layout=Layout(),
+                layers=[Layer(type="image", source=f"{base_url}/logo.png", position="top-left", size=[64, 48])],
+                inputs={}
+            )
+            compositor = Compositor(fetcher=AssetFetcher(cache_dir=cache_dir))
+            image = compositor.render(template, make_dna(), {})
+            assert image.getpixel((10, 10))[:3] == (255, 0, 0)
+    finally:
+        server.shutdown()
+    print("Fetcher verification passed!")
+
+if __name__ == "__main__":
+    test_fetcher()
@@ -1,6 +1,7 @@
 import asyncio
 import json
 import os
+import threading
 import unittest
 import uuid
 from unittest.mock import MagicMock, AsyncMock, patch
@@ -9,6 +10,66 @@ from ray_studio.figma.client import FigmaClient
 from ray_studio.figma.config import FigmaConfig
 from ray_studio.figma import commands
 
+def export_payload(node_id):
+    """Deterministic 'image' bytes the stand-in bridge exports for a node."""
+    import hashlib
+    seed = hashlib.sha256(node_id.encode()).digest()
+    return seed * (3 * 1024 * 1024 // len(seed) + 7)
+
+def stand_in_bridge(delay=0.01, stats=None):
+    """Local stand-in for the bridge: answers each command after `delay`, concurrently."""
+    stats = stats if stats is not None else {}
+    stats.update({"now": 0, "max": 0, "joins": 0, "exporting": 0, "max_exporting": 0})
+
+    async def export(ws, message):
+        import base64
+        import hashlib
+        stats["exporting"] += 1
+        stats["max_exporting"] = max(stats["max_exporting"], stats["exporting"])
+        await asyncio.sleep(delay)
+        stats["exporting"] -= 1
+        node_id = message["params"]["nodeId"]
+        data = export_payload(node_id)
+        if node_id == "legacy":
+            # A bridge that ignores chunkSize: the whole image at once, base64 wrapped at 76 columns
+            result = {"data": base64.encodebytes(data[:300_000]).decode()}
+            await ws.send(json.dumps({"type": "message", "message": {"id": message["id"], "result": result}}))
+            return
+        encoded = base64.b64encode(data).decode()
+        # Split off base64 group boundaries, as a bridge slicing its string would
+        step = message["params"]["chunkSize"] * 4 // 3 + 1
+        parts = list(enumerate(encoded[i:i + step] for i in range(0, len(encoded), step)))
+        if node_id == "reordered":
+            parts[0], parts[1] = parts[1], parts[0]
+        for index, part in parts:
+            await ws.send(json.dumps({"type": "message", "message": {"id": message["id"], "chunk": {"index": index, "data": part}}}))
+        digest = hashlib.sha256(data).hexdigest() if node_id != "corrupt" else "0" * 64
+        result = {"chunks": len(parts), "size": len(data), "sha256": digest}
+        await ws.send(json.dumps({"type": "message", "message": {"id": message["id"], "result": result}}))
+
+    async def reply(ws, message):
+        if message["command"] == "export_node":
+            return await export(ws, message)
+        stats["now"] += 1
+        stats["max"] = max(stats["max"], stats["now"])
+        await asyncio.sleep(delay)
+        stats["now"] -= 1
+        if message["params"].get("nodeId") == "bad":
+            response = {"id": message["id"], "error": "Node not found"}
+        else:
+            response = {"id": message["id"], "result": {"success": True, "nodeId": message["params"].get("nodeId")}}
+        await ws.send(json.dumps({"type": "message", "message": response}))
+
+    async def bridge(ws):
+        tasks = []
+        async for raw in ws:
+            data = json.loads(raw)
+            if data.get("type") == "join":
+                stats["joins"] += 1
+            elif data.get("type") == "message":
+                tasks.append(asyncio.create_task(reply(ws, data["message"])))
+    return bridge
+
 class TestFigma(unittest.IsolatedAsyncioTestCase):
 
     async def test_client_connect_and_send(self):
@@ -131,7 +192,8 @@ class TestFigma(unittest.IsolatedAsyncioTestCase):
         # Test export
         import base64
         dummy_data = base64.b64encode(b"fake image data").decode("utf-8")
-        client.send_command.return_value = {"data": dummy_data}
+        # A bridge without chunking replies with the whole image at once
+        client.send_streaming.return_value = {"data": dummy_data}
 
         output_file = "test_export.png"
         try:
@@ -143,5 +205,222 @@ class TestFigma(unittest.IsolatedAsyncioTestCase):
             if os.path.exists(output_file):
                 os.remove(output_file)
 
+    async def test_set_texts_pipelined(self):
+        import time
+        import websockets
+
+        in_flight = {"now": 0, "max": 0}
+        async with websockets.serve(stand_in_bridge(stats=in_flight), "127.0.0.1", 0) as server:
+            client = FigmaClient(host="127.0.0.1", port=server.sockets[0].getsockname()[1])
+            await client.connect("bench")
+            try:
+                texts = {f"1:{i}": f"Text {i}" for i in range(200)}
+
+                start = time.perf_counter()
+                for node_id, text in list(texts.items())[:50]:
+                    await commands.set_text(client, node_id, text)
+                sequential = (time.perf_counter() - start) * 4
+
+                start = time.perf_counter()
+                results = await commands.set_texts(client, texts, max_in_flight=16)
+                pipelined = time.perf_counter() - start
+                print(f"200 set_text: sequential ~{sequential * 1000:.0f}ms, pipelined {pipelined * 1000:.0f}ms")
+
+                self.assertEqual(list(results), list(texts))
+                self.assertTrue(all(r.ok for r in results.values()))
+                self.assertEqual(results["1:7"].result["nodeId"], "1:7")
+                self.assertLessEqual(in_flight["max"], 16)
+                self.assertLess(pipelined, sequential / 2)
+                self.assertEqual(client.pending_requests, {})
+
+                # Per-item errors: from the bridge, and paths that don't resolve (never sent)
+                config = MagicMock(spec=FigmaConfig)
+                config.get_node_id.side_effect = {"a.ok": "1:1", "a.bad": "bad"}.get
+                results = await commands.set_texts(client, {"a.ok": "x", "a.bad": "y", "a.missing": "z"}, config)
+                self.assertTrue(results["a.ok"].ok)
+                self.assertEqual(results["a.bad"].error, "Node not found")
+                self.assertIn("Could not resolve", results["a.missing"].error)
+            finally:
+                await client.disconnect()
+
+    async def test_daemon(self):
+        import tempfile
+        import time
+        import websockets
+        from unittest.mock import patch
+        from ray_studio.figma.daemon import DaemonClient, FigmaDaemon, connect_client, default_socket_path
+
+        bridge = {}
+        async with websockets.serve(stand_in_bridge(delay=0.005, stats=bridge), "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            with tempfile.TemporaryDirectory() as tmp:
+                socket_path = os.path.join(tmp, "figma.sock")
+
+                # No daemon yet: commands connect straight to the bridge, one join each
+                start = time.perf_counter()
+                for i in range(5):
+                    async with connect_client("127.0.0.1", port, "ch", socket_path) as client:
+                        self.assertIsInstance(client, FigmaClient)
+                        await commands.set_text(client, f"1:{i}", "x")
+                direct = (time.perf_counter() - start) / 5
+                self.assertEqual(bridge["joins"], 5)
+
+                # A leftover socket file from a dead daemon is ignored
+                open(socket_path, "w").close()
+                async with connect_client("127.0.0.1", port, "ch", socket_path) as client:
+                    self.assertIsInstance(client, FigmaClient)
+
+                figma_client = FigmaClient(host="127.0.0.1", port=port)
+                await figma_client.connect("ch")
+                daemon = FigmaDaemon(figma_client, socket_path)
+                await daemon.start()
+                try:
+                    with self.assertRaises(RuntimeError):
+                        await FigmaDaemon(FigmaClient(), socket_path).start()
+
+                    start = time.perf_counter()
+                    for i in range(5):
+                        async with connect_client("127.0.0.1", port, "ch", socket_path) as client:
+                            self.assertIsInstance(client, DaemonClient)
+                            result = await commands.set_text(client, f"1:{i}", "x")
+                    routed = (time.perf_counter() - start) / 5
+                    print(f"figma command: direct {direct * 1000:.1f}ms, via daemon {routed * 1000:.1f}ms")
+                    # The daemon's connection is shared: no further joins
+                    self.assertEqual(bridge["joins"], 7)
+                    self.assertEqual(result, {"success": True, "nodeId": "1:4"})
+
+                    async with connect_client("127.0.0.1", port, "ch", socket_path) as client:
+                        self.assertEqual((await client.ping())["connected"], True)
+                        with self.assertRaisesRegex(Exception, "Node not found"):
+                            await commands.set_text(client, "bad", "x")
+                        results = await commands.set_texts(client, {"1:1": "a", "bad": "b"})
+                        self.assertTrue(results["1:1"].ok)
+                        self.assertEqual(results["bad"].error, "Node not found")
+
+                    # A daemon for another bridge or channel isn't used in place of the one asked for
+                    async with connect_client("localhost", port, "ch", socket_path) as client:
+                        self.assertIsInstance(client, FigmaClient)
+                    async with connect_client("127.0.0.1", port, "other", socket_path) as client:
+                        self.assertIsInstance(client, FigmaClient)
+                    # Nor is a socket someone else owns
+                    with patch("os.getuid", return_value=os.getuid() + 1):
+                        async with connect_client("127.0.0.1", port, "ch", socket_path) as client:
+                            self.assertIsInstance(client, FigmaClient)
+                finally:
+                    await daemon.close()
+                self.assertFalse(os.path.exists(socket_path))
+                self.assertFalse(figma_client.connected)
+
+                # Without a runtime dir, sockets go in a private per-user directory, not bare /tmp
+                with patch.dict(os.environ, {"TMPDIR": tmp}), patch("tempfile.tempdir", None):
+                    os.environ.pop("XDG_RUNTIME_DIR", None)
+                    os.environ.pop("RAY_STUDIO_FIGMA_SOCKET", None)
+                    path = default_socket_path("ch")
+                    self.assertEqual(os.path.dirname(path), os.path.join(tmp, f"ray-studio-{os.getuid()}"))
+                    daemon = FigmaDaemon(figma_client, path)
+                    await figma_client.connect("ch")
+                    await daemon.start()
+                    await daemon.close()
+                    self.assertEqual(os.stat(os.path.dirname(path)).st_mode & 0o777, 0o700)
+
+                    # A directory others can write to is refused
+                    os.chmod(os.path.dirname(path), 0o777)
+                    await figma_client.connect("ch")
+                    with self.assertRaises(RuntimeError):
+                        await FigmaDaemon(figma_client, path).start()
+                    await figma_client.disconnect()
+
+    async def test_chunked_export(self):
+        import tempfile
+        import websockets
+        from concurrent.futures import ThreadPoolExecutor
+        from ray_studio.figma.daemon import FigmaDaemon, connect_client
+
+        bridge = {}
+        async with websockets.serve(stand_in_bridge(delay=0.1, stats=bridge), "127.0.0.1", 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            with tempfile.TemporaryDirectory() as tmp:
+                client = FigmaClient(host="127.0.0.1", port=port)
+                await client.connect("ch")
+                try:
+                    # 3 MiB in chunks: more than the websocket's 1 MiB frame limit allows in one message
+                    path = os.path.join(tmp, "single.png")
+                    self.assertEqual(await commands.export_node(client, "1:1", "png", path), path)
+                    with open(path, "rb") as f:
+                        self.assertEqual(f.read(), export_payload("1:1"))
+
+                    nodes = {node_id: os.path.join(tmp, f"{node_id.replace(':', '-')}.png") for node_id in ("2:1", "2:2", "2:3", "corrupt", "reordered")}
+                    with ThreadPoolExecutor(2) as pool:
+                        results = await commands.export_nodes(client, nodes, "png", max_in_flight=3, executor=pool)
+                    for node_id in ("2:1", "2:2", "2:3"):
+                        self.assertTrue(results[node_id].ok)
+                        with open(nodes[node_id], "rb") as f:
+                            self.assertEqual(f.read(), export_payload(node_id))
+                    # Integrity failures leave nothing behind
+                    self.assertIn("sha256 mismatch", results["corrupt"].error)
+                    self.assertIn("out of order", results["reordered"].error)
+                    self.assertEqual(sorted(os.listdir(tmp)), ["2-1.png", "2-2.png", "2-3.png", "single.png"])
+                    self.assertEqual(client.pending_streams, {})
+
+                    # Unchunked replies are decoded on the executor too, wrapped lines and all
+                    threads = []
+                    write = commands.ChunkWriter.write
+                    def recording_write(writer, chunk):
+                        threads.append(threading.current_thread().name)
+                        return write(writer, chunk)
+                    path = os.path.join(tmp, "legacy.png")
+                    with ThreadPoolExecutor(1, thread_name_prefix="export") as pool, patch.object(commands.ChunkWriter, "write", recording_write):
+                        self.assertEqual(await commands.export_node(client, "legacy", "png", path, executor=pool), path)
+                    with open(path, "rb") as f:
+                        self.assertEqual(f.read(), export_payload("legacy")[:300_000])
+                    self.assertEqual(len(threads), 1)
+                    self.assertTrue(threads[0].startswith("export"))
+                    os.remove(path)
+
+                    # Chunks are relayed through the daemon too
+                    socket_path = os.path.join(tmp, "figma.sock")
+                    daemon = FigmaDaemon(client, socket_path)
+                    await daemon.start()
+                    try:
+                        async with connect_client("127.0.0.1", port, "ch", socket_path) as routed:
+                            path = os.path.join(tmp, "routed.png")
+                            await commands.export_node(routed, "3:1", "png", path)
+                            with open(path, "rb") as f:
+                                self.assertEqual(f.read(), export_payload("3:1"))
+
+                            # Concurrent exports stream side by side through one daemon
+                            bridge["max_exporting"] = 0
+                            routed_nodes = {f"4:{i}": os.path.join(tmp, f"4-{i}.png") for i in range(3)}
+                            results = await commands.export_nodes(routed, routed_nodes, "png", max_in_flight=3)
+                            self.assertTrue(all(r.ok for r in results.values()))
+                            self.assertEqual(bridge["max_exporting"], 3)
+                    finally:
+                        await daemon.close()
+                finally:
+                    await client.disconnect()
+
+    def test_read_texts(self):
+        import tempfile
+        from ray_studio.figma.cli import read_texts
+
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, "texts.csv")
+            with open(csv_path, "w", encoding="utf-8") as f:
+                f.write('path,text\nsocial.post.headline,"Hello, world"\nsocial.post.cta,Shop\n')
+            self.assertEqual(read_texts(csv_path), {"social.post.headline": "Hello, world", "social.post.cta": "Shop"})
+
+            json_path = os.path.join(tmp, "texts.json")
+            with open(json_path, "w", encoding="utf-8") as f:
+                json.dump({"1:2": "Hi"}, f)
+            self.assertEqual(read_texts(json_path), {"1:2": "Hi"})
+
+            from ray_studio.figma.cli import read_nodes
+            with open(csv_path, "w", encoding="utf-8") as f:
+                f.write("node_id,file\n1:2,hero.png\n3:4\n")
+            self.assertEqual(read_nodes(csv_path, "out", "png"), {"1:2": os.path.join("out", "hero.png"), "3:4": os.path.join("out", "3-4.png")})
+            with open(json_path, "w", encoding="utf-8") as f:
+                json.dump(["5:6"], f)
+            self.assertEqual(read_nodes(json_path, "out", "jpg"), {"5:6": os.path.join("out", "5-6.jpg")})
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,6 +1,6 @@
 import asyncio
 from unittest.mock import MagicMock, patch, AsyncMock
-from ray_studio.generators import FalGenerator, get_generator
+from ray_studio.generators import Backend, FalGenerator, HedgedGenerator, ProceduralGenerator, SingleFlightGenerator, StubGenerator, get_generator
 
 async def test_fal_generator():
     api_key = "fake_key"
@@ -9,7 +9,7 @@ async def test_fal_generator():
     # Mock httpx.AsyncClient
     with patch("httpx.AsyncClient") as mock_client_cls:
         mock_client = AsyncMock()  # Use AsyncMock for the client instance
-        mock_client_cls.return_value.__aenter__.return_value = mock_client
+        mock_client_cls.return_value = mock_client
 
         # Mock post response
         mock_post_response = MagicMock()
@@ -34,13 +34,281 @@ async def test_fal_generator():
         assert kwargs["json"]["prompt"] == "test prompt"
         assert kwargs["json"]["image_size"] == {"width": 800, "height": 600}
 
+        # Later calls on the same loop reuse the client's connection pool until aclose()
+        await generator.generate("test prompt")
+        assert mock_client_cls.call_count == 1
+        await generator.aclose()
+        mock_client.aclose.assert_awaited_once()
+        await generator.generate("test prompt")
+        assert mock_client_cls.call_count == 2
+
         print("FalGenerator test passed!")
 
+async def test_fal_generate_many():
+    generator = FalGenerator(api_key="fake_key")
+
+    with patch("httpx.AsyncClient") as mock_client_cls:
+        mock_client = AsyncMock()
+        mock_client_cls.return_value = mock_client
+
+        posts = iter(range(100))
+
+        def post(url, json, timeout):
+            # Unseeded requests get distinct URLs, as fal picks a random seed for each
+            tag = json["seed"] if json["seed"] is not None else f"r{next(posts)}"
+            response = MagicMock()
+            response.json.return_value = {"images": [{"url": f"http://fake.url/{tag}-{i}.png"} for i in range(json["num_images"])]}
+            return response
+
+        def get(url, timeout):
+            response = MagicMock()
+            response.content = url.encode()
+            return response
+
+        mock_client.post.side_effect = post
+        mock_client.get.side_effect = get
+
+        # Explicit seeds: one request per seed, so every seed is honoured
+        images = await generator.generate_many("test prompt", size=(512, 512), seeds=[10, 11, 12])
+        assert images == [b"http://fake.url/10-0.png", b"http://fake.url/11-0.png", b"http://fake.url/12-0.png"]
+        payloads = [kwargs["json"] for _, kwargs in mock_client.post.call_args_list]
+        assert sorted((p["seed"], p["num_images"]) for p in payloads) == [(10, 1), (11, 1), (12, 1)]
+
+        # Unseeded variants are batched: six images in two requests (4 + 2)
+        mock_client.post.reset_mock()
+        images = await generator.generate_many("test prompt", count=6)
+        assert len(images) == 6 and len(set(images)) == 6
+        payloads = [kwargs["json"] for _, kwargs in mock_client.post.call_args_list]
+        assert sorted(p["num_images"] for p in payloads) == [2, 4]
+        assert all(p["seed"] is None for p in payloads)
+
+        # Mixed: seeded variants keep their positions
+        images = await generator.generate_many("test prompt", seeds=[None, 7, None])
+        assert images[1] == b"http://fake.url/7-0.png" and None not in images
+
+        # A short response is an error, not a silently shorter list
+        mock_client.post.side_effect = lambda url, json, timeout: MagicMock(**{"json.return_value": {"images": [{"url": "http://fake.url/x.png"}]}})
+        try:
+            await generator.generate_many("test prompt", count=3)
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+
+    print("FalGenerator.generate_many test passed!")
+
+def test_generate_many_default():
+    from ray_studio.compositor import Compositor
+    from ray_studio.templates.base import Template, Layer, Layout
+    from verify_compositor import make_dna
+
+    generator = StubGenerator()
+
+    async def run():
+        many = await generator.generate_many("sunset", size=(16, 16), seeds=[1, 2])
+        single = [await generator.generate("sunset", size=(16, 16), seed=s) for s in (1, 2)]
+        assert many == single
+        assert len(await generator.generate_many("sunset", size=(16, 16), count=3)) == 3
+
+    asyncio.run(run())
+    for kwargs in ({}, {"seeds": [1], "count": 2}):
+        try:
+            asyncio.run(generator.generate_many("sunset", **kwargs))
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+
+    # The render seed reaches the generator
+    inner = CountingGenerator()
+    seeds = []
+    original = inner.generate
+
+    async def recording(prompt, size=(1024, 1024), model="flux/schnell", seed=None):
+        seeds.append(seed)
+        return await original(prompt, size, model, seed)
+
+    inner.generate = recording
+    template = Template(
+        name="bg", description="test", category="test", layout=Layout(),
+        layers=[Layer(type="background", source="ai_generate", prompt_template="Abstract {dna.brand.name}")],
+        inputs={}
+    )
+    Compositor().render(template, make_dna(), {}, inner, seed=42)
+    assert seeds == [42]
+    print("generate_many default test passed!")
+
 def test_get_generator():
     gen = get_generator()
     assert isinstance(gen, FalGenerator)
+    assert isinstance(get_generator("procedural"), ProceduralGenerator)
+    with patch.dict("os.environ", {"RAY_STUDIO_GENERATOR": "procedural"}):
+        assert isinstance(get_generator(), ProceduralGenerator)
     print("get_generator test passed!")
 
+def test_procedural_generator():
+    from PIL import Image, ImageStat
+    import io
+    generator = ProceduralGenerator()
+    prompt = "Modern abstract background, #FF0000 and #0000FF color scheme"
+
+    first = asyncio.run(generator.generate(prompt, size=(320, 200), seed=7))
+    again = asyncio.run(generator.generate(prompt, size=(320, 200), seed=7))
+    other = asyncio.run(generator.generate(prompt, size=(320, 200), seed=8))
+    assert first == again
+    assert first != other
+
+    img = Image.open(io.BytesIO(first))
+    assert img.size == (320, 200)
+    # Palette comes from the prompt: red and blue dominate, green stays low
+    r, g, b = ImageStat.Stat(img).mean
+    assert g < r and g < b
+    print("ProceduralGenerator test passed!")
+
+class CountingGenerator(StubGenerator):
+    def __init__(self, fail: bool = False):
+        super().__init__(latency=0.05)
+        self.calls = 0
+        self.fail = fail
+
+    async def generate(self, prompt, size=(1024, 1024), model="flux/schnell", seed=None):
+        self.calls += 1
+        result = await super().generate(prompt, size, model, seed)
+        if self.fail:
+            raise RuntimeError("quota exceeded")
+        return result
+
+def test_single_flight():
+    from ray_studio.compositor import Compositor
+    from ray_studio.templates.base import Template, Layer, Layout
+    from verify_compositor import make_dna
+
+    inner = CountingGenerator()
+    generator = SingleFlightGenerator(inner)
+
+    async def run():
+        same = await asyncio.gather(*[generator.generate("sunset", size=(64, 64), seed=1) for _ in range(5)])
+        assert inner.calls == 1 and len(set(same)) == 1
+        assert generator.in_flight() == 0
+
+        # Different seed or size is a different request
+        await asyncio.gather(generator.generate("sunset", size=(64, 64), seed=2), generator.generate("sunset", size=(32, 32), seed=1))
+        assert inner.calls == 3
+
+        # Completed requests aren't cached
+        await generator.generate("sunset", size=(64, 64), seed=1)
+        assert inner.calls == 4
+
+        # One cancelled caller doesn't cancel the others
+        first = asyncio.ensure_future(generator.generate("dusk", size=(64, 64)))
+        second = asyncio.ensure_future(generator.generate("dusk", size=(64, 64)))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        assert len(await second) > 0 and inner.calls == 5
+
+        # Concurrent renders of one template share the background
+        template = Template(
+            name="bg", description="test", category="test", layout=Layout(),
+            layers=[Layer(type="background", source="ai_generate", prompt_template="Abstract {dna.brand.name}")],
+            inputs={}
+        )
+        compositor = Compositor()
+        images = await asyncio.gather(*[compositor.render_async(template, make_dna(), {}, generator) for _ in range(4)])
+        assert inner.calls == 6 and len({img.getpixel((0, 0)) for img in images}) == 1
+
+    asyncio.run(run())
+
+    # Failures propagate to every waiter
+    failing = CountingGenerator(fail=True)
+    generator = SingleFlightGenerator(failing)
+
+    async def run_failing():
+        return await asyncio.gather(*[generator.generate("x", size=(8, 8)) for _ in range(3)], return_exceptions=True)
+
+    errors = asyncio.run(run_failing())
+    assert failing.calls == 1
+    assert all(isinstance(e, RuntimeError) and str(e) == "quota exceeded" for e in errors)
+    print("SingleFlightGenerator test passed!")
+
+class TaggedGenerator(StubGenerator):
+    def __init__(self, tag: bytes, latency: float, fail: bool = False):
+        super().__init__(latency=latency)
+        self.tag = tag
+        self.fail = fail
+        self.calls = 0
+        self.cancelled = 0
+
+    async def generate(self, prompt, size=(1024, 1024), model="flux/schnell", seed=None):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.latency)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.fail:
+            raise RuntimeError(f"{self.tag.decode()} down")
+        return self.tag
+
+def test_hedged_generator():
+    import time
+
+    def hedged(primary, secondary, **kwargs):
+        return HedgedGenerator([Backend("secondary", secondary, 1), Backend("primary", primary, 0)], **kwargs)
+
+    # Primary answers before the hedge deadline: the secondary is never asked
+    primary, secondary = TaggedGenerator(b"a", 0.01), TaggedGenerator(b"b", 0.01)
+    assert asyncio.run(hedged(primary, secondary, default_delay=0.5).generate("p")) == b"a"
+    assert secondary.calls == 0
+
+    # Stuck primary: hedge after the delay, take the secondary and cancel the loser
+    primary, secondary = TaggedGenerator(b"a", 5.0), TaggedGenerator(b"b", 0.01)
+    generator = hedged(primary, secondary, default_delay=0.05)
+    start = time.monotonic()
+    assert asyncio.run(generator.generate("p")) == b"b"
+    assert time.monotonic() - start < 1.0
+    assert primary.cancelled == 1 and generator.hedges == 1
+    assert generator.stats()["backends"]["secondary"]["wins"] == 1
+    # The cancelled primary still records how long it had taken, as a lower bound
+    (cancelled,) = generator.backends[0].latency.samples
+    assert cancelled >= 0.05
+
+    # Errors fail over immediately, without waiting for the hedge deadline
+    primary, secondary = TaggedGenerator(b"a", 0.0, fail=True), TaggedGenerator(b"b", 0.01)
+    generator = hedged(primary, secondary, default_delay=5.0)
+    start = time.monotonic()
+    assert asyncio.run(generator.generate("p")) == b"b"
+    assert time.monotonic() - start < 1.0 and generator.hedges == 0
+    assert generator.stats()["backends"]["primary"]["failures"] == 1
+
+    # Every backend failing raises
+    generator = hedged(TaggedGenerator(b"a", 0.0, fail=True), TaggedGenerator(b"b", 0.0, fail=True))
+    try:
+        asyncio.run(generator.generate("p"))
+        assert False, "expected RuntimeError"
+    except RuntimeError as e:
+        assert "down" in str(e)
+
+    # The hedge delay follows the primary's observed p95
+    primary = TaggedGenerator(b"a", 0.01)
+    generator = hedged(primary, TaggedGenerator(b"b", 0.01), default_delay=5.0, min_delay=0.001)
+    assert generator.hedge_delay(generator.backends[0]) == 5.0
+
+    async def warm():
+        for _ in range(5):
+            await generator.generate("p")
+
+    asyncio.run(warm())
+    assert generator.hedge_delay(generator.backends[0]) < 1.0
+
+    combined = get_generator("procedural, stub")
+    assert isinstance(combined, HedgedGenerator)
+    assert [b.name for b in combined.backends] == ["procedural", "stub"]
+    assert isinstance(get_generator("stub,"), StubGenerator)
+    print("HedgedGenerator test passed!")
+
 if __name__ == "__main__":
     test_get_generator()
+    test_procedural_generator()
+    test_single_flight()
+    test_hedged_generator()
+    test_generate_many_default()
     asyncio.run(test_fal_generator())
+    asyncio.run(test_fal_generate_many())
@@ -0,0 +1,185 @@
+import asyncio
+import io
+import json
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+from PIL import Image
+from ray_studio.generators import CachedGenerator, FalGenerator
+from ray_studio.generators.scheduler import AdaptiveLimiter, RequestScheduler, TokenBucket, retry_after
+
+def _png_bytes():
+    buffer = io.BytesIO()
+    Image.new("RGB", (32, 32), (0, 0, 255)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+class ThrottlingHandler(BaseHTTPRequestHandler):
+    """Stub provider: answers the queued `faults` statuses first, then succeeds."""
+
+    body = _png_bytes()
+    faults = []
+    posts = 0
+
+    def do_POST(self):
+        ThrottlingHandler.posts += 1
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if ThrottlingHandler.faults:
+            status = ThrottlingHandler.faults.pop(0)
+            self.send_response(status)
+            if status == 429:
+                self.send_header("Retry-After", "0.05")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        host = self.headers["Host"]
+        payload = json.dumps({"images": [{"url": f"http://{host}/image.png"}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *args):
+        pass
+
+def test_token_bucket():
+    async def run():
+        bucket = TokenBucket(rate=50, burst=2)
+        start = time.monotonic()
+        for _ in range(7):
+            await bucket.acquire()
+        # Two from the burst, five more at 50/s
+        return time.monotonic() - start
+
+    elapsed = asyncio.run(run())
+    assert elapsed >= 0.09, elapsed
+    print("Token bucket test passed!")
+
+def test_adaptive_limiter():
+    limiter = AdaptiveLimiter(initial=4, minimum=1, maximum=8)
+    limiter.on_congestion(rtt=0.0)
+    assert limiter.limit == 2
+    for _ in range(10):
+        limiter.on_success()
+    assert 4 < limiter.limit <= 8
+
+    async def run():
+        limiter = AdaptiveLimiter(initial=3, minimum=1, maximum=3)
+        peak = 0
+
+        async def work():
+            nonlocal peak
+            await limiter.acquire()
+            try:
+                peak = max(peak, limiter.active)
+                await asyncio.sleep(0.01)
+            finally:
+                limiter.release()
+
+        await asyncio.gather(*[work() for _ in range(12)])
+        assert peak == 3 and limiter.active == 0
+
+    asyncio.run(run())
+    print("Adaptive limiter test passed!")
+
+def test_retry_after():
+    response = httpx.Response(429, headers={"Retry-After": "3"})
+    assert retry_after(response) == 3
+    response = httpx.Response(429, headers={"Retry-After": formatdate(time.time() + 60, usegmt=True)})
+    assert 55 < retry_after(response) <= 60
+    assert retry_after(httpx.Response(503)) is None
+    print("Retry-After test passed!")
+
+def test_fal_retries():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ThrottlingHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        scheduler = RequestScheduler(rate=100, burst=10, concurrency=4, base_delay=0.01, max_retries=4)
+        generator = FalGenerator(api_key="test", scheduler=scheduler)
+        generator.BASE_URL = f"http://127.0.0.1:{server.server_port}"
+
+        # Two throttles (honouring Retry-After) and a transient 503, then success
+        ThrottlingHandler.faults = [429, 429, 503]
+        start = time.monotonic()
+        result = asyncio.run(generator.generate("test", size=(32, 32)))
+        assert result == ThrottlingHandler.body
+        assert time.monotonic() - start >= 0.1
+        stats = scheduler.stats()
+        assert stats["retries"] == 3 and stats["throttled"] == 2 and stats["failures"] == 0
+        assert stats["concurrency"] < 4 and stats["queued"] == 0 and stats["in_flight"] == 0
+        assert stats["latency_p95_ms"] is not None
+
+        # Client errors aren't retried
+        ThrottlingHandler.faults = [400]
+        posts = ThrottlingHandler.posts
+        try:
+            asyncio.run(generator.generate("test", size=(32, 32)))
+            assert False, "expected HTTPStatusError"
+        except httpx.HTTPStatusError as e:
+            assert e.response.status_code == 400
+        assert ThrottlingHandler.posts == posts + 1
+
+        # Exhausted retries surface the last error
+        ThrottlingHandler.faults = [503] * 10
+        generator.scheduler = RequestScheduler(base_delay=0.001, max_retries=2)
+        try:
+            asyncio.run(generator.generate("test", size=(32, 32)))
+            assert False, "expected HTTPStatusError"
+        except httpx.HTTPStatusError as e:
+            assert e.response.status_code == 503
+        assert generator.scheduler.stats()["retries"] == 2
+        ThrottlingHandler.faults = []
+    finally:
+        server.shutdown()
+    print("Fal retry test passed!")
+
+def test_fal_streaming():
+    import os
+    import tempfile
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ThrottlingHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        generator = FalGenerator(api_key="test")
+        generator.BASE_URL = f"http://127.0.0.1:{server.server_port}"
+        ThrottlingHandler.faults = []
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            # The download is streamed straight into the file
+            path = os.path.join(cache_dir, "direct.png")
+            asyncio.run(generator.generate_to_file(path, "test", size=(32, 32)))
+            with open(path, "rb") as f:
+                assert f.read() == ThrottlingHandler.body
+            assert [name for name in os.listdir(cache_dir) if name.endswith(".part")] == []
+
+            # The cache streams misses to disk and decodes from there at the box size
+            cached = CachedGenerator(generator, cache_dir=cache_dir)
+            posts = ThrottlingHandler.posts
+            img = asyncio.run(cached.generate_image("test", size=(32, 32), seed=1, box=(16, 16)))
+            assert img.size == (16, 16) and img.mode == "RGB"
+            assert img.getpixel((8, 8)) == (0, 0, 255)
+            asyncio.run(cached.generate_image("test", size=(32, 32), seed=1, box=(16, 16)))
+            assert ThrottlingHandler.posts == posts + 1
+            assert len(os.listdir(os.path.join(cache_dir, "backgrounds"))) == 1
+    finally:
+        server.shutdown()
+    print("Fal streaming test passed!")
+
+if __name__ == "__main__":
+    test_token_bucket()
+    test_adaptive_limiter()
+    test_retry_after()
+    test_fal_retries()
+    test_fal_streaming()
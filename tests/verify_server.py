@@ -0,0 +1,122 @@
+import asyncio
+import io
+import os
+import statistics
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+import httpx
+from PIL import Image
+from ray_studio.generators import ProceduralGenerator
+from ray_studio.server import RenderServer
+
+DNA = "examples/client_dna_example.yaml"
+
+class SlowGenerator(ProceduralGenerator):
+    """Procedural backgrounds that take `delay` seconds, to hold workers busy."""
+
+    def __init__(self, delay: float):
+        super().__init__()
+        self.delay = delay
+
+    async def generate(self, prompt, size=(1024, 1024), model="flux/schnell", seed=None):
+        await asyncio.sleep(self.delay)
+        return await super().generate(prompt, size=size, model=model, seed=seed)
+
+@contextmanager
+def running(server: RenderServer):
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    listener = asyncio.run_coroutine_threadsafe(server.start("127.0.0.1", 0), loop).result()
+    try:
+        yield f"http://127.0.0.1:{listener.sockets[0].getsockname()[1]}"
+    finally:
+        listener.close()
+        # Let handlers see their clients hang up before the loop stops
+        asyncio.run_coroutine_threadsafe(asyncio.sleep(0.1), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        server.close()
+
+def test_render_endpoints():
+    with tempfile.TemporaryDirectory() as cache_dir, tempfile.TemporaryDirectory() as output_root:
+        server = RenderServer(ProceduralGenerator(), workers=2, cache_dir=cache_dir, output_root=output_root)
+        with running(server) as url, httpx.Client(base_url=url, timeout=30) as client:
+            assert client.get("/health").json()["status"] == "ok"
+
+            request = {"template": "promo", "dna": DNA, "inputs": {"headline": "Served", "cta": "Go"}, "seed": 7, "preset": "instagram_post"}
+            response = client.post("/render", json=request)
+            assert response.status_code == 200, response.text
+            assert response.headers["content-type"] == "image/jpeg"
+            assert Image.open(io.BytesIO(response.content)).size == (1080, 1080)
+
+            # Seeded background is now cached: renders are warm
+            timings = []
+            for _ in range(5):
+                start = time.perf_counter()
+                assert client.post("/render", json=request).status_code == 200
+                timings.append(time.perf_counter() - start)
+            print(f"  warm render p50: {statistics.median(timings) * 1000:.1f}ms")
+
+            draft = client.post("/render", json={**request, "draft": True})
+            assert Image.open(io.BytesIO(draft.content)).size == (270, 270)
+
+            paths = client.post("/batch", json={**request, "output_dir": "campaign", "presets": ["instagram_post", "gmn_post"]}).json()["paths"]
+            assert len(paths) == 2 and all(os.path.exists(p) and p.startswith(output_root) for p in paths)
+
+            # Re-encode an uploaded image
+            exported = client.post("/export", params={"format": "webp", "size": "64x32"}, content=response.content)
+            assert exported.headers["content-type"] == "image/webp"
+            assert Image.open(io.BytesIO(exported.content)).size == (64, 32)
+
+            assert client.post("/render", json={"template": "missing", "dna": DNA}).status_code == 404
+            assert client.post("/render", json={"dna": DNA}).status_code == 400
+            assert client.post("/render", content=b"not json").status_code == 400
+            assert client.get("/render").status_code == 405
+
+            # Bad parameters are caught before rendering
+            for bad in ({"template": "../promo"}, {"seed": "7"}, {"inputs": ["x"]}, {"preset": "nope"}, {"format": "gif"}, {"size": "big"}):
+                response = client.post("/render", json={**request, **bad})
+                assert response.status_code == 400, (bad, response.text)
+            for output_dir in ("../escape", "/tmp", ""):
+                response = client.post("/batch", json={**request, "output_dir": output_dir})
+                assert response.status_code == 400, (output_dir, response.text)
+            assert not os.path.exists(os.path.join(os.path.dirname(output_root), "escape"))
+
+            metrics = client.get("/metrics").json()
+            assert metrics["requests"] >= 10 and metrics["errors"] == 0
+            assert metrics["latency_p50_ms"] is not None and metrics["queued"] == 0
+
+            # A bug on the server side is a 500, even if it raises KeyError
+            def broken(*args, **kwargs):
+                raise KeyError("oops")
+            server.studio.encode = broken
+            assert client.post("/render", json=request).status_code == 500
+            assert client.get("/metrics").json()["errors"] == 1
+    print("Render endpoints test passed!")
+
+def test_backpressure():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        server = RenderServer(SlowGenerator(0.3), workers=1, queue_size=1, cache_dir=cache_dir)
+        with running(server) as url:
+            async def burst():
+                async with httpx.AsyncClient(base_url=url, timeout=30) as client:
+                    requests = [
+                        client.post("/render", json={"template": "promo", "dna": DNA, "seed": i, "draft": True})
+                        for i in range(4)
+                    ]
+                    return await asyncio.gather(*requests)
+
+            statuses = sorted(r.status_code for r in asyncio.run(burst()))
+            # One running, one queued, the rest turned away
+            assert statuses == [200, 200, 429, 429], statuses
+            metrics = httpx.get(f"{url}/metrics").json()
+            assert metrics["rejected"] == 2 and metrics["busy"] == 0
+    print("Backpressure test passed!")
+
+if __name__ == "__main__":
+    test_render_endpoints()
+    test_backpressure()
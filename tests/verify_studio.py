@@ -0,0 +1,57 @@
+import asyncio
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from ray_studio import Studio
+from ray_studio.dna import load_dna
+
+DNA = "examples/client_dna_example.yaml"
+
+def test_studio_session():
+    with tempfile.TemporaryDirectory() as cache_dir, Studio("procedural", cache_dir=cache_dir) as studio:
+        inputs = {"headline": "Warm", "cta": "Go"}
+        image = studio.render("promo", DNA, inputs, seed=3)
+        assert image.size == (1080, 1080)
+
+        # Same DNA and template are parsed once; the background comes from disk
+        studio.render("promo", DNA, inputs, seed=3)
+        stats = studio.stats()
+        assert stats["dna"] == {"entries": 1, "hits": 1, "misses": 1}
+        assert stats["templates"]["hits"] == 1
+        assert stats["backgrounds"] == {"hits": 1, "misses": 1}
+        assert stats["fonts"]["hits"] > 0
+        assert stats["generator_in_flight"] == 0
+
+        # Loaded objects are accepted as-is
+        assert studio.render("promo", load_dna(DNA), inputs, seed=3, draft=True).size == (270, 270)
+
+        # Renders from many threads and gathered on one loop share the session
+        with ThreadPoolExecutor(4) as pool:
+            images = list(pool.map(lambda seed: studio.render("promo", DNA, inputs, seed=seed), range(4)))
+        assert all(img.size == (1080, 1080) for img in images)
+
+        async def gathered():
+            return await asyncio.gather(*[studio.render_async("testimonial", DNA, {"headline": "Hi"}, seed=s) for s in range(3)])
+        assert len(asyncio.run(gathered())) == 3
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            paths = studio.export_multi(image, output_dir, ["instagram_post", "facebook_post", "gmn_post"])
+            assert [os.path.basename(p) for p in paths] == ["instagram_post.jpeg", "facebook_post.jpeg", "gmn_post.jpeg"]
+            assert all(os.path.exists(p) for p in paths)
+            assert os.path.exists(studio.export(image, os.path.join(output_dir, "single.png"), format="png"))
+
+        data, fmt = studio.encode(image, preset="web_og_image")
+        assert fmt in ("PNG", "JPEG", "WEBP") and len(data) > 0
+
+    studio.close()
+    assert not studio._thread.is_alive()
+    try:
+        studio.render("promo", DNA)
+        assert False, "expected RuntimeError"
+    except RuntimeError:
+        pass
+    print("Studio session test passed!")
+
+if __name__ == "__main__":
+    test_studio_session()
@@ -0,0 +1,34 @@
+import json
+import os
+from ray_studio import tracing
+from ray_studio.export import Exporter
+from PIL import Image
+
+def test_tracing():
+    # Disabled: spans are shared no-ops and nothing is recorded
+    assert tracing.get_tracer() is None
+    assert tracing.span("noop") is tracing.span("other")
+
+    tracer = tracing.enable()
+    try:
+        image = Image.new("RGBA", (400, 400), (0, 128, 255, 255))
+        Exporter().export(image, "tests/output/trace_ig.jpg", preset="instagram_post")
+    finally:
+        tracing.disable()
+
+    names = {row["name"] for row in tracer.summary()}
+    for expected in ["export.process", "export.save", "export.encode"]:
+        assert expected in names, expected
+    assert tracer.counters["export.bytes_written"] == os.path.getsize("tests/output/trace_ig.jpg")
+    assert not os.path.exists("tests/output/trace_ig.jpg.part")
+
+    path = tracer.write("tests/output/trace.json")
+    with open(path) as f:
+        data = json.load(f)
+    assert all(e["ph"] in ("X", "C") for e in data["traceEvents"])
+    print(tracer.format_summary())
+
+    print("Tracing verification passed!")
+
+if __name__ == "__main__":
+    test_tracing()